@@ -0,0 +1,63 @@
+"""
+圓弧擬合壓縮的速度與記憶體
+產生合成精加工程式（凸台等高環繞，每圈以 0.5° 的 G01 逼近，圈間以直線短段連接），
+逐行壓縮並量測 MB/s、程式段減少比例與峰值記憶體
+用法: python benchmarks/bench_arc_fit.py [MB]
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.arc_fit import FitOptions, compress_file  # noqa: E402
+
+OPTIONS = FitOptions(tolerance=0.005)
+
+
+def write_program(path, size_mb):
+    target = size_mb * 1_000_000
+    with open(path, 'w', encoding='ascii', newline='\n') as f:
+        f.write('%\nO1000 (BENCH)\nG90 G94 G17\nG00 X30 Y0 Z5\nG01 Z0 F2000\n')
+        written, k = 0, 0
+        while written < target:
+            r = 30 + (k % 50) * 0.2
+            z = -(k % 50) * 0.1
+            block = [f"G01 X{r:.4f} Y0.0000 Z{z:.4f}"]
+            block += [f"X{r * math.cos(math.radians(a / 2)):.4f} Y{r * math.sin(math.radians(a / 2)):.4f}"
+                      for a in range(1, 720)]
+            # 圈間以共線短段連接
+            block += [f"X{r + i * 0.05:.4f} Y0.0000" for i in range(1, 5)]
+            block = '\n'.join(block) + '\n'
+            f.write(block)
+            written += len(block)
+            k += 1
+        f.write('G00 Z5\nM30\n%\n')
+
+
+def main_bench(size_mb=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'in.nc')
+        dst = os.path.join(tmp, 'out.nc')
+        write_program(src, size_mb)
+        t0 = time.perf_counter()
+        stats = compress_file(src, dst, OPTIONS)
+        elapsed = time.perf_counter() - t0
+        print(stats.report())
+        print(f"{size_mb} MB: {elapsed:.2f} s（{size_mb / elapsed:.1f} MB/s，"
+              f"{stats.blocks_in / elapsed / 1e3:.0f} k 段/s），輸出 {os.path.getsize(dst) / 1e6:.2f} MB")
+
+        # tracemalloc 會拖慢速度，記憶體另外量測
+        tracemalloc.start()
+        compress_file(src, dst, OPTIONS)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"峰值記憶體 {peak / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,46 @@
+"""
+切削條件總表：逐格呼叫 compute_cutting vs 向量化一次計算
+用法: python benchmarks/bench_charts.py [次數]
+"""
+
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core import CuttingInput, compute_cutting  # noqa: E402
+from cnc_core.charts import cutting_chart  # noqa: E402
+
+
+def scalar_chart(chart):
+    """舊做法：每一格呼叫一次計算器"""
+    return [compute_cutting(CuttingInput(m, float(d), int(z), t, v, f))
+            for m, t, v, f, d, z in itertools.product(
+                chart.materials, chart.machining_types, chart.vc_levels,
+                chart.fz_levels, chart.diameters, chart.teeth)]
+
+
+def best_of(func, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main_bench(runs=5):
+    chart = cutting_chart()
+    t_scalar = best_of(lambda: scalar_chart(chart), runs)
+    t_vector = best_of(cutting_chart, runs)
+    t_csv = best_of(chart.to_csv, runs)
+    print(f"總表 {chart.feed.size} 格 {chart.shape}")
+    print(f"逐格計算: {t_scalar:.1f} ms")
+    print(f"向量化: {t_vector:.2f} ms ({t_scalar / t_vector:.0f}x)")
+    print(f"CSV 匯出: {t_csv:.1f} ms")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
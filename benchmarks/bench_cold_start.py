@@ -0,0 +1,42 @@
+"""
+冷啟動比較：同步載入字體 vs 背景載入字體（顯示啟動畫面）
+每次以獨立行程啟動 main.py，讀取「首幀」與「首個可互動畫面」時間
+用法: python benchmarks/bench_cold_start.py [次數]
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FIRST_FRAME = re.compile(r'首幀: (\d+) ms')
+INTERACTIVE = re.compile(r'首個可互動畫面: (\d+) ms')
+
+
+def run_once(sync_fonts):
+    env = dict(os.environ, CNC_PROFILE_STARTUP='1', PYTHONIOENCODING='utf-8')
+    if sync_fonts:
+        env['CNC_SYNC_FONTS'] = '1'
+    else:
+        env.pop('CNC_SYNC_FONTS', None)
+    out = subprocess.run([sys.executable, 'main.py'], cwd=ROOT, env=env,
+                         capture_output=True, text=True, encoding='utf-8', timeout=120)
+    text = out.stdout + out.stderr
+    first, interactive = FIRST_FRAME.search(text), INTERACTIVE.search(text)
+    if not first or not interactive:
+        raise RuntimeError("無法讀取啟動時間:\n" + text)
+    return int(first.group(1)), int(interactive.group(1))
+
+
+def main_bench(runs=5):
+    for label, sync_fonts in (("同步載入字體", True), ("背景載入字體", False)):
+        samples = [run_once(sync_fonts) for _ in range(runs)]
+        first = statistics.median(s[0] for s in samples)
+        interactive = statistics.median(s[1] for s in samples)
+        print(f"{label}: 首幀 {first} ms, 首個可互動畫面 {interactive} ms (中位數, {runs} 次)")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,45 @@
+"""
+週期時間估算的速度
+產生合成程式（直線與圓弧交錯，每 5000 段換一次刀），分別量測 G 代碼解析與 NumPy 估算的時間
+用法: python benchmarks/bench_cycle_time.py [段數]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.cycle_time import estimate  # noqa: E402
+from cnc_core.toolpath import parse_gcode  # noqa: E402
+
+
+def program(n_moves, seed=1):
+    """合成程式：每 10 段一個 G02 圓弧，其餘為 G01 直線"""
+    rng = random.Random(seed)
+    yield 'G90 G94 G17'
+    for i in range(n_moves):
+        if i % 5000 == 0:
+            yield f"T{1 + i // 5000 % 4} M06"
+            yield f"(OP {i // 5000})"
+        if i % 10 == 9:
+            yield f"G02 X{rng.uniform(0, 500):.3f} Y{rng.uniform(0, 300):.3f} R400. F1500"
+        else:
+            yield f"G01 X{rng.uniform(0, 500):.3f} Y{rng.uniform(0, 300):.3f} Z{-rng.uniform(0, 20):.3f} F3000"
+
+
+def main_bench(n_moves=1_000_000):
+    lines = list(program(n_moves))
+    t0 = time.perf_counter()
+    moves = parse_gcode(lines)
+    t1 = time.perf_counter()
+    result = estimate(moves)
+    t2 = time.perf_counter()
+    print(result.report().split('\n\n')[0])
+    print(f"解析 {len(moves):,} 段: {t1 - t0:.2f} s（{len(moves) / (t1 - t0) / 1e3:.0f} k 段/s）")
+    print(f"估算: {(t2 - t1) * 1000:.0f} ms（{len(moves) / (t2 - t1) / 1e6:.1f} M 段/s）")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
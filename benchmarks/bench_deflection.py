@@ -0,0 +1,62 @@
+"""
+刀具庫批次伸長計算的速度
+隨機產生刀具庫（直徑 3-20、三種刀具材料、全槽與側銑混合、各種工件材料），
+比較向量化 size_crib 與逐把呼叫 compute_tool 的速度與切削力
+用法: python benchmarks/bench_deflection.py [刀具數]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.deflection import size_crib  # noqa: E402
+from cnc_core.engine import MATERIAL_PARAMS, ToolInput, compute_tool  # noqa: E402
+
+
+def make_crib(n, seed=1):
+    rng = np.random.default_rng(seed)
+    diameter = rng.choice([3, 4, 6, 8, 10, 12, 16, 20], n).astype(np.float64)
+    width = diameter * rng.uniform(0.05, 1, n)
+    return dict(
+        diameter=diameter,
+        material=rng.choice(['碳化鎢', '高速鋼', '陶瓷'], n),
+        teeth=rng.choice([2, 3, 4], n),
+        speed=rng.uniform(2000, 12000, n),
+        feed=rng.uniform(200, 2000, n),
+        depth=diameter * rng.uniform(0.1, 1.5, n),
+        width=np.where(rng.random(n) < 0.5, np.nan, width),
+        workpiece=rng.choice(list(MATERIAL_PARAMS) + [''], n),
+    )
+
+
+def main_bench(n=2000):
+    crib = make_crib(n)
+    size_crib(**crib)  # 預熱
+    repeat = 50
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = size_crib(**crib)
+    vector = (time.perf_counter() - t0) / repeat
+    print(result.report(5))
+
+    t0 = time.perf_counter()
+    force, deflection = np.empty(n), np.empty(n)
+    for i in range(n):
+        width = crib['width'][i]
+        r = compute_tool(ToolInput(
+            crib['diameter'][i], crib['material'][i], crib['speed'][i], crib['feed'][i],
+            crib['depth'][i], int(crib['teeth'][i]), None if np.isnan(width) else width,
+            workpiece=crib['workpiece'][i] or None))
+        force[i], deflection[i] = r.force, r.deflection
+    scalar = time.perf_counter() - t0
+    print(f"{n:,} 把刀：向量化 {vector * 1000:.2f} ms，逐把 compute_tool {scalar * 1000:.1f} ms"
+          f"（{scalar / vector:.0f} 倍），切削力/撓度最大相對差 "
+          f"{np.max(np.abs(result.force / force - 1)):.1e}/{np.max(np.abs(result.deflection / deflection - 1)):.1e}")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,61 @@
+"""
+進給修正改寫的速度與記憶體
+產生合成型腔程式（矩形環切 + 圓角，每圈都有內轉角與內圓弧），逐行改寫並量測 MB/s 與峰值記憶體
+用法: python benchmarks/bench_feed_override.py [MB]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.feed_override import OverrideOptions, rewrite_file  # noqa: E402
+
+OPTIONS = OverrideOptions(tool_dia=10, ae=3)
+
+
+def write_program(path, size_mb):
+    """逆時針矩形環切，轉角一半為尖角、一半為 R3 圓角"""
+    target = size_mb * 1_000_000
+    with open(path, 'w', encoding='ascii', newline='\n') as f:
+        f.write('%\nO1000 (BENCH)\nG90 G94 G17\nG00 X0 Y0 Z5\nG01 Z-2 F1200\n')
+        written, k = 0, 0
+        while written < target:
+            o = (k % 20) * 2.0
+            w, h = 200 - 2 * o, 120 - 2 * o
+            block = (f"G01 X{o + w:.3f} Y{o:.3f}\n"
+                     f"G01 X{o + w:.3f} Y{o + h - 3:.3f}\n"
+                     f"G03 X{o + w - 3:.3f} Y{o + h:.3f} R3.\n"
+                     f"G01 X{o:.3f} Y{o + h:.3f}\n"
+                     f"G01 X{o:.3f} Y{o:.3f}\n")
+            f.write(block)
+            written += len(block)
+            k += 1
+        f.write('G00 Z5\nM30\n%\n')
+
+
+def main_bench(size_mb=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'in.nc')
+        dst = os.path.join(tmp, 'out.nc')
+        write_program(src, size_mb)
+        t0 = time.perf_counter()
+        stats = rewrite_file(src, dst, OPTIONS)
+        elapsed = time.perf_counter() - t0
+        print(stats.report())
+        print(f"{size_mb} MB: {elapsed:.2f} s（{size_mb / elapsed:.1f} MB/s，"
+              f"{stats.blocks_in / elapsed / 1e3:.0f} k 段/s）")
+
+        # tracemalloc 會拖慢速度，記憶體另外量測
+        tracemalloc.start()
+        rewrite_file(src, dst, OPTIONS)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"峰值記憶體 {peak / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,47 @@
+"""
+螺旋銑 G 代碼產生速度（程式段/秒）與記憶體
+以隨機孔位表逐孔產生並寫入暫存檔，孔位以產生器提供，不建立完整清單
+用法: python benchmarks/bench_helix.py [孔數]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.helix import HelixOptions, HelixTool, HoleSpec, write_program  # noqa: E402
+
+TOOLS = {1: HelixTool(1, 6, 6000, 800), 2: HelixTool(2, 10, 4000, 1000), 3: HelixTool(3, 16, 2500, 1200)}
+
+
+def holes(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        tool = TOOLS[1 + i * len(TOOLS) // count]  # 依刀號分組，與實際程式相同
+        yield HoleSpec(rng.uniform(0, 500), rng.uniform(0, 300),
+                       round(tool.diameter * rng.uniform(1.3, 2.5), 1),
+                       round(rng.uniform(3, 25), 1), tool.number)
+
+
+def main_bench(count=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'holes.nc')
+        start = time.perf_counter()
+        blocks = write_program(path, holes(count), TOOLS, HelixOptions())
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        # tracemalloc 會拖慢速度，記憶體另外量測
+        tracemalloc.start()
+        write_program(path, holes(count), TOOLS, HelixOptions())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{count} 孔, {blocks} 程式段, {size / 1e6:.1f} MB")
+    print(f"耗時 {elapsed:.2f} s, {blocks / elapsed:,.0f} 程式段/秒, 峰值記憶體 {peak / 1024:.0f} KB")
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,58 @@
+"""
+NC 程式檢查的掃描速度與記憶體
+產生合成程式（每行都有座標與 F 字，最壞情況），以 mmap 掃描並量測 MB/s 與峰值記憶體
+用法: python benchmarks/bench_nc_analyzer.py [MB]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.nc_analyzer import NCTool, analyze  # noqa: E402
+
+TOOLS = {1: NCTool(10, 3), 2: NCTool(6, 2)}
+
+
+def write_program(path, size_mb, seed=1):
+    """產生約 size_mb MB 的程式，每 1000 行換一次刀/轉速，偶爾插入超出範圍的進給"""
+    rng = random.Random(seed)
+    target = size_mb * 1_000_000
+    block = []
+    for i in range(1000):
+        feed = 9000 if i == 500 else rng.choice((3000, 3600, 4200))
+        block.append(f"G01 X{rng.uniform(0, 500):.3f} Y{rng.uniform(0, 300):.3f} "
+                     f"Z{-rng.uniform(0, 20):.3f} F{feed}\n")
+    block = ''.join(block).encode('ascii')
+    with open(path, 'wb') as f:
+        f.write(b'%\nO1000 (BENCH)\nG90 G94 G17\n')
+        written, k = 0, 0
+        while written < target:
+            header = f"T{1 + k % 2} M06\nS{16000 if k % 2 == 0 else 20000} M03\n".encode('ascii')
+            f.write(header)
+            f.write(block)
+            written += len(header) + len(block)
+            k += 1
+        f.write(b'M30\n%\n')
+
+
+def main_bench(size_mb=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.nc')
+        write_program(path, size_mb)
+        report = analyze(path, '鋁合金', TOOLS)
+        print(report.report(limit=3))
+
+        # tracemalloc 會拖慢速度，記憶體另外量測
+        tracemalloc.start()
+        analyze(path, '鋁合金', TOOLS)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"峰值記憶體 {peak / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
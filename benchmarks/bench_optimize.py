@@ -0,0 +1,37 @@
+"""
+最大 MRR 搜尋的取樣速度
+碳鋼 D10 四刃粗加工，以不同取樣解析度（每個變數的點數）搜尋，量測每秒評估點數；
+指定行程數時比較行程池與單行程的前緣是否一致
+用法: python benchmarks/bench_optimize.py [解析度] [行程數]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.optimize import OptimizeOptions, optimize  # noqa: E402
+
+OPTIONS = OptimizeOptions('碳鋼', 10, 4, stick_out=30, min_life=15)
+
+
+def main_bench(resolution=40, workers=None):
+    t0 = time.perf_counter()
+    serial = optimize(OPTIONS, resolution, workers=1)
+    elapsed = time.perf_counter() - t0
+    print(serial.report(5))
+    print(f"解析度 {resolution}：{serial.evaluated:,} 點 {elapsed:.2f} s"
+          f"（{serial.evaluated / elapsed / 1e6:.1f} M 點/s），前緣 {len(serial.front)} 點")
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        t0 = time.perf_counter()
+        pooled = optimize(OPTIONS, resolution, workers=workers)
+        elapsed = time.perf_counter() - t0
+        same = pooled.front == serial.front
+        print(f"{workers} 行程：{elapsed:.2f} s，前緣{'一致' if same else '不一致'}")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+               int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,89 @@
+"""
+參考數據載入與查詢：打包檔 (mmap) vs 解析 JSON 成字典
+以放大的合成表格（材料數 ×N）比較載入時間，確認表格成長不影響啟動；
+先確認參考步距查詢與原本計算機的取法（排序後取最接近、等距取較小直徑）相同
+用法: python benchmarks/bench_refdata.py [放大倍數]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from cnc_core.engine import reference_step  # noqa: E402
+from cnc_core.refdata import SOURCE_PATH, load, pack  # noqa: E402
+
+
+def scaled_source(factor):
+    """將每種材料複製 factor 份（名稱加編號）"""
+    with open(SOURCE_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    materials, allowance = [], {}
+    for k in range(factor):
+        for m in data['materials']:
+            name = f"{m['name']}{k}" if k else m['name']
+            materials.append(dict(m, name=name))
+            allowance[name] = data['allowance'][m['name']]
+    return dict(data, materials=materials, allowance=allowance)
+
+
+def check_reference_steps():
+    """標準直徑、相鄰直徑中點與表外直徑的查詢結果與原本的 min(sorted(...)) 相同"""
+    with open(SOURCE_PATH, encoding='utf-8') as f:
+        table = {float(d): p for d, p in json.load(f)['reference_steps']}
+    diameters = sorted(table)
+    probes = diameters + [(a + b) / 2 for a, b in zip(diameters, diameters[1:])]
+    probes += [diameters[0] / 2, diameters[-1] * 2]
+    for d in probes:
+        expected = table[min(diameters, key=lambda x: abs(x - d))]
+        assert reference_step(d) == expected, (d, reference_step(d), expected)
+    print(f"參考步距查詢：{len(probes)} 個直徑與原本取法一致")
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main_bench(factor=1000):
+    check_reference_steps()
+    data = scaled_source(factor)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'reference.json')
+        bin_path = os.path.join(tmp, 'refdata.bin')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        with open(bin_path, 'wb') as f:
+            f.write(pack(data))
+
+        def load_json():
+            with open(json_path, encoding='utf-8') as f:
+                return json.load(f)
+
+        n = len(data['materials'])
+        t_json, parsed = timed(load_json)
+        t_bin, store = timed(lambda: load(bin_path))
+        print(f"材料數 {n}，預留量記錄 {store.n_features}")
+        print(f"載入: JSON {t_json:.2f} ms, 打包檔 {t_bin:.3f} ms "
+              f"({os.path.getsize(json_path) // 1024} KB vs {os.path.getsize(bin_path) // 1024} KB)")
+
+        name = data['materials'][-1]['name']
+        t_q, rec = timed(lambda: [store.allowance(name, '型腔') for _ in range(1000)])
+        print(f"allowance() 查詢: {t_q:.3f} µs/次 -> {rec[0].rough} mm")
+        t_q, rows = timed(lambda: store.features_with_rough_below(0.5))
+        print(f"粗加工預留 < 0.5 mm: {len(rows)} 筆, {t_q:.2f} ms")
+        t_q, rows = timed(lambda: store.materials_with_vc_in(90, 160))
+        print(f"vc 與 90-160 m/min 重疊: {len(rows)} 種材料, {t_q:.2f} ms")
+        del parsed, store
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
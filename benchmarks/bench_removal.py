@@ -0,0 +1,38 @@
+"""
+切除體積估算的速度與記憶體
+以 bench_stl_scallop 的合成起伏面（2n² 個三角形）作為零件，方塊毛坯，
+量測光柵化與估算時間及峰值記憶體
+用法: python benchmarks/bench_removal.py [n]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_stl_scallop import surface  # noqa: E402
+from cnc_core.removal import estimate_removal  # noqa: E402
+
+STOCK = (0, 0, -25, 200, 200, 25)
+
+
+def main_bench(n=1000):
+    part = surface(n)
+    t0 = time.perf_counter()
+    result = estimate_removal(part, '鋁合金', '曲面', stock_box=STOCK, cell=0.1)
+    elapsed = time.perf_counter() - t0
+    print(result.report())
+    print(f"{len(part):,} 個三角形：{elapsed:.2f} s")
+
+    # tracemalloc 會拖慢速度，記憶體另外量測
+    tracemalloc.start()
+    estimate_removal(part, '鋁合金', '曲面', stock_box=STOCK, cell=0.1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"峰值記憶體 {peak / 1e6:.0f} MB（零件網格 {part.nbytes / 1e6:.0f} MB 不計）")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,63 @@
+"""
+工單主軸負載檢查：逐筆呼叫 compute_cutting vs 向量化 evaluate_jobs
+隨機產生工單（全部材料、直徑 2-25、粗/精加工、各種切深切寬），在每種機台上比較速度並確認結果一致
+用法: python benchmarks/bench_spindle.py [工單數]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core import MATERIAL_PARAMS, CuttingInput, compute_cutting  # noqa: E402
+from cnc_core.machine import MACHINE_PROFILES  # noqa: E402
+from cnc_core.spindle import evaluate_jobs  # noqa: E402
+
+
+def make_jobs(n, seed=3):
+    rng = np.random.default_rng(seed)
+    diameter = rng.choice([2, 4, 6, 8, 10, 12, 16, 20, 25], n).astype(np.float64)
+    width = diameter * rng.uniform(0.05, 1, n)
+    return dict(
+        material=rng.choice(list(MATERIAL_PARAMS), n),
+        diameter=diameter,
+        teeth=rng.choice([2, 3, 4, 5], n),
+        depth=diameter * rng.uniform(0.05, 1.5, n),
+        width=np.where(rng.random(n) < 0.3, np.nan, width),
+        machining_type=rng.choice(['粗加工', '精加工'], n),
+        vc_level=rng.choice(['高', '中', '低'], n),
+        fz_level=rng.choice(['高', '中', '低'], n),
+    )
+
+
+def scalar(jobs, name, i):
+    width = jobs['width'][i]
+    return compute_cutting(CuttingInput(
+        jobs['material'][i], float(jobs['diameter'][i]), int(jobs['teeth'][i]),
+        jobs['machining_type'][i], jobs['vc_level'][i], jobs['fz_level'][i],
+        float(jobs['depth'][i]), None if np.isnan(width) else float(width), name))
+
+
+def main_bench(n=100000):
+    jobs = make_jobs(n)
+    sample = min(n, 2000)
+    for name, machine in MACHINE_PROFILES.items():
+        t0 = time.perf_counter()
+        result = evaluate_jobs(machine=machine, **jobs)
+        vector = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        rows = [scalar(jobs, name, i) for i in range(sample)]
+        per_job = (time.perf_counter() - t0) / sample
+        worst = max(abs(r.feed - result.feed[i]) / r.feed + abs(r.spindle.power - result.power[i]) / r.spindle.power
+                    for i, r in enumerate(rows))
+        print(f"{name}：{n:,} 筆 向量化 {vector * 1000:.0f} ms，逐筆估計 {per_job * n * 1000:.0f} ms"
+              f"（{per_job * n / vector:.0f} 倍），降低 {int(result.derated.sum()):,} 筆，"
+              f"超載 {int(result.overloaded.sum()):,} 筆，最大相對差 {worst:.1e}")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,61 @@
+"""
+葉瓣圖計算速度
+三模態刀尖頻響（長懸伸刀具，x/y 不對稱），比較單行程與行程池並檢查兩者結果一致，另量測峰值記憶體；
+先檢查順銑、逆銑在相同切寬下的接觸弧長相同
+用法: python benchmarks/bench_stability.py [頻率點數] [行程數]
+"""
+
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.stability import FRF, Mode, immersion, stability_lobes  # noqa: E402
+
+MODES_X = [Mode(620, 0.04, 3.5e4), Mode(1450, 0.025, 1.2e4), Mode(3100, 0.02, 4e4)]
+MODES_Y = [Mode(650, 0.04, 3.2e4), Mode(1500, 0.03, 1.1e4), Mode(3150, 0.02, 4e4)]
+
+
+def check_immersion(diameter=12):
+    """順銑與逆銑的接觸弧長相同，且等於 acos(1 - 2a/D)"""
+    for ratio in (0.05, 0.1, 0.25, 1 / 3, 0.5, 0.75, 1.0):
+        climb = immersion(diameter, ratio * diameter, True)
+        conventional = immersion(diameter, ratio * diameter, False)
+        arc = math.acos(1 - 2 * ratio)
+        assert math.isclose(climb[1] - climb[0], arc, abs_tol=1e-12), (ratio, climb)
+        assert math.isclose(conventional[1] - conventional[0], arc, abs_tol=1e-12), (ratio, conventional)
+    print("切入角檢查：順銑與逆銑接觸弧長一致")
+
+
+def main_bench(points=20000, workers=None):
+    check_immersion()
+    workers = workers or os.cpu_count() or 1
+    frf = FRF.from_modes(MODES_X, MODES_Y, np.linspace(200, 4500, points))
+    t0 = time.perf_counter()
+    serial = stability_lobes(frf, 3, 12, 4, workers=1)
+    t1 = time.perf_counter()
+    print(serial.report())
+    print(f"頻率點 {points:,}，轉速點 {len(serial.rpm):,}：單行程 {t1 - t0:.2f} s")
+    if workers > 1:
+        t0 = time.perf_counter()
+        pooled = stability_lobes(frf, 3, 12, 4, workers=workers)
+        t1 = time.perf_counter()
+        same = np.array_equal(serial.depth, pooled.depth)
+        print(f"{workers} 行程：{t1 - t0:.2f} s，結果{'一致' if same else '不一致'}")
+
+    # tracemalloc 會拖慢速度，記憶體另外量測
+    tracemalloc.start()
+    stability_lobes(frf, 3, 12, 4, workers=1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"單行程峰值記憶體 {peak / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+               int(sys.argv[2]) if len(sys.argv) > 2 else None)
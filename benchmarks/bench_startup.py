@@ -0,0 +1,57 @@
+"""
+啟動時間比較：一次建立全部屏幕 vs 延遲建立
+用法: python benchmarks/bench_startup.py [次數]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import main  # noqa: E402
+
+
+def build_eager():
+    """舊做法：build() 時建立全部屏幕"""
+    sm = main.CNCApp(background_fonts=False).build()
+    for name in main.CNCApp.SCREEN_CLASSES:
+        sm.get_or_create(name)
+    return sm
+
+
+def build_lazy():
+    """新做法：build() 只建立主屏幕"""
+    return main.CNCApp(background_fonts=False).build()
+
+
+def measure(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main_bench(runs=10):
+    # 先各執行一次，排除首次導入與字體初始化的成本
+    build_eager()
+    build_lazy()
+
+    eager = measure(build_eager, runs)
+    lazy = measure(build_lazy, runs)
+    print(f"全部建立: {eager:.1f} ms (中位數, {runs} 次)")
+    print(f"延遲建立: {lazy:.1f} ms (中位數, {runs} 次)")
+    print(f"首幀前節省: {eager - lazy:.1f} ms ({(1 - lazy / eager) * 100:.0f}%)")
+
+    print("首次進入各屏幕的建立成本:")
+    for name, cls in main.CNCApp.SCREEN_CLASSES.items():
+        cost = measure(lambda: cls(name=name), runs)
+        print(f"  {name}: {cost:.1f} ms")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,52 @@
+"""
+STL 殘餘高度分析的速度
+產生合成曲面網格（n×n 格的正弦起伏面，2n² 個三角形），以零複製讀取並分析
+用法: python benchmarks/bench_stl_scallop.py [n]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.stl import read_stl, write_stl  # noqa: E402
+from cnc_core.stl_scallop import best_direction, mesh_scallop  # noqa: E402
+
+
+def surface(n, size=200.0, amplitude=20.0):
+    """z = A·sin(x)·cos(y) 的起伏面"""
+    t = np.linspace(0, size, n + 1)
+    x, y = np.meshgrid(t, t)
+    z = amplitude * np.sin(x / size * 3 * np.pi) * np.cos(y / size * 2 * np.pi)
+    p = np.stack([x, y, z], axis=-1).astype(np.float32)
+    a, b, c, d = p[:-1, :-1], p[:-1, 1:], p[1:, 1:], p[1:, :-1]
+    return np.concatenate([np.stack([a, b, c], axis=-2).reshape(-1, 3, 3),
+                           np.stack([a, c, d], axis=-2).reshape(-1, 3, 3)])
+
+
+def main_bench(n=1500):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.stl')
+        write_stl(path, surface(n))
+        file_size = os.path.getsize(path)
+
+        t0 = time.perf_counter()
+        mesh = read_stl(path)
+        t1 = time.perf_counter()
+        result = mesh_scallop(mesh, 6, 0.3, target=0.005)
+        t2 = time.perf_counter()
+        ranked = best_direction(mesh, 6, 0.3, target=0.005, angles=range(0, 180, 45))
+        t3 = time.perf_counter()
+        print(result.report())
+        print(f"最佳走刀方向 {ranked[0][0]}°（超過目標 {ranked[0][1]:.1%}）")
+        print(f"{len(mesh):,} 個三角形（{file_size / 1e6:.0f} MB）：讀取 {(t1 - t0) * 1000:.1f} ms，"
+              f"分析 {t2 - t1:.2f} s，比較 4 個方向 {t3 - t2:.2f} s")
+        del mesh      # 釋放 mmap 後才能刪除暫存檔（Windows）
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1500)
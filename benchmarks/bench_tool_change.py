@@ -0,0 +1,57 @@
+"""
+換刀排程的速度
+隨機產生數週的工單（多台機台、每台數百把刀、全部材料、VC 在材料範圍內），量測排程時間與峰值記憶體
+用法: python benchmarks/bench_tool_change.py [工單數] [機台數] [每台刀具數]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core import MATERIAL_PARAMS  # noqa: E402
+from cnc_core.tool_change import Job, ScheduleOptions, schedule  # noqa: E402
+
+
+def make_jobs(n, machines, tools, seed=5):
+    rng = random.Random(seed)
+    materials = list(MATERIAL_PARAMS)
+    ranges = {m: MATERIAL_PARAMS[m]['vc_range'] for m in materials}
+    jobs = []
+    for i in range(n):
+        material = rng.choice(materials)
+        low, high = ranges[material]
+        # VC 取範圍下半段、以 10 m/min 為級距，與實際程式的取值方式相近
+        vc = round(rng.uniform(low, (low + high) / 2), -1)
+        jobs.append(Job(f"J{i}", f"M{rng.randrange(machines)}", rng.randrange(tools), material,
+                        vc, rng.uniform(1, 15), rng.uniform(0, 3)))
+    return jobs
+
+
+def main_bench(n=100000, machines=40, tools=100, repeat=3):
+    jobs = make_jobs(n, machines, tools)
+    for split in (False, True):
+        options = ScheduleOptions(operators=4, split=split)
+        elapsed = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = schedule(jobs, options)
+            elapsed.append(time.perf_counter() - t0)
+        print(result.report(3))
+        print(f"{'中途換刀' if split else '工單前換刀'}：{n:,} 段工單（約 {result.makespan / 60 / 24 / 7:.1f} 週），"
+              f"{len(result.tools):,} 把刀，排程 {min(elapsed) * 1000:.0f} ms（{repeat} 次取最快）\n")
+
+    # tracemalloc 會拖慢速度，記憶體另外量測
+    tracemalloc.start()
+    schedule(jobs, ScheduleOptions(operators=4))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"峰值記憶體 {peak / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:4]]
+    main_bench(*args)
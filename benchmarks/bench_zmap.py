@@ -0,0 +1,55 @@
+"""
+Z-map 模擬的速度與記憶體
+R5 球刀以步距 0.5 mm 往復精加工 size×size mm 的平面，格距 0.01 mm，
+量測每秒處理的格點數、殘留高度（與理論值比較）與峰值記憶體
+用法: python benchmarks/bench_zmap.py [size_mm]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cnc_core.engine import scallop_height  # noqa: E402
+from cnc_core.zmap import Cutter, simulate_program  # noqa: E402
+
+CUTTER = Cutter(10)
+STEP = 0.5
+
+
+def program(size):
+    yield 'G90 G00 X-6 Y0 Z5'
+    yield 'G01 Z-1 F2000'
+    passes = int(size / STEP) + 1
+    for i in range(passes):
+        yield f"G01 X{size + 6 if i % 2 == 0 else -6} Y{i * STEP:.3f}"
+        if i < passes - 1:
+            yield f"G01 Y{(i + 1) * STEP:.3f}"
+
+
+def run(size):
+    return simulate_program(program(size), CUTTER, cell=0.01, top=0.0, target=-1.0,
+                            bounds=(0, 0, size, size))
+
+
+def main_bench(size=40):
+    t0 = time.perf_counter()
+    result = run(size)
+    elapsed = time.perf_counter() - t0
+    cells = result.shape[0] * result.shape[1]
+    print(result.report())
+    print(f"理論殘留高度 {scallop_height(CUTTER.diameter, STEP) * 1000:.1f} μm")
+    print(f"{cells / 1e6:.0f} M 格點: {elapsed:.1f} s（{cells / elapsed / 1e6:.2f} M 格點/s）")
+
+    # tracemalloc 會拖慢速度，記憶體另外量測
+    tracemalloc.start()
+    run(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"峰值記憶體 {peak / 1e6:.0f} MB（完整 float32 高度場需 {cells * 4 / 1e6:.0f} MB）")
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,36 @@
+"""
+CNC加工工具包 計算核心
+純 Python 實現，不導入 Kivy，可供腳本、測試與批次作業使用
+
+    from cnc_core import CuttingInput, compute_cutting
+    r = compute_cutting(CuttingInput('鋁合金', 10, 3))
+    print(r.rpm, r.feed)
+"""
+
+from .engine import (
+    RPM_LIMITS, FEED_LIMITS, TOOL_MATERIAL_FACTOR, REFERENCE_STEP_DATA,
+    MATERIAL_PARAMS, ALLOWANCE_DATA, MILLING_TYPES, LEVELS, MACHINING_TYPES,
+    SCALLOP_QUALITY, InputError,
+    ToolInput, ToolResult, compute_tool,
+    TOOL_MODULUS, DEFLECTION_LIMIT, cutting_force, workpiece_kc, tool_deflection, max_stick_out,
+    BallMillInput, BallMillResult, compute_ballmill,
+    BallMillInverseInput, BallMillInverseResult, compute_ballmill_inverse,
+    GRID_MIN_STEP, BallMillGridInput, BallMillGridResult, compute_ballmill_grid,
+    HelicalInput, HelicalResult, compute_helical,
+    RAMP_MAX_ANGLE, RampEntry, ramp_entry,
+    CuttingInput, CuttingResult, compute_cutting,
+    SpindleLoad, fit_spindle, machine_profile, mean_chip_thickness, specific_cutting_force,
+    cutting_power, TAYLOR_N, taylor_constants, tool_life,
+    AllowanceInput, AllowanceResult, query_allowance,
+    clamp, pick_level, scallop_height, scallop_quality, reference_step,
+    max_step_for_height, quality_height_limit, max_step_for_quality,
+    min_hole_diameter, safety_assessment, SAFE_ANGLE_BANDS, spindle_speed, feed_rate,
+)
+from .cache import (
+    ResultCache, CacheStats, Evaluation, evaluate, result_cache,
+    set_cache_size, cache_stats, canonical_key,
+)
+from .refdata import (
+    ReferenceStore, MaterialParams, AllowanceRecord, store as reference_store,
+)
+from .machine import MachineProfile, MACHINE_PROFILES, DEFAULT_MACHINE
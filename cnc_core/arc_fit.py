@@ -0,0 +1,389 @@
+"""
+圓弧擬合壓縮（串流）
+將 CAM 輸出的密集 G01 短線段在公差內合併：
+    共線的連續 G01 → 一段 G01
+    共圓的連續 G01（XY 平面、Z 不變）→ 一段 G02/G03（I/J 圓心）
+公差為原始點與線段中點到擬合直線/圓弧的最大距離（弦偏差）。
+
+逐段擬合：新點先以目前的直線/圓檢查（公差的一半，O(1)），
+不符合時再以首點、中點、新點重新求圓並驗證整段；失敗則輸出目前的段落並從最後一點重新開始。
+每段最多 max_points 點，記憶體用量與程式大小無關。
+
+只處理 G90、G17 的 G01；其他程式段原樣輸出（必要時補上 G01 模態）。
+
+用法: python -m cnc_core.arc_fit 輸入.nc 輸出.nc [--tolerance 0.005]
+"""
+
+import argparse
+import math
+import re
+from dataclasses import dataclass
+from itertools import islice
+
+from .engine import InputError
+
+WRITE_CHUNK = 4096         # 每次寫入的行數
+DEFAULT_TOLERANCE = 0.005  # 弦偏差公差 mm
+
+WORD = re.compile(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+COMMENT = re.compile(r'\([^)]*\)?|;.*')
+AXES = {'X': 0, 'Y': 1, 'Z': 2}
+# 只含這些字的 G01 才會被合併
+MERGEABLE = frozenset('GNXYZF')
+
+
+@dataclass(frozen=True)
+class FitOptions:
+    """擬合選項（長度單位與程式相同）"""
+    tolerance: float = DEFAULT_TOLERANCE
+    min_radius: float = 0.05       # 小於此半徑不擬合圓弧
+    max_radius: float = 5000.0     # 大於此半徑視為直線
+    max_points: int = 500          # 每段最多點數
+    decimals: int = 4
+
+    def __post_init__(self):
+        if self.tolerance <= 0:
+            raise InputError("錯誤：公差必須大於0")
+        if self.max_points < 3:
+            raise InputError("錯誤：每段點數至少為3")
+
+
+@dataclass
+class FitStats:
+    """壓縮統計"""
+    blocks_in: int = 0
+    blocks_out: int = 0
+    arcs: int = 0              # 輸出的圓弧段數
+    lines: int = 0             # 輸出的合併直線段數
+    merged: int = 0            # 被合併的 G01 段數
+    max_deviation: float = 0.0
+
+    @property
+    def reduction(self):
+        return 1 - self.blocks_out / self.blocks_in if self.blocks_in else 0.0
+
+    def report(self):
+        return '\n'.join([
+            f"程式段 {self.blocks_in} → {self.blocks_out}（減少 {self.reduction:.1%}）",
+            f"• 合併 {self.merged} 段 G01 為 {self.arcs} 段圓弧與 {self.lines} 段直線",
+            f"• 最大弦偏差 {self.max_deviation:.4f}",
+        ])
+
+
+def circle_through(p0, p1, p2):
+    """通過三點（XY）的圓，返回 (cx, cy, r)；三點共線時返回 None"""
+    bx, by = p1[0] - p0[0], p1[1] - p0[1]
+    cx, cy = p2[0] - p0[0], p2[1] - p0[1]
+    d = 2 * (bx * cy - by * cx)
+    if d == 0:
+        return None
+    b2, c2 = bx * bx + by * by, cx * cx + cy * cy
+    ux = (cy * b2 - by * c2) / d
+    uy = (bx * c2 - cx * b2) / d
+    return p0[0] + ux, p0[1] + uy, math.hypot(ux, uy)
+
+
+def _line_deviation(p0, p1, q):
+    """q 到直線 p0→p1 的距離與投影參數（3D）"""
+    d = [b - a for a, b in zip(p0, p1)]
+    v = [b - a for a, b in zip(p0, q)]
+    dd = d[0] * d[0] + d[1] * d[1] + d[2] * d[2]
+    t = (v[0] * d[0] + v[1] * d[1] + v[2] * d[2]) / dd
+    e = [v[k] - t * d[k] for k in range(3)]
+    return math.sqrt(e[0] * e[0] + e[1] * e[1] + e[2] * e[2]), t
+
+
+class ArcFitter:
+    """串流壓縮器：compress() 逐行產生壓縮後的程式段，統計見 stats"""
+
+    def __init__(self, options=FitOptions()):
+        self.options = options
+        self.stats = FitStats()
+        self._half = options.tolerance / 2
+
+    # ---- 目前段落 ----
+
+    def _reset(self, start):
+        self._points = [start]
+        self._texts = []
+        self._mode = None          # None（單段）、'line' 或 'arc'
+        self._anchor = None        # 直線模式的方向點
+        self._last_t = 0.0         # 最後一點在方向線上的投影參數
+        self._circle = None
+        self._sweep = 0.0
+        self._turn = 0
+
+    def _fits_line(self, points, tol):
+        p0, pk = points[0], points[-1]
+        if pk == p0:
+            return False
+        last_t = 0.0
+        for q in points[1:-1]:
+            dev, t = _line_deviation(p0, pk, q)
+            if dev > tol or t <= last_t or t >= 1:
+                return False
+            last_t = t
+        return True
+
+    def _arc_step(self, circle, a, b):
+        """a→b 的掃掠角與中點偏差"""
+        cx, cy, r = circle
+        ax, ay, bx, by = a[0] - cx, a[1] - cy, b[0] - cx, b[1] - cy
+        step = math.atan2(ax * by - ay * bx, ax * bx + ay * by)
+        mid = math.hypot((ax + bx) / 2, (ay + by) / 2)
+        return step, abs(mid - r)
+
+    def _verify_arc(self, circle, points):
+        """以 circle 驗證整段，返回 (轉向, 掃掠角)；不符合時返回 None"""
+        cx, cy, r = circle
+        tol, half = self.options.tolerance, self._half
+        turn, sweep = 0, 0.0
+        for a, b in zip(points, points[1:]):
+            if abs(math.hypot(b[0] - cx, b[1] - cy) - r) > half:
+                return None
+            step, mid_dev = self._arc_step(circle, a, b)
+            sign = 1 if step > 0 else -1
+            if step == 0 or mid_dev > tol or (turn and sign != turn):
+                return None
+            turn = sign
+            sweep += abs(step)
+        if sweep >= 2 * math.pi - 1e-6:
+            return None
+        return turn, sweep
+
+    def _try_arc(self, points):
+        opts = self.options
+        if any(p[2] != points[0][2] for p in points):
+            return False
+        circle = circle_through(points[0], points[len(points) // 2], points[-1])
+        if circle is None or not opts.min_radius <= circle[2] <= opts.max_radius:
+            return False
+        result = self._verify_arc(circle, points)
+        if result is None:
+            return False
+        self._circle = circle
+        self._turn, self._sweep = result
+        return True
+
+    def _extend(self, q):
+        """嘗試將 q 加入目前段落"""
+        points = self._points
+        if self._mode == 'line':
+            dev, t = _line_deviation(points[0], self._anchor, q)
+            if dev <= self._half and t > self._last_t:
+                self._last_t = t
+                return True
+            candidate = points + [q]
+            if self._fits_line(candidate, self._half):
+                self._anchor, self._last_t = q, 1.0
+                return True
+            # 小曲率的圓弧一開始會被當作直線
+            if self._try_arc(candidate):
+                self._mode = 'arc'
+                return True
+            return False
+        if self._mode == 'arc':
+            if q[2] == points[0][2]:
+                step, mid_dev = self._arc_step(self._circle, points[-1], q)
+                cx, cy, r = self._circle
+                if (abs(math.hypot(q[0] - cx, q[1] - cy) - r) <= self._half and mid_dev <= self.options.tolerance
+                        and step * self._turn > 0 and self._sweep + abs(step) < 2 * math.pi - 1e-6):
+                    self._sweep += abs(step)
+                    return True
+            return self._try_arc(points + [q])
+        # 第三點：先試直線再試圓弧
+        candidate = points + [q]
+        if self._fits_line(candidate, self._half):
+            self._mode = 'line'
+            self._anchor, self._last_t = q, 1.0
+            return True
+        if self._try_arc(candidate):
+            self._mode = 'arc'
+            return True
+        return False
+
+    # ---- 輸出 ----
+
+    def _fmt(self, value):
+        n = self.options.decimals
+        return f"{round(value, n) + 0.0:.{n}f}"   # 避免輸出 -0.0000
+
+    def _emit_text(self, text, explicit_motion, has_target, motion):
+        if has_target and not explicit_motion and self._out_motion != motion:
+            text = f"G{motion:02d} {text}"
+        if has_target or explicit_motion:
+            self._out_motion = motion
+        self.stats.blocks_out += 1
+        return text
+
+    def _word_f(self):
+        if self._feed != self._out_feed:
+            self._out_feed = self._feed
+            return f" F{self._feed:g}"
+        return ''
+
+    def _flush(self):
+        """輸出目前段落（保留最後一點作為下一段的起點）"""
+        points, texts, stats = self._points, self._texts, self.stats
+        if not texts:
+            return
+        if self._mode is None or len(texts) < 2:
+            for text, explicit, has_f in texts:
+                if has_f:
+                    self._out_feed = self._feed
+                yield self._emit_text(text, explicit, True, 1)
+            return
+
+        p0, pk = points[0], points[-1]
+        if self._mode == 'line':
+            dev = max(_line_deviation(p0, pk, q)[0] for q in points[1:-1])
+            if dev > self.options.tolerance:
+                self._mode = None
+                yield from self._flush()
+                return
+            g = '' if self._out_motion == 1 else 'G01 '
+            z = f" Z{self._fmt(pk[2])}" if pk[2] != p0[2] else ''
+            block = f"{g}X{self._fmt(pk[0])} Y{self._fmt(pk[1])}{z}{self._word_f()}"
+            self._out_motion = 1
+            stats.lines += 1
+        else:
+            # 圓心投影到 p0-pk 的中垂線，使起終點半徑一致
+            cx, cy, _ = self._circle
+            mx, my = (p0[0] + pk[0]) / 2, (p0[1] + pk[1]) / 2
+            nx, ny = -(pk[1] - p0[1]), pk[0] - p0[0]
+            nn = nx * nx + ny * ny
+            if nn > 0:
+                s = ((cx - mx) * nx + (cy - my) * ny) / nn
+                cx, cy = mx + s * nx, my + s * ny
+            r = math.hypot(p0[0] - cx, p0[1] - cy)
+            circle = (cx, cy, r)
+            dev = 0.0
+            for a, b in zip(points, points[1:]):
+                dev = max(dev, abs(math.hypot(b[0] - cx, b[1] - cy) - r), self._arc_step(circle, a, b)[1])
+            if dev > self.options.tolerance:
+                self._mode = None
+                yield from self._flush()
+                return
+            code = 3 if self._turn > 0 else 2
+            g = '' if self._out_motion == code else f"G{code:02d} "
+            block = (f"{g}X{self._fmt(pk[0])} Y{self._fmt(pk[1])} "
+                     f"I{self._fmt(cx - p0[0])} J{self._fmt(cy - p0[1])}{self._word_f()}")
+            self._out_motion = code
+            stats.arcs += 1
+        stats.merged += len(texts)
+        stats.max_deviation = max(stats.max_deviation, dev)
+        stats.blocks_out += 1
+        yield block
+
+    def compress(self, lines):
+        """逐行壓縮（輸入行可含換行符，輸出不含）"""
+        stats = self.stats
+        max_points = self.options.max_points
+        position = [0.0, 0.0, 0.0]
+        absolute = True
+        plane_xy = True
+        self._motion = 0
+        self._out_motion = None
+        self._feed = None
+        self._out_feed = None
+        self._reset(tuple(position))
+
+        for raw in lines:
+            text = raw.rstrip('\r\n')
+            stats.blocks_in += 1
+            code = COMMENT.sub('', text) if '(' in text or ';' in text else text
+            words = WORD.findall(code.upper())
+            target = [None, None, None]
+            explicit_motion = has_target = has_f = False
+            mergeable = True
+            for letter, value in words:
+                axis = AXES.get(letter)
+                if axis is not None:
+                    target[axis] = float(value)
+                    has_target = True
+                    continue
+                if letter not in MERGEABLE:
+                    mergeable = False
+                if letter == 'G':
+                    g = float(value)
+                    if g < 4 and g == int(g):
+                        self._motion = int(g)
+                        explicit_motion = True
+                    elif g == 90:
+                        absolute = True
+                    elif g == 91:
+                        absolute = False
+                    elif g == 17:
+                        plane_xy = True
+                    elif g in (18, 19):
+                        plane_xy = False
+                    else:
+                        mergeable = False
+                elif letter == 'F':
+                    feed = float(value)
+                    if self._texts and feed != self._feed:
+                        yield from self._flush()
+                        self._reset(self._points[-1])
+                    self._feed = feed
+                    has_f = True
+
+            if has_target:
+                for k, v in enumerate(target):
+                    if v is not None:
+                        position[k] = v if absolute else position[k] + v
+            end = tuple(position)
+
+            if not (has_target and mergeable and absolute and plane_xy and self._motion == 1
+                    and end != self._points[-1]):
+                yield from self._flush()
+                self._reset(end)
+                if has_f:
+                    self._out_feed = self._feed
+                yield self._emit_text(text, explicit_motion, has_target, self._motion)
+                continue
+
+            if len(self._points) >= max_points or (self._texts and not self._extend(end)):
+                yield from self._flush()
+                self._reset(self._points[-1])
+            self._points.append(end)
+            self._texts.append((text, explicit_motion, has_f))
+
+        yield from self._flush()
+
+
+def compress(lines, options=FitOptions()):
+    """壓縮程式段的產生器（不需要統計時使用）"""
+    return ArcFitter(options).compress(lines)
+
+
+def compress_file(src, dst, options=FitOptions()):
+    """逐批讀寫檔案，返回 FitStats"""
+    fitter = ArcFitter(options)
+    with open(src, encoding='latin-1', newline='') as fin, \
+            open(dst, 'w', encoding='latin-1', newline='\n') as fout:
+        blocks = fitter.compress(fin)
+        while True:
+            chunk = list(islice(blocks, WRITE_CHUNK))
+            if not chunk:
+                return fitter.stats
+            fout.write('\n'.join(chunk))
+            fout.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='G01 圓弧擬合壓縮')
+    parser.add_argument('input', help='輸入 NC 檔')
+    parser.add_argument('output', help='輸出 NC 檔')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='弦偏差公差')
+    parser.add_argument('--max-radius', type=float, default=5000.0, help='大於此半徑視為直線')
+    parser.add_argument('--decimals', type=int, default=4, help='座標小數位數')
+    args = parser.parse_args(argv)
+    try:
+        options = FitOptions(tolerance=args.tolerance, max_radius=args.max_radius, decimals=args.decimals)
+    except InputError as e:
+        parser.error(e.message)
+    print(compress_file(args.input, args.output, options).report())
+
+
+if __name__ == '__main__':
+    main()
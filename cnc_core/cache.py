@@ -0,0 +1,171 @@
+"""
+計算結果共用 LRU 快取
+鍵為正規化的輸入，值包含計算結果與已格式化的顯示文字，
+命中時同時省去計算與字串格式化
+"""
+
+import dataclasses
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from .engine import (
+    ToolInput, compute_tool, BallMillInput, compute_ballmill,
+    BallMillInverseInput, compute_ballmill_inverse, BallMillGridInput, compute_ballmill_grid,
+    HelicalInput, compute_helical, CuttingInput, compute_cutting,
+    AllowanceInput, query_allowance,
+)
+
+DEFAULT_CACHE_SIZE = 256
+FLOAT_DIGITS = 9  # 浮點數正規化的小數位數，消除 0.1+0.2 之類的誤差
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """快取統計"""
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """有界 LRU 快取"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 0:
+            raise ValueError("maxsize 不可為負數")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_compute(self, key, compute):
+        """命中時返回快取值，否則呼叫 compute() 並存入快取"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            if self.maxsize:
+                self._data[key] = value
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def resize(self, maxsize):
+        """調整容量，超出的最舊項目會被移除"""
+        if maxsize < 0:
+            raise ValueError("maxsize 不可為負數")
+        self.maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """清空快取與統計"""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return CacheStats(self.hits, self.misses, len(self._data), self.maxsize)
+
+
+def canonical_value(value):
+    """正規化單一輸入值：數值統一為四捨五入後的 float，字串去除空白"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        value = round(float(value), FLOAT_DIGITS)
+        return value + 0.0  # -0.0 → 0.0
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def canonical_key(inp):
+    """輸入資料類別的正規化鍵"""
+    return (type(inp).__name__,) + tuple(
+        canonical_value(getattr(inp, f.name)) for f in dataclasses.fields(inp))
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """計算結果與已格式化的顯示文字"""
+    result: Any
+    texts: Dict[str, str]
+
+
+def _tool_texts(r):
+    return {'report': r.report()}
+
+
+def _ballmill_texts(r):
+    return {'summary': r.summary(), 'report': r.report()}
+
+
+def _helical_texts(r):
+    return {'angle': r.angle_text, 'safety': r.safety_text, 'suggestion': r.suggestion,
+            'detail': r.detail, 'process': r.process, 'warning': r.warning}
+
+
+def _cutting_texts(r):
+    return {'vc': r.vc_text, 'fz': r.fz_text, 'rpm': r.rpm_text,
+            'feed': r.feed_text, 'life': r.life_text, 'report': r.report()}
+
+
+def _allowance_texts(r):
+    if r is None:
+        return {}
+    return {'rough': r.rough_text, 'semi_finish': r.semi_finish_text,
+            'tool': r.tool_text, 'report': r.report()}
+
+
+# 輸入類別 → (計算函數, 文字格式化函數)
+EVALUATORS = {
+    ToolInput: (compute_tool, _tool_texts),
+    BallMillInput: (compute_ballmill, _ballmill_texts),
+    BallMillInverseInput: (compute_ballmill_inverse, _ballmill_texts),
+    BallMillGridInput: (compute_ballmill_grid, _ballmill_texts),
+    HelicalInput: (compute_helical, _helical_texts),
+    CuttingInput: (compute_cutting, _cutting_texts),
+    AllowanceInput: (lambda inp: query_allowance(inp.material, inp.machining_type), _allowance_texts),
+}
+
+result_cache = ResultCache()
+
+
+def evaluate(inp, cache=None):
+    """經由共用快取計算並格式化結果
+
+    輸入錯誤（InputError）不會被快取，每次都會重新拋出
+    """
+    compute, render = EVALUATORS[type(inp)]
+    cache = result_cache if cache is None else cache
+
+    def run():
+        result = compute(inp)
+        return Evaluation(result, render(result))
+
+    return cache.get_or_compute(canonical_key(inp), run)
+
+
+def set_cache_size(maxsize):
+    """設定共用快取容量（0 表示停用快取）"""
+    result_cache.resize(maxsize)
+
+
+def cache_stats():
+    """共用快取的命中/未命中統計"""
+    return result_cache.stats()
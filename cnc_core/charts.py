@@ -0,0 +1,207 @@
+"""
+切削條件總表（NumPy）
+一次計算 材料 × 加工類型 × VC條件 × fz條件 × 刀具直徑 × 齒數 的全部轉速與進給，
+限制規則與切削條件計算器完全相同：先限制轉速，再以限制後的轉速計算並限制進給
+
+用法: python -m cnc_core.charts [--csv 檔案] [--table] [--material 鋁合金 ...]
+"""
+
+import argparse
+import csv
+import io
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import FEED_LIMITS, LEVELS, MACHINING_TYPES, RPM_LIMITS, InputError
+from .refdata import store
+
+# 預設刀具直徑 (mm) 與齒數
+CHART_DIAMETERS = (0.5, 1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10, 12, 16, 20, 25, 32)
+CHART_TEETH = tuple(range(1, 9))
+
+CSV_HEADER = ('材料', '加工類型', 'VC條件', 'fz條件', '刀具直徑(mm)', '齒數',
+              'VC(m/min)', 'fz(mm/tooth)', '主軸轉速(RPM)', '進給速度(mm/min)',
+              '轉速受限', '進給受限')
+
+
+def level_values(levels, low, high):
+    """依 高/中/低 在範圍內取值，與 pick_level 相同（中 = (low + high) / 2）
+
+    low/high 為任意形狀陣列，返回 shape = low.shape + (len(levels),)
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    table = {"高": high, "中": (low + high) / 2}
+    return np.stack([table.get(level, low) for level in levels], axis=-1)
+
+
+@dataclass
+class CuttingChart:
+    """切削條件總表
+
+    rpm 的 shape = (材料, VC條件, 直徑)；
+    feed 的 shape = (材料, 加工類型, VC條件, fz條件, 直徑, 齒數)
+    """
+    materials: tuple
+    machining_types: tuple
+    vc_levels: tuple
+    fz_levels: tuple
+    diameters: np.ndarray    # (D,) mm
+    teeth: np.ndarray        # (Z,)
+    vc: np.ndarray           # (材料, VC條件) m/min
+    fz: np.ndarray           # (材料, 加工類型, fz條件) mm/tooth
+    rpm: np.ndarray          # 已限制
+    feed: np.ndarray         # 已限制
+    rpm_clamped: np.ndarray  # 轉速是否被限制，shape 同 rpm
+    feed_clamped: np.ndarray  # 進給是否被限制，shape 同 feed
+
+    @property
+    def shape(self):
+        return self.feed.shape
+
+    def lookup(self, material, machining_type, vc_level, fz_level, diameter, teeth):
+        """取單一格的 (rpm, feed)"""
+        m = self.materials.index(material)
+        t = self.machining_types.index(machining_type)
+        v = self.vc_levels.index(vc_level)
+        f = self.fz_levels.index(fz_level)
+        d = int(np.flatnonzero(self.diameters == diameter)[0])
+        z = int(np.flatnonzero(self.teeth == teeth)[0])
+        return self.rpm[m, v, d], self.feed[m, t, v, f, d, z]
+
+    def rows(self):
+        """逐列輸出 CSV_HEADER 對應的資料（依 shape 的順序）"""
+        shape = self.shape
+        M, T, V, F, D, Z = shape
+
+        # 各軸先格式化一次，再廣播成整張表並攤平，避免逐格索引 NumPy 陣列
+        def column(values, axes):
+            index_shape = [1] * len(shape)
+            for axis in axes:
+                index_shape[axis] = shape[axis]
+            table = np.asarray(values, dtype=object).reshape(index_shape)
+            return np.broadcast_to(table, shape).ravel().tolist()
+
+        fmt = np.vectorize(lambda x, spec: format(x, spec), otypes=[object])
+        columns = (
+            column(self.materials, (0,)),
+            column(self.machining_types, (1,)),
+            column(self.vc_levels, (2,)),
+            column(self.fz_levels, (3,)),
+            column(fmt(self.diameters, 'g'), (4,)),
+            column(self.teeth.tolist(), (5,)),
+            column(fmt(self.vc, '.0f'), (0, 2)),
+            column(fmt(self.fz, '.3f'), (0, 1, 3)),
+            column(fmt(self.rpm, '.0f'), (0, 2, 4)),
+            fmt(self.feed, '.0f').ravel().tolist(),
+            column(self.rpm_clamped.astype(int), (0, 2, 4)),
+            self.feed_clamped.astype(int).ravel().tolist(),
+        )
+        return zip(*columns)
+
+    def write_csv(self, file):
+        """寫出 CSV；file 為路徑或文字檔物件"""
+        if isinstance(file, str):
+            with open(file, 'w', newline='', encoding='utf-8-sig') as f:  # BOM 讓 Excel 正確顯示中文
+                return self.write_csv(f)
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(self.rows())
+
+    def to_csv(self):
+        buf = io.StringIO()
+        self.write_csv(buf)
+        return buf.getvalue()
+
+    def table(self, material, machining_type, vc_level='中', fz_level='中'):
+        """可列印的對照表：每列一個刀具直徑，每欄一個齒數的進給 (mm/min)
+
+        標示 * 的數值已被安全限制截斷
+        """
+        m = self.materials.index(material)
+        t = self.machining_types.index(machining_type)
+        v = self.vc_levels.index(vc_level)
+        f = self.fz_levels.index(fz_level)
+
+        lines = [f"{material} {machining_type}  VC條件: {vc_level} (VC = {self.vc[m, v]:.0f} m/min)  "
+                 f"fz條件: {fz_level} (fz = {self.fz[m, t, f]:.3f} mm/tooth)"]
+        header = f"{'D (mm)':>8} {'RPM':>7} |" + ''.join(f"{f'Z={z}':>8}" for z in self.teeth)
+        lines += [header, '-' * len(header)]
+        for d, diameter in enumerate(self.diameters):
+            rpm = f"{self.rpm[m, v, d]:.0f}" + ('*' if self.rpm_clamped[m, v, d] else ' ')
+            cells = ''.join(
+                f"{self.feed[m, t, v, f, d, z]:>7.0f}" + ('*' if self.feed_clamped[m, t, v, f, d, z] else ' ')
+                for z in range(len(self.teeth)))
+            lines.append(f"{diameter:>8g} {rpm:>7} |{cells}")
+        lines.append(f"* 已套用安全限制（轉速 {RPM_LIMITS[0]}-{RPM_LIMITS[1]} RPM，"
+                     f"進給 {FEED_LIMITS[0]}-{FEED_LIMITS[1]} mm/min）")
+        return '\n'.join(lines)
+
+    def tables(self):
+        """全部組合的對照表"""
+        return '\n\n'.join(
+            self.table(material, machining_type, vc_level, fz_level)
+            for material in self.materials for machining_type in self.machining_types
+            for vc_level in self.vc_levels for fz_level in self.fz_levels)
+
+
+def cutting_chart(materials=None, diameters=CHART_DIAMETERS, teeth=CHART_TEETH,
+                  machining_types=MACHINING_TYPES, vc_levels=LEVELS, fz_levels=LEVELS):
+    """計算切削條件總表（materials 預設為全部材料）"""
+    data = store()
+    materials = tuple(data.material_names() if materials is None else materials)
+    params = []
+    for name in materials:
+        p = data.material(name)
+        if p is None:
+            raise InputError(f"錯誤: 未知材料 {name}")
+        params.append(p)
+
+    diameters = np.asarray(diameters, dtype=np.float64).ravel()
+    teeth = np.asarray(teeth, dtype=np.int64).ravel()
+    if (diameters <= 0).any():
+        raise InputError("錯誤: 刀具直徑必須大於0")
+    if (teeth <= 0).any():
+        raise InputError("錯誤: 刀具齒數必須大於0")
+
+    # 粗加工使用 fz_rough，其餘（精加工）使用 fz_finish
+    vc_range = np.array([p.vc_range for p in params], dtype=np.float64)
+    fz_range = np.array([[p.fz_rough if t == "粗加工" else p.fz_finish for t in machining_types]
+                         for p in params], dtype=np.float64).reshape(len(params), len(machining_types), 2)
+    vc = level_values(vc_levels, vc_range[:, 0], vc_range[:, 1])          # (M, V)
+    fz = level_values(fz_levels, fz_range[..., 0], fz_range[..., 1])      # (M, T, F)
+
+    # 運算順序與 spindle_speed / feed_rate 相同，結果逐位元一致
+    raw_rpm = (vc[:, :, None] * 1000) / (np.pi * diameters)               # (M, V, D)
+    rpm = np.clip(raw_rpm, *RPM_LIMITS)
+    raw_feed = (rpm[:, None, :, None, :, None] * teeth) * fz[:, :, None, :, None, None]
+    feed = np.clip(raw_feed, *FEED_LIMITS)                                # (M, T, V, F, D, Z)
+
+    return CuttingChart(materials, tuple(machining_types), tuple(vc_levels), tuple(fz_levels),
+                        diameters, teeth, vc, fz, rpm, feed, rpm != raw_rpm, feed != raw_feed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='匯出切削條件總表')
+    parser.add_argument('--material', nargs='+', help='材料（預設全部）')
+    parser.add_argument('--csv', help='CSV 輸出路徑（"-" 為標準輸出）')
+    parser.add_argument('--table', action='store_true', help='輸出可列印的對照表')
+    args = parser.parse_args(argv)
+
+    try:
+        chart = cutting_chart(args.material)
+    except InputError as e:
+        parser.error(e.message)
+    if args.csv == '-':
+        chart.write_csv(sys.stdout)
+    elif args.csv:
+        chart.write_csv(args.csv)
+        print(f"已匯出 {chart.feed.size} 筆切削條件: {args.csv}")
+    if args.table or not args.csv:
+        print(chart.tables())
+
+
+if __name__ == '__main__':
+    main()
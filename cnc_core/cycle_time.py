@@ -0,0 +1,179 @@
+"""
+加工週期時間估算（NumPy）
+依機台的進給上限、快速移動速度與加速度，以梯形速度曲線計算每段移動的時間：
+    1. 每段的巡航速度 = min(程式進給, 進給上限)，圓弧另受向心加速度 √(a·r) 限制
+    2. 轉角速度依轉角偏差模型 v² = a·δ·sin(θ/2) / (1 - sin(θ/2))
+    3. 前向/後向遞推 v² ≤ v_prev² + 2aL（以累積最小值向量化）
+    4. 每段依進出速度計算梯形或三角形速度曲線的時間
+另依刀具與工序分別統計，換刀時間另計
+"""
+
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+from .machine import DEFAULT_MACHINE, MACHINE_PROFILES
+from .toolpath import ARC_CW, ARC_CCW, RAPID, parse_file, parse_gcode
+
+
+@dataclass
+class CycleTime:
+    """週期時間估算結果（時間單位：秒）"""
+    machine: str
+    move_time: np.ndarray          # (n,) 每段移動時間
+    length: np.ndarray             # (n,) 每段長度 mm
+    rapid_time: float
+    cut_time: float
+    tool_change_time: float
+    by_tool: dict                  # {刀號: 秒}
+    by_operation: dict             # {工序: 秒}
+
+    @property
+    def total(self):
+        return self.rapid_time + self.cut_time + self.tool_change_time
+
+    def report(self):
+        lines = [
+            f"機台: {self.machine}",
+            f"移動段數: {len(self.move_time)}，路徑長度 {self.length.sum() / 1000:.2f} m",
+            f"總時間: {_hms(self.total)}",
+            f"• 切削: {_hms(self.cut_time)}",
+            f"• 快速移動: {_hms(self.rapid_time)}",
+            f"• 換刀: {_hms(self.tool_change_time)}",
+            "",
+            "各刀具:",
+        ]
+        lines += [f"• T{tool}: {_hms(t)}" if tool is not None else f"• (換刀前): {_hms(t)}"
+                  for tool, t in self.by_tool.items()]
+        lines += ["", "各工序:"]
+        lines += [f"• {name}: {_hms(t)}" for name, t in self.by_operation.items()]
+        return '\n'.join(lines)
+
+
+def _hms(seconds):
+    minutes, sec = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}:{minutes:02d}:{sec:04.1f}"
+
+
+def move_geometry(moves):
+    """每段的長度、起點/終點切線方向與圓弧半徑（直線半徑為 inf）"""
+    delta = moves.end - moves.start
+    length = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        direction = delta / length[:, None]
+    direction = np.nan_to_num(direction)
+    start_dir = direction.copy()
+    end_dir = direction.copy()
+    radius = np.full(len(moves), np.inf)
+
+    arc = (moves.kind == ARC_CW) | (moves.kind == ARC_CCW)
+    if arc.any():
+        start, end, center = moves.start[arc], moves.end[arc], moves.center[arc]
+        v0 = start[:, :2] - center
+        v1 = end[:, :2] - center
+        r = np.hypot(v0[:, 0], v0[:, 1])
+        cw = moves.kind[arc] == ARC_CW
+        # 掃掠角（逆時針為正）；起終點重合為整圓
+        sweep = np.arctan2(v0[:, 0] * v1[:, 1] - v0[:, 1] * v1[:, 0], np.einsum('ij,ij->i', v0, v1))
+        sweep = np.where(cw, -sweep, sweep)
+        sweep = np.where(sweep <= 1e-9, sweep + 2 * np.pi, sweep)
+        dz = end[:, 2] - start[:, 2]
+        length[arc] = np.hypot(r * sweep, dz)
+        radius[arc] = r
+
+        # 切線方向：逆時針為 (-y, x)，順時針為 (y, -x)
+        sign = np.where(cw, -1.0, 1.0)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pitch = dz / length[arc]
+            scale = np.sqrt(np.maximum(1 - pitch * pitch, 0)) / r
+        for dirs, v in ((start_dir, v0), (end_dir, v1)):
+            t = np.empty((len(v), 3))
+            t[:, :2] = sign * np.stack([-v[:, 1], v[:, 0]], axis=1) * scale[:, None]
+            t[:, 2] = pitch
+            dirs[arc] = np.nan_to_num(t)
+    return length, start_dir, end_dir, radius
+
+
+def _forward_limit(cap_sq, gain):
+    """u[0] = cap[0]，u[i+1] = min(cap[i+1], u[i] + gain[i]) 的向量化解（最小加法遞推）"""
+    offset = np.concatenate(([0.0], np.cumsum(gain)))
+    return np.minimum.accumulate(cap_sq - offset) + offset
+
+
+def estimate(moves, machine=DEFAULT_MACHINE):
+    """估算 Moves 的加工時間"""
+    n = len(moves)
+    a = machine.accel
+    length, start_dir, end_dir, radius = move_geometry(moves)
+
+    # 巡航速度 mm/s
+    rapid = moves.kind == RAPID
+    feed = np.where(rapid, machine.rapid, np.minimum(np.nan_to_num(moves.feed), machine.max_feed)) / 60
+    feed = np.minimum(feed, np.sqrt(a * radius))          # 圓弧向心加速度限制
+    feed = np.where(feed > 0, feed, machine.max_feed / 60)  # 未指定進給時以上限計
+
+    # 轉角速度（第 i 個接點位於第 i-1 段與第 i 段之間）
+    junction = np.zeros(n + 1)
+    if n > 1:
+        cos_theta = -np.einsum('ij,ij->i', end_dir[:-1], start_dir[1:])
+        sin_half = np.sqrt(np.clip((1 - cos_theta) / 2, 0, 1))
+        with np.errstate(divide='ignore'):
+            v_corner = np.sqrt(a * machine.junction_deviation * sin_half / (1 - sin_half))
+        connected = np.all(moves.end[:-1] == moves.start[1:], axis=1)
+        junction[1:-1] = np.where(connected, np.minimum(np.minimum(feed[:-1], feed[1:]), v_corner), 0)
+
+    # 前向與後向加速度限制（以速度平方計算）
+    gain = 2 * a * length
+    cap = junction ** 2
+    cap = np.minimum(cap, _forward_limit(cap, gain))
+    cap = np.minimum(cap, _forward_limit(cap[::-1], gain[::-1])[::-1])
+    v_in, v_out = np.sqrt(cap[:-1]), np.sqrt(cap[1:])
+
+    # 梯形/三角形速度曲線
+    accel_dist = (feed ** 2 - v_in ** 2) / (2 * a)
+    decel_dist = (feed ** 2 - v_out ** 2) / (2 * a)
+    cruise = length - accel_dist - decel_dist
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trapezoid = (feed - v_in) / a + (feed - v_out) / a + cruise / feed
+        peak = np.sqrt(np.maximum((2 * a * length + v_in ** 2 + v_out ** 2) / 2, 0))
+        triangle = (peak - v_in) / a + (peak - v_out) / a
+    move_time = np.where(cruise >= 0, trapezoid, triangle)
+    move_time = np.where(length > 0, move_time, 0.0)
+
+    by_tool_time = np.bincount(moves.tool, weights=move_time, minlength=len(moves.tools))
+    by_op_time = np.bincount(moves.operation, weights=move_time, minlength=len(moves.operations))
+    return CycleTime(
+        machine=machine.name,
+        move_time=move_time,
+        length=length,
+        rapid_time=float(move_time[rapid].sum()),
+        cut_time=float(move_time[~rapid].sum()),
+        tool_change_time=moves.tool_changes * machine.tool_change,
+        by_tool={tool: float(t) for tool, t in zip(moves.tools, by_tool_time) if t > 0},
+        by_operation={name: float(t) for name, t in zip(moves.operations, by_op_time) if t > 0},
+    )
+
+
+def estimate_program(lines, machine=DEFAULT_MACHINE, operation_pattern=None):
+    """解析並估算 G 代碼（例如 helix.program_blocks 或 ramp.ramp_moves 的輸出）"""
+    return estimate(parse_gcode(lines, operation_pattern), machine)
+
+
+def estimate_file(path, machine=DEFAULT_MACHINE, operation_pattern=None):
+    """解析並估算 NC 檔"""
+    return estimate(parse_file(path, operation_pattern), machine)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='估算 NC 程式的加工時間')
+    parser.add_argument('path', help='NC 檔')
+    parser.add_argument('--machine', choices=list(MACHINE_PROFILES), default=DEFAULT_MACHINE.name)
+    parser.add_argument('--operations', help='工序註解的正規表示式（預設為所有獨立註解）')
+    args = parser.parse_args(argv)
+    print(estimate_file(args.path, MACHINE_PROFILES[args.machine], args.operations).report())
+
+
+if __name__ == '__main__':
+    main()
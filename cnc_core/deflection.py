@@ -0,0 +1,196 @@
+"""
+刀具庫批次伸長計算（懸臂樑撓度模型的向量化版本）
+與 engine.compute_tool 使用相同的公式與常數（切削力、Kienzle kc、剛性與撓度直接以 NumPy 陣列呼叫 engine 的函式）：
+    F = kc·ap·h·max(1, z·φ/2π)·sqrt(1 + (Fr/Ft)²)，h = fz·sin(min(φ, 90°))
+    δ = F·L³/(3·E·I) + F/k，I = π·(0.8D)⁴/64
+一次呼叫即可計算整個刀具庫（數千把刀）的最長伸長、建議伸長與撓度。
+
+刀具表 CSV 欄位：刀號, 直徑, 刀具材料, 刃數, 轉速, 進給, 切深[, 切寬[, 工件材料]]（第一列可為標題），
+工件材料空白時以 --kc 估算切削力
+
+用法: python -m cnc_core.deflection 刀具表.csv [--limit 0.05] [--kc 2000] [--output 結果.csv]
+"""
+
+import argparse
+import csv
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import numpy as np
+
+from . import engine
+from .engine import (
+    DEFAULT_KC, DEFLECTION_LIMIT, HOLDER_STIFFNESS, MAX_LD, TOOL_MODULUS, InputError,
+    _bending_stiffness, tool_deflection,
+)
+from .refdata import store
+
+# engine 公式的 NumPy 版本數學函數
+ARRAY_OPS = SimpleNamespace(acos=np.arccos, sin=np.sin, minimum=np.minimum, maximum=np.maximum)
+
+
+@dataclass
+class CribSizing:
+    """刀具庫計算結果（每把刀一個元素）"""
+    tool: np.ndarray
+    diameter: np.ndarray
+    force: np.ndarray            # 刀尖合力 N
+    max_length: np.ndarray       # 撓度上限內的最長伸長 mm
+    length: np.ndarray           # 建議伸長 mm
+    deflection: np.ndarray       # 建議伸長下的撓度 mm
+    limit: float
+
+    def __len__(self):
+        return len(self.tool)
+
+    @property
+    def exceeded(self):
+        """所需伸長下撓度仍超限的刀具"""
+        return self.deflection > self.limit * (1 + 1e-9)
+
+    def report(self, rows=20):
+        over = self.exceeded
+        lines = [f"刀具 {len(self):,} 把，撓度上限 {self.limit * 1000:.0f} μm，"
+                 f"超限 {int(over.sum())} 把"]
+        # 先列出超限的刀具，再依最長伸長由短到長
+        order = np.lexsort((self.max_length, ~over))[:rows]
+        for i in order:
+            mark = "（超限）" if over[i] else ""
+            lines.append(
+                f"• T{self.tool[i]} D{self.diameter[i]:g}：切削力 {self.force[i]:.0f} N，"
+                f"最長 {self.max_length[i]:.1f} mm，建議 {self.length[i]:.1f} mm，"
+                f"撓度 {self.deflection[i] * 1000:.1f} μm{mark}")
+        if len(self) > rows:
+            lines.append(f"…其餘 {len(self) - rows:,} 把")
+        return '\n'.join(lines)
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('刀號', '直徑', '切削力N', '最長伸長', '建議伸長', '撓度mm'))
+            for row in zip(self.tool, self.diameter, self.force, self.max_length,
+                           self.length, self.deflection):
+                writer.writerow((row[0], f"{row[1]:g}", f"{row[2]:.1f}", f"{row[3]:.2f}",
+                                 f"{row[4]:.2f}", f"{row[5]:.4f}"))
+
+
+def modulus_of(materials):
+    """刀具材料名稱陣列轉為彈性模數 N/mm²（未知材料視為碳化鎢，與 compute_tool 相同）"""
+    names, inverse = np.unique(np.asarray(materials, dtype=str), return_inverse=True)
+    table = np.array([TOOL_MODULUS.get(n, TOOL_MODULUS["碳化鎢"]) for n in names], dtype=np.float64)
+    return table[inverse]
+
+
+def cutting_force(diameter, teeth, fz, depth, width=None, kc=DEFAULT_KC):
+    """刀尖合力 N（以陣列呼叫 engine.cutting_force）"""
+    return engine.cutting_force(np.asarray(diameter, dtype=np.float64), teeth, fz, depth,
+                                width, kc, ARRAY_OPS)
+
+
+def workpiece_kc(workpiece, fz, diameter, width=None, default=DEFAULT_KC):
+    """各列工件材料的 Kienzle 比切削力 N/mm²（以陣列呼叫 engine.workpiece_kc），空字串的列為 default"""
+    diameter = np.asarray(diameter, dtype=np.float64)
+    names, inverse = np.unique(np.asarray(workpiece, dtype=str), return_inverse=True)
+    table = []
+    for name in names:
+        params = store().material(name) if name else None
+        if name and params is None:
+            raise InputError(f"錯誤: 未知材料 {name}")
+        table.append((params.kc, params.mc) if params else (np.nan, 0.0))
+    kc, mc = np.array(table).T[:, inverse.ravel()]
+    kienzle = engine.workpiece_kc(SimpleNamespace(kc=kc, mc=mc), fz, diameter, width, ARRAY_OPS)
+    return np.where(np.isnan(kc), default, kienzle)
+
+
+def max_stick_out(diameter, modulus, force, limit=DEFLECTION_LIMIT, holder=HOLDER_STIFFNESS):
+    """撓度不超過 limit 的最長伸長 mm；刀把變形已超過 limit 時為 0
+
+    engine.max_stick_out 以純量判斷分支，此為向量版本（剛性與撓度公式直接使用 engine 的函式）
+    """
+    force = np.asarray(force, dtype=np.float64)
+    room = np.maximum(limit - force / holder, 0.0)
+    with np.errstate(divide='ignore'):
+        return np.cbrt(_bending_stiffness(diameter, modulus) * room / force)
+
+
+def size_crib(diameter, material, teeth, speed, feed, depth, width=None, tool=None,
+              limit=DEFLECTION_LIMIT, holder=HOLDER_STIFFNESS, kc=DEFAULT_KC, workpiece=None):
+    """整個刀具庫的伸長計算；各參數為等長陣列（或可廣播的純量），width 中的 NaN 視為全槽，
+    workpiece 為工件材料（空字串或 None 時以 kc 估算）"""
+    diameter = np.asarray(diameter, dtype=np.float64)
+    teeth = np.asarray(teeth, dtype=np.float64)
+    speed = np.asarray(speed, dtype=np.float64)
+    feed = np.asarray(feed, dtype=np.float64)
+    depth = np.asarray(depth, dtype=np.float64)
+    if limit <= 0 or not all(np.all(a > 0) for a in (diameter, teeth, speed, feed, depth)):
+        raise InputError("錯誤：請輸入有效的正數")
+    if np.any(depth > diameter * 2):
+        raise InputError("警告：切削深度可能過大\n建議不超過刀具直徑的2倍")
+    if width is not None:
+        width = np.asarray(width, dtype=np.float64)
+        width = np.where(np.isnan(width), diameter, width)
+        if np.any(width <= 0):
+            raise InputError("錯誤：請輸入有效的正數")
+
+    n = np.broadcast(diameter, teeth, speed, feed, depth).size
+    modulus = modulus_of(np.broadcast_to(np.asarray(material, dtype=str), (n,)))
+    fz = feed / (speed * teeth)
+    if workpiece is not None:
+        kc = workpiece_kc(np.broadcast_to(np.asarray(workpiece, dtype=str), (n,)),
+                          fz, diameter, width, kc)
+    force = cutting_force(diameter, teeth, fz, depth, width, kc)
+    max_length = max_stick_out(diameter, modulus, force, limit, holder)
+    required = np.maximum(diameter * 1.5, depth + diameter / 2)
+    length = np.maximum(required, np.minimum(diameter * MAX_LD, max_length))
+    deflection = tool_deflection(length, diameter, modulus, force, holder)
+    tool = np.arange(1, n + 1) if tool is None else np.asarray(tool)
+    return CribSizing(tool, np.broadcast_to(diameter, (n,)), force, max_length,
+                      length, deflection, limit)
+
+
+def read_crib(path):
+    """讀取刀具表 CSV，返回 size_crib 的關鍵字參數"""
+    columns = tuple([] for _ in range(9))
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                values = (int(row[0]), float(row[1]), row[2].strip(), int(row[3]),
+                          float(row[4]), float(row[5]), float(row[6]),
+                          float(row[7]) if len(row) > 7 and row[7].strip() else np.nan,
+                          row[8].strip() if len(row) > 8 else '')
+            except (ValueError, IndexError):
+                if line == 1:
+                    continue  # 標題列
+                raise InputError(f'錯誤：刀具表第 {line} 列格式不正確: {",".join(row)}')
+            for column, value in zip(columns, values):
+                column.append(value)
+    if not columns[0]:
+        raise InputError("錯誤：刀具表沒有資料")
+    tool, diameter, material, teeth, speed, feed, depth, width, workpiece = columns
+    return dict(tool=np.array(tool), diameter=diameter, material=material, teeth=teeth,
+                speed=speed, feed=feed, depth=depth, width=width, workpiece=workpiece)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='刀具庫批次伸長計算（懸臂樑撓度）')
+    parser.add_argument('crib', help='刀具表 CSV（刀號, 直徑, 刀具材料, 刃數, 轉速, 進給, 切深[, 切寬[, 工件材料]]）')
+    parser.add_argument('--limit', type=float, default=DEFLECTION_LIMIT, help='允許撓度 mm')
+    parser.add_argument('--holder', type=float, default=HOLDER_STIFFNESS, help='刀把徑向剛性 N/mm')
+    parser.add_argument('--kc', type=float, default=DEFAULT_KC, help='未指定工件材料時的比切削力 N/mm²')
+    parser.add_argument('--output', help='結果 CSV')
+    parser.add_argument('--rows', type=int, default=20, help='報告列出的刀具數')
+    args = parser.parse_args(argv)
+    try:
+        result = size_crib(limit=args.limit, holder=args.holder, kc=args.kc, **read_crib(args.crib))
+    except InputError as e:
+        parser.error(e.message)
+    print(result.report(args.rows))
+    if args.output:
+        result.write_csv(args.output)
+        print(f"已寫入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1032 @@
+"""
+CNC加工工具包 計算核心
+不依賴 Kivy 與字體設定，可直接供腳本、測試與批次作業導入
+"""
+
+import math
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Optional, Tuple
+
+from .refdata import AllowanceDataView, MaterialParamsView, ReferenceStepView, store
+
+# 安全限制（與切削條件計算器相同）
+RPM_LIMITS = (100, 20000)   # 主軸轉速 RPM
+FEED_LIMITS = (10, 5000)    # 進給速度 mm/min
+
+# 功率換算扭力：T (N·m) = P (kW) × 60000 / (2π·n)
+TORQUE_FACTOR = 60000 / (2 * math.pi)
+
+# 刀具材料係數
+TOOL_MATERIAL_FACTOR = {"碳化鎢": 1.0, "高速鋼": 0.7, "陶瓷": 1.3}
+
+# 參考數據（材料參數、球刀參考步距、預留量）存於 data/refdata.bin，
+# 以下為與舊版字典相容的唯讀視圖，首次查詢時才載入
+# 球刀參考步距對照表 {直徑: 步距}
+REFERENCE_STEP_DATA = ReferenceStepView()
+
+# 材料參數表 {材料: {"vc_range", "fz_rough", "fz_finish", "kc", "mc", "taylor_c", "taylor_n"}}
+MATERIAL_PARAMS = MaterialParamsView()
+
+# 預留量數據 {材料: {加工類型: {"rough", "semi_finish", "tool", "notes"}}}
+ALLOWANCE_DATA = AllowanceDataView()
+
+MILLING_TYPES = ('內徑螺旋銑', '外徑螺旋銑', '爬坡銑')
+LEVELS = ('高', '中', '低')
+MACHINING_TYPES = ('粗加工', '精加工')
+
+# 表面質量分級：(殘餘高度上限 μm, 名稱, 顏色)
+SCALLOP_QUALITY = (
+    (10, "優良", (0, 0.7, 0, 1)),
+    (20, "良好", (0.2, 0.5, 0.2, 1)),
+    (30, "一般", (1, 0.6, 0, 1)),
+    (None, "較差", (1, 0, 0, 1)),
+)
+
+
+class InputError(ValueError):
+    """輸入驗證錯誤：message 為主訊息，detail 為補充說明"""
+
+    def __init__(self, message, detail=''):
+        super().__init__(message)
+        self.message = message
+        self.detail = detail
+
+
+def clamp(value, limits):
+    """將數值限制在 (下限, 上限) 之內"""
+    return max(limits[0], min(limits[1], value))
+
+
+def pick_level(level, low, high):
+    """根據 高/中/低 條件在範圍內取值"""
+    if level == "高":
+        return high
+    elif level == "中":
+        return (low + high) / 2
+    return low
+
+
+def scallop_height(diameter, step):
+    """球刀殘餘高度 h = R - sqrt(R² - (P/2)²)"""
+    R = diameter / 2
+    if step / 2 >= R:
+        return R  # 步距過大，殘餘高度等於半徑
+    # 使用 max(0, ...) 避免浮點誤差造成負數
+    return R - math.sqrt(max(0, R**2 - (step / 2)**2))
+
+
+def max_step_for_height(diameter, height):
+    """殘餘高度反算最大步距 P = 2·sqrt(R² - (R-h)²) = 2·sqrt(h·(2R-h))
+
+    h >= R 時任何小於直徑的步距皆可，返回直徑作為上限
+    """
+    if diameter <= 0:
+        raise InputError("錯誤：直徑必須大於0", "請輸入大於0的刀具直徑")
+    if height <= 0:
+        raise InputError("錯誤：目標殘餘高度必須大於0", "請輸入大於0的殘餘高度")
+    R = diameter / 2
+    if height >= R:
+        return diameter
+    return 2 * math.sqrt(height * (2 * R - height))
+
+
+def quality_height_limit(quality):
+    """表面質量等級的殘餘高度上限 (mm)"""
+    for limit, name, _ in SCALLOP_QUALITY:
+        if name == quality:
+            if limit is None:
+                raise InputError(f"錯誤：{quality} 沒有殘餘高度上限")
+            return limit / 1000
+    raise InputError(f"錯誤：未知表面質量 {quality}")
+
+
+def max_step_for_quality(diameter, quality):
+    """保持表面質量等級的最大步距（殘餘高度達到該等級上限時的步距）"""
+    return max_step_for_height(diameter, quality_height_limit(quality))
+
+
+def scallop_quality(h):
+    """根據殘餘高度 (mm) 評估表面質量，返回 (名稱, 顏色)"""
+    h_um = h * 1000
+    for limit, name, color in SCALLOP_QUALITY:
+        if limit is None or h_um < limit:
+            return name, color
+
+
+def reference_step(diameter):
+    """根據直徑獲取參考步距（取最接近的標準直徑，等距時取較小者），無法解析時返回 None"""
+    try:
+        diameter_val = float(diameter)
+    except (TypeError, ValueError):
+        return None
+    return store().nearest_reference_step(diameter_val)
+
+
+def min_hole_diameter(tool_dia):
+    """最小加工孔徑，經驗公式：刀具直徑 × 1.2"""
+    return tool_dia * 1.2
+
+
+# 各銑削類型評估為「安全」的斜坡角度區間 [下限, 上限) 度
+SAFE_ANGLE_BANDS = {
+    '內徑螺旋銑': (15, 30),
+    '外徑螺旋銑': (5, 15),
+    '爬坡銑': (3, 8),
+}
+
+
+def safety_assessment(milling_type, angle_deg):
+    """根據銑削類型和角度獲取安全評估，返回 (評估, 顏色, 建議)"""
+    safe_low, safe_high = SAFE_ANGLE_BANDS.get(milling_type, SAFE_ANGLE_BANDS['爬坡銑'])
+    if milling_type == '內徑螺旋銑':
+        if angle_deg < 5:
+            return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
+        elif angle_deg < safe_low:
+            return "偏小", (0, 0.5, 1, 1), "建議：角度稍小，可提高效率"
+        elif angle_deg < safe_high:
+            return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
+        elif angle_deg < 45:
+            return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具負荷"
+        else:
+            return "危險", (1, 0, 0, 1), "建議：角度過大，建議分層加工"
+
+    elif milling_type == '外徑螺旋銑':
+        if angle_deg < safe_low:
+            return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
+        elif angle_deg < safe_high:
+            return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
+        elif angle_deg < 30:
+            return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具側向力"
+        elif angle_deg < 45:
+            return "危險", (1, 0.5, 0, 1), "建議：角度過大，需分層加工"
+        else:
+            return "極危險", (1, 0, 0, 1), "建議：角度過大，不建議使用"
+
+    else:  # 爬坡銑
+        if angle_deg < safe_low:
+            return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
+        elif angle_deg < safe_high:
+            return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
+        elif angle_deg < 15:
+            return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具負荷"
+        elif angle_deg < 20:
+            return "危險", (1, 0.5, 0, 1), "建議：角度過大，建議減小深度"
+        else:
+            return "極危險", (1, 0, 0, 1), "建議：角度過大，不建議使用"
+
+
+# ---------------------------------------------------------------------------
+# 刀具伸長
+# ---------------------------------------------------------------------------
+
+# 懸臂樑撓度模型 δ = F·L³/(3·E·I) + F/k（刀具彎曲 + 刀把/主軸徑向變形）
+TOOL_MODULUS = {"碳化鎢": 600e3, "高速鋼": 210e3, "陶瓷": 380e3}   # 彈性模數 N/mm²
+FLUTE_CORE_RATIO = 0.8      # 刃部等效直徑 / 刀具直徑（排屑槽使截面減小）
+HOLDER_STIFFNESS = 50e3     # 刀把與主軸的徑向剛性 N/mm
+DEFLECTION_LIMIT = 0.05     # 允許的刀尖撓度 mm
+DEFAULT_KC = 2000           # 未指定工件材料時的比切削力 N/mm²（以鋼材保守估計）
+DEFAULT_TEETH = 4
+RADIAL_FORCE_RATIO = 0.4    # 徑向力 / 切線力
+MAX_LD = 5                  # 建議伸長上限（倍直徑）
+
+# 切入角、切屑厚度與切削力公式使用的數學函數；deflection 以 NumPy 版本呼叫同一組公式
+SCALAR_OPS = SimpleNamespace(acos=math.acos, sin=math.sin, minimum=min, maximum=max)
+
+
+def engagement_angle(diameter, width, ops=SCALAR_OPS):
+    """徑向切寬 ae 對應的切入角 φ（弧度），ae >= D 時為 π（全槽）"""
+    return ops.acos(1 - 2 * ops.minimum(width, diameter) / diameter)
+
+
+def cutting_force(diameter, teeth, fz, depth, width=None, kc=DEFAULT_KC, ops=SCALAR_OPS):
+    """刀尖合力 N：最大切屑厚度 h = fz·sin(min(φ, 90°))，同時切削刃數至少 1，
+
+    F = kc·ap·h·max(1, z·φ/2π)·sqrt(1 + (Fr/Ft)²)
+    """
+    width = diameter if width is None else width
+    phi = engagement_angle(diameter, width, ops)
+    h = fz * ops.sin(ops.minimum(phi, math.pi / 2))
+    engaged = ops.maximum(1.0, teeth * phi / (2 * math.pi))
+    return kc * depth * h * engaged * math.hypot(1, RADIAL_FORCE_RATIO)
+
+
+def workpiece_kc(params, fz, diameter, width=None, ops=SCALAR_OPS):
+    """工件材料在平均切屑厚度下的 Kienzle 比切削力 N/mm²（與主軸負載、MRR 最佳化相同）"""
+    width = diameter if width is None else width
+    return specific_cutting_force(params.kc, params.mc, mean_chip_thickness(fz, diameter, width, ops))
+
+
+def _bending_stiffness(diameter, modulus):
+    """3·E·I，I = π·d⁴/64（d 為刃部等效直徑）"""
+    return 3 * modulus * math.pi * (diameter * FLUTE_CORE_RATIO) ** 4 / 64
+
+
+def tool_deflection(length, diameter, modulus, force, holder=HOLDER_STIFFNESS):
+    """伸長 length 時的刀尖撓度 mm"""
+    return force * length ** 3 / _bending_stiffness(diameter, modulus) + force / holder
+
+
+def max_stick_out(diameter, modulus, force, limit=DEFLECTION_LIMIT, holder=HOLDER_STIFFNESS):
+    """撓度不超過 limit 的最長伸長 mm；刀把變形已超過 limit 時返回 0"""
+    room = limit - force / holder
+    if room <= 0:
+        return 0.0
+    if force <= 0:
+        return math.inf
+    return (_bending_stiffness(diameter, modulus) * room / force) ** (1 / 3)
+
+
+@dataclass(frozen=True)
+class ToolInput:
+    """刀具伸長計算輸入"""
+    diameter: float          # 刀具直徑 mm
+    material: str            # 刀具材料
+    speed: float             # 主軸轉速 RPM
+    feed: float              # 進給速度 mm/min
+    depth: float             # 切削深度 mm
+    teeth: int = DEFAULT_TEETH
+    width: Optional[float] = None          # 徑向切寬 ae mm，None 為全槽
+    limit: float = DEFLECTION_LIMIT        # 允許撓度 mm
+    workpiece: Optional[str] = None        # 工件材料，None 時以 DEFAULT_KC 估算切削力
+
+
+@dataclass(frozen=True)
+class ToolResult:
+    """刀具伸長計算結果"""
+    diameter: float
+    optimal_length: float
+    ld_ratio: float
+    suggested_speed: int
+    suggested_feed: int
+    force: float = 0.0           # 刀尖合力 N
+    max_length: float = 0.0      # 撓度上限內的最長伸長 mm
+    deflection: float = 0.0      # 建議伸長下的刀尖撓度 mm
+    limit: float = DEFLECTION_LIMIT
+    kc: float = DEFAULT_KC       # 比切削力 N/mm²
+
+    @property
+    def within_limit(self):
+        return self.deflection <= self.limit * (1 + 1e-9)
+
+    def report(self):
+        if self.within_limit:
+            check = f"撓度上限內最長伸長: {self.max_length:.1f} mm"
+        else:
+            check = (f"警告：所需伸長下撓度超過 {self.limit * 1000:.0f} μm，"
+                     f"已降低建議進給")
+        return f"""計算結果：
+刀具直徑: {self.diameter} mm
+最佳伸長: {self.optimal_length:.1f} mm
+L/D比值: {self.ld_ratio:.2f}
+比切削力: {self.kc:.0f} N/mm²
+切削力: {self.force:.0f} N
+刀尖撓度: {self.deflection * 1000:.1f} μm
+{check}
+建議轉速: {self.suggested_speed} RPM
+建議進給: {self.suggested_feed} mm/min
+
+加工建議：
+• 確保刀具夾持牢固
+• 首次使用建議試切削
+• 根據實際情況微調參數
+• L/D比值應在1.5-5之間"""
+
+
+def compute_tool(inp):
+    """依懸臂樑撓度計算最佳伸長：撓度上限內取最長伸長，限制在所需長度與 5 倍直徑之間"""
+    if not all(v > 0 for v in (inp.diameter, inp.speed, inp.feed, inp.depth, inp.teeth, inp.limit)):
+        raise InputError("錯誤：請輸入有效的正數")
+    if inp.width is not None and inp.width <= 0:
+        raise InputError("錯誤：請輸入有效的正數")
+
+    diameter = inp.diameter
+    depth = inp.depth
+
+    # 檢查深度合理性
+    if depth > diameter * 2:
+        raise InputError(f"警告：切削深度({depth}mm)可能過大\n建議不超過刀具直徑的2倍")
+
+    modulus = TOOL_MODULUS.get(inp.material, TOOL_MODULUS["碳化鎢"])
+    fz = inp.feed / (inp.speed * inp.teeth)
+    kc = DEFAULT_KC
+    if inp.workpiece is not None:
+        params = store().material(inp.workpiece)
+        if params is None:
+            raise InputError("錯誤: 未知材料")
+        kc = workpiece_kc(params, fz, diameter, inp.width)
+    force = cutting_force(diameter, inp.teeth, fz, depth, inp.width, kc)
+    max_length = max_stick_out(diameter, modulus, force, inp.limit)
+
+    # 伸長至少需 1.5 倍直徑且超出切深半個直徑
+    required = max(diameter * 1.5, depth + diameter / 2)
+    optimal_length = max(required, min(diameter * MAX_LD, max_length))
+    deflection = tool_deflection(optimal_length, diameter, modulus, force)
+
+    # 撓度超限時按比例降低進給（撓度與切削力成正比）
+    feed_scale = 0.8
+    if deflection > inp.limit:
+        feed_scale = min(feed_scale, inp.limit / deflection)
+
+    return ToolResult(
+        diameter=diameter,
+        optimal_length=optimal_length,
+        ld_ratio=optimal_length / diameter,
+        suggested_speed=int(inp.speed * 0.9),
+        suggested_feed=int(inp.feed * feed_scale),
+        force=force,
+        max_length=max_length,
+        deflection=deflection,
+        limit=inp.limit,
+        kc=kc,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 球刀步距
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class BallMillInput:
+    """球刀步距計算輸入"""
+    diameter: float          # 球刀直徑 mm
+    step: float              # 步距 mm
+
+
+@dataclass(frozen=True)
+class BallMillResult:
+    """球刀殘餘高度計算結果"""
+    diameter: float
+    step: float
+    height: float            # 殘餘高度 mm
+    quality: str
+    quality_color: Tuple[float, float, float, float]
+    ref_step: float          # 標準參考步距 mm（無資料時為 0）
+    ref_height: float        # 參考殘餘高度 mm
+
+    @property
+    def radius(self):
+        return self.diameter / 2
+
+    def summary(self):
+        return f"殘餘高度: {self.height*1000:.2f} μm"
+
+    def report(self):
+        h, h_ref = self.height, self.ref_height
+        return f"""球刀直徑: {self.diameter} mm
+球刀半徑: {self.radius} mm
+設定步距: {self.step} mm
+殘餘高度: {h:.6f} mm ({h*1000:.2f} μm)
+表面質量: {self.quality}
+
+標準參考步距: {self.ref_step} mm
+參考殘餘高度: {h_ref:.6f} mm ({h_ref*1000:.2f} μm)
+差值: {abs(h - h_ref):.6f} mm ({abs(h - h_ref)*1000:.2f} μm)
+
+建議：
+• 殘餘高度 < 10μm：精加工
+• 殘餘高度 10-20μm：半精加工
+• 殘餘高度 20-30μm：粗加工
+• 殘餘高度 > 30μm：表面粗糙，建議減小步距"""
+
+
+def compute_ballmill(inp):
+    """計算球刀殘餘高度"""
+    D, P = inp.diameter, inp.step
+
+    if D <= 0:
+        raise InputError("錯誤：直徑必須大於0", "請輸入大於0的刀具直徑")
+    if P <= 0:
+        raise InputError("錯誤：步距必須大於0", "請輸入大於0的步距值")
+    if P >= D:
+        raise InputError("錯誤：步距必須小於直徑", f"步距({P}mm)必須小於刀具直徑({D}mm)")
+
+    h = scallop_height(D, P)
+
+    # 計算參考值
+    P_ref = reference_step(D)
+    if P_ref is not None and 0 < P_ref < D:
+        h_ref = scallop_height(D, P_ref)
+    else:
+        h_ref = 0.0
+        P_ref = 0.0
+
+    quality, quality_color = scallop_quality(h)
+    return BallMillResult(D, P, h, quality, quality_color, P_ref, h_ref)
+
+
+@dataclass(frozen=True)
+class BallMillInverseInput:
+    """球刀步距反算輸入"""
+    diameter: float          # 球刀直徑 mm
+    height: float            # 目標殘餘高度 mm
+
+
+@dataclass(frozen=True)
+class BallMillInverseResult:
+    """目標殘餘高度下的最大步距"""
+    diameter: float
+    height: float
+    step: float              # 最大步距 mm
+    quality_steps: Tuple[Tuple[str, float], ...]   # (質量等級, 最大步距 mm)
+    ref_step: float          # 標準參考步距 mm（無資料時為 0）
+    ref_height: float        # 參考殘餘高度 mm
+
+    def summary(self):
+        return f"最大步距: {self.step:.4f} mm"
+
+    def report(self):
+        h, P = self.height, self.step
+        lines = [f"球刀直徑: {self.diameter} mm",
+                 f"目標殘餘高度: {h:.6f} mm ({h*1000:.2f} μm)",
+                 f"最大步距: P = 2·√(R² - (R-h)²) = {P:.4f} mm",
+                 "",
+                 "各質量等級最大步距:"]
+        for name, step in self.quality_steps:
+            lines.append(f"• {name}: {step:.4f} mm")
+        if self.ref_step:
+            lines += ["",
+                      f"標準參考步距: {self.ref_step} mm",
+                      f"參考殘餘高度: {self.ref_height*1000:.2f} μm",
+                      f"路徑數相對參考步距: {self.ref_step / P * 100:.0f}%"]
+        return '\n'.join(lines)
+
+
+def compute_ballmill_inverse(inp):
+    """由目標殘餘高度反算最大步距"""
+    D = inp.diameter
+    P = max_step_for_height(D, inp.height)
+    quality_steps = tuple((name, max_step_for_quality(D, name)) for name in ('優良', '良好', '一般'))
+    P_ref = reference_step(D)
+    if P_ref is not None and 0 < P_ref < D:
+        h_ref = scallop_height(D, P_ref)
+    else:
+        h_ref = 0.0
+        P_ref = 0.0
+    return BallMillInverseResult(D, inp.height, P, quality_steps, P_ref, h_ref)
+
+
+GRID_MIN_STEP = 0.01       # 網格掃描的最小步距 mm
+
+
+@dataclass(frozen=True)
+class BallMillGridInput:
+    """球刀網格掃描輸入：參考表全部直徑 × GRID_MIN_STEP 至 max_step"""
+    max_step: float          # 最大步距 mm
+    steps: int = 200         # 步距取樣數
+
+
+@dataclass(frozen=True)
+class BallMillGridResult:
+    """網格掃描結果（scallop.ScallopSweep 與各直徑的等級格數）"""
+    max_step: float
+    sweep: Any
+    counts: Any
+
+    def summary(self):
+        return f"網格: {len(self.sweep.diameters)} 直徑 × {len(self.sweep.steps)} 步距"
+
+    def report(self):
+        sweep, P_max = self.sweep, self.max_step
+        names = sweep.quality_names()
+        lines = [f"步距範圍: {GRID_MIN_STEP}-{P_max} mm",
+                 f"直徑    P={P_max}mm 殘餘高度    {'/'.join(sweep.names)} 格數"]
+        for i, D in enumerate(sweep.diameters):
+            h = sweep.heights[i, -1]
+            h_text = f"{h*1000:.2f} μm {names[i, -1]}" if not math.isnan(h) else "步距過大"
+            lines.append(f"Ø{D:g}    {h_text}    {'/'.join(str(c) for c in self.counts[i])}")
+        return '\n'.join(lines)
+
+
+def compute_ballmill_grid(inp):
+    """網格掃描（NumPy，延遲導入以免拖慢啟動）"""
+    if inp.max_step <= GRID_MIN_STEP:
+        raise InputError(f"錯誤：步距必須大於{GRID_MIN_STEP}",
+                         f"網格掃描的步距範圍為 {GRID_MIN_STEP}mm 至設定步距")
+    import numpy as np
+    from . import scallop
+
+    sweep = scallop.sweep(np.linspace(GRID_MIN_STEP, inp.max_step, inp.steps))
+    return BallMillGridResult(inp.max_step, sweep, sweep.counts())
+
+
+# ---------------------------------------------------------------------------
+# 螺旋銑削
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class HelicalInput:
+    """螺旋銑削計算輸入
+
+    dim1: 內徑螺旋銑為孔徑 Dm，外徑螺旋銑為凸台直徑 Dm，爬坡銑為斜坡長度 L
+    dim2: 外徑螺旋銑的切削寬度 W
+    """
+    milling_type: str
+    tool_dia: float          # 刀具直徑 Dc mm
+    depth: float             # 總切削深度 d mm
+    dim1: float
+    dim2: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class HelicalResult:
+    """螺旋銑削計算結果"""
+    milling_type: str
+    angle_deg: float
+    safety: str
+    safety_color: Tuple[float, float, float, float]
+    suggestion: str
+    detail: str              # 詳細結果摘要
+    process: str             # 計算過程
+    warning: str = ''        # 非致命警告
+
+    @property
+    def angle_text(self):
+        return f'斜坡角度 φ = {self.angle_deg:.2f}°'
+
+    @property
+    def safety_text(self):
+        return f'安全評估: {self.safety}'
+
+
+# 往復斜坡下刀的預設最大角度（位於爬坡銑「安全」區間內）
+RAMP_MAX_ANGLE = 5.0
+
+
+@dataclass(frozen=True)
+class RampEntry:
+    """往復（之字形）斜坡下刀：在長度 L 的槽內來回斜向下刀直到總深度 d"""
+    length: float            # 槽長 L mm
+    depth: float             # 總深度 d mm
+    max_angle: float         # 最大斜坡角度 (度)
+    passes: int              # 斜坡趟數 n
+    pass_depth: float        # 每趟下降量 d/n mm
+    angle_deg: float         # 實際斜坡角度 (度)
+    ramp_length: float       # 每趟斜向長度 √(L² + (d/n)²) mm
+    total_length: float      # 總切削長度 mm（含清底趟）
+    cleanup: bool            # 到底後是否再走一趟平底
+    time_min: Optional[float] = None   # 指定進給時的切削時間 (分鐘)
+
+
+def ramp_entry(length, depth, max_angle=RAMP_MAX_ANGLE, feed=None, cleanup=True):
+    """計算往復斜坡下刀
+
+    趟數 n = ⌈d / (L × tan α)⌉，深度平均分配，實際角度不超過 α
+    """
+    if length <= 0:
+        raise InputError('錯誤：斜坡長度必須大於0')
+    if depth <= 0:
+        raise InputError('錯誤：切削深度必須大於0')
+    if not 0 < max_angle < 90:
+        raise InputError('錯誤：最大斜坡角度必須介於 0° 與 90° 之間')
+    if feed is not None and feed <= 0:
+        raise InputError('錯誤：進給速度必須大於0')
+
+    passes = max(1, math.ceil(depth / (length * math.tan(math.radians(max_angle))) - 1e-9))
+    pass_depth = depth / passes
+    ramp_length = math.hypot(length, pass_depth)
+    total_length = passes * ramp_length + (length if cleanup else 0)
+    return RampEntry(length, depth, max_angle, passes, pass_depth,
+                     math.degrees(math.atan(pass_depth / length)), ramp_length,
+                     total_length, cleanup, None if feed is None else total_length / feed)
+
+
+def compute_helical(inp):
+    """計算斜坡角度"""
+    tool_dia, depth = inp.tool_dia, inp.depth
+    milling_type = inp.milling_type
+    warning = ''
+
+    if tool_dia <= 0:
+        raise InputError('錯誤：刀具直徑必須大於0')
+    if depth <= 0:
+        raise InputError('錯誤：切削深度必須大於0')
+
+    if milling_type == '內徑螺旋銑':
+        hole_dia = inp.dim1
+        min_hole_dia = min_hole_diameter(tool_dia)
+
+        # 檢查孔徑合理性
+        if hole_dia <= tool_dia:
+            raise InputError(f'錯誤：孔徑必須大於刀具直徑 ({tool_dia}mm)')
+        if hole_dia < min_hole_dia:
+            warning = f'警告：孔徑小於最小建議值 {min_hole_dia:.1f}mm'
+
+        # 半徑總變化量 ΔR 與斜坡角度 φ = arctan(d/ΔR)
+        ΔR = (hole_dia - tool_dia) / 2
+        φ_deg = math.degrees(math.atan(depth / ΔR))
+
+        process = f"""內徑螺旋銑計算過程：
+1. 刀具直徑 Dc = {tool_dia} mm
+2. 孔徑 Dm = {hole_dia} mm
+3. 半徑變化量 ΔR = (Dm - Dc)/2 = ({hole_dia} - {tool_dia})/2 = {ΔR:.2f} mm
+4. 總切削深度 d = {depth} mm
+5. 斜坡角度 φ = arctan(d/ΔR) = arctan({depth}/{ΔR:.2f}) = {φ_deg:.2f}°
+6. 最小加工孔徑建議值 = Dc × 1.2 = {tool_dia} × 1.2 = {min_hole_dia:.1f} mm
+
+加工建議：
+- 刀具從孔中心開始螺旋運動
+- 適合孔徑大於刀具直徑1.2倍的情況
+- 常用角度範圍：15°-45°
+- 當前孔徑與刀具直徑比值：{hole_dia/tool_dia:.2f}"""
+        detail = f'ΔR: {ΔR:.2f}mm | 孔徑比: {hole_dia/tool_dia:.2f}'
+
+    elif milling_type == '外徑螺旋銑':
+        boss_dia = inp.dim1
+        width = inp.dim2
+
+        if width is None or width <= 0:
+            raise InputError('錯誤：切削寬度必須大於0')
+
+        # 斜坡角度 φ = arctan(d/W)
+        φ_deg = math.degrees(math.atan(depth / width))
+
+        # 切削寬度W的建議值範圍
+        w_min = tool_dia * 0.5
+        w_max = tool_dia * 0.8
+        if width < w_min:
+            warning = f'警告：切削寬度小於建議最小值 {w_min:.1f}mm'
+        elif width > w_max:
+            warning = f'警告：切削寬度大於建議最大值 {w_max:.1f}mm'
+
+        process = f"""外徑螺旋銑計算過程：
+1. 刀具直徑 Dc = {tool_dia} mm
+2. 凸台直徑 Dm = {boss_dia} mm
+3. 切削寬度 W = {width} mm
+4. 總切削深度 d = {depth} mm
+5. 斜坡角度 φ = arctan(d/W) = arctan({depth}/{width}) = {φ_deg:.2f}°
+
+重要說明：
+• 斜坡角度φ只與深度d和切削寬度W有關，與刀具直徑無關
+• 刀具直徑Dc會影響W的建議值範圍
+• W建議範圍：刀具直徑的50%-80% ({w_min:.1f}mm - {w_max:.1f}mm)
+
+加工建議：
+- 刀具從凸台外側開始螺旋向內
+- 切削寬度W建議為刀具直徑的50-80%
+- 適合凸台外部輪廓加工"""
+        detail = f'W: {width}mm | φ只與d/W有關'
+
+    else:  # 爬坡銑
+        length = inp.dim1
+
+        if length <= 0:
+            raise InputError('錯誤：斜坡長度必須大於0')
+
+        # 斜坡角度 φ = arctan(d/L) 與實際斜坡長度
+        φ_deg = math.degrees(math.atan(depth / length))
+        actual_length = math.sqrt(length**2 + depth**2)
+        zigzag = ramp_entry(length, depth)
+
+        process = f"""爬坡銑計算過程：
+1. 斜坡長度 L = {length} mm
+2. 總切削深度 d = {depth} mm
+3. 斜坡角度 φ = arctan(d/L) = arctan({depth}/{length}) = {φ_deg:.2f}°
+4. 實際斜坡長度 = √(L² + d²) = √({length}² + {depth}²) = {actual_length:.2f} mm
+
+往復下刀（槽長 L 內來回，最大角度 {zigzag.max_angle:g}°）：
+5. 趟數 n = ⌈d / (L × tan{zigzag.max_angle:g}°)⌉ = {zigzag.passes}
+6. 每趟下降 {zigzag.pass_depth:.2f} mm，實際角度 {zigzag.angle_deg:.2f}°
+7. 總切削長度 = n × √(L² + (d/n)²) + L(清底) = {zigzag.total_length:.2f} mm
+
+加工建議：
+- 刀具沿斜線切入材料
+- 常用於型腔初始切入或窄槽加工
+- 常用角度範圍：5°-15°"""
+        detail = f'斜坡長度: {length}mm | 實際長度: {actual_length:.2f}mm'
+
+    safety, safety_color, suggestion = safety_assessment(milling_type, φ_deg)
+    return HelicalResult(milling_type, φ_deg, safety, safety_color, suggestion,
+                         detail, process, warning)
+
+
+# ---------------------------------------------------------------------------
+# 切削條件
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CuttingInput:
+    """切削條件計算輸入"""
+    material: str
+    tool_diameter: float     # 刀具直徑 mm
+    tooth_count: int         # 刀具齒數
+    machining_type: str = '粗加工'
+    vc_condition: str = '中'
+    feed_condition: str = '中'
+    depth: Optional[float] = None    # 軸向切深 ap mm；指定時檢查主軸功率/扭力
+    width: Optional[float] = None    # 徑向切寬 ae mm，None 為全槽
+    machine: str = ''                # 機台名稱（MACHINE_PROFILES），空白為預設機台
+
+
+@dataclass(frozen=True)
+class SpindleLoad:
+    """主軸負載檢查結果"""
+    machine: str
+    kc: float                # 依平均切屑厚度修正後的比切削力 N/mm²
+    power: float             # 所需主軸功率 kW（已含傳動效率）
+    torque: float            # 所需扭力 N·m
+    available_power: float   # 該轉速下可用功率 kW
+    available_torque: float
+    original_vc: float       # 降低前的 VC / fz
+    original_fz: float
+    depth: float
+    max_depth: float         # 降至 VC、fz 下限仍超載時的建議最大切深，否則等於 depth
+
+    @property
+    def load(self):
+        """負載率（所需 / 可用功率）"""
+        return self.power / self.available_power
+
+    @property
+    def overloaded(self):
+        return self.max_depth < self.depth
+
+    def report(self):
+        lines = [f"主軸負載（{self.machine}）:",
+                 f"• 比切削力 kc: {self.kc:.0f} N/mm²",
+                 f"• 所需功率: {self.power:.2f} kW（可用 {self.available_power:.2f} kW，負載 {self.load:.0%}）",
+                 f"• 所需扭力: {self.torque:.1f} N·m（可用 {self.available_torque:.1f} N·m）"]
+        if self.overloaded:
+            lines.append(f"• 警告：VC、fz 已降至下限仍超載，切深請降至 {self.max_depth:.2f} mm 以下")
+        return '\n'.join(lines)
+
+
+@dataclass(frozen=True)
+class CuttingResult:
+    """切削條件計算結果"""
+    inp: CuttingInput
+    vc: float                # 切削速度 m/min
+    vc_range: Tuple[float, float]
+    fz: float                # 每齒進給 mm/tooth
+    fz_range: Tuple[float, float]
+    rpm: float               # 主軸轉速 RPM（已限制）
+    feed: float              # 進給速度 mm/min（已限制）
+    spindle: Optional[SpindleLoad] = None   # 指定切深時的主軸負載
+    life: float = 0.0        # 預估刀具壽命 min（Taylor，碳化鎢刀具，以限制後轉速的實際 VC 計算）
+
+    @property
+    def vc_text(self):
+        vc_min, vc_max = self.vc_range
+        derated = "，依主軸功率降低" if self.spindle and self.vc < self.spindle.original_vc else ""
+        return f"切削速度 VC: {self.vc:.0f} m/min (範圍: {vc_min}-{vc_max} m/min{derated})"
+
+    @property
+    def fz_text(self):
+        fz_min, fz_max = self.fz_range
+        derated = "，依主軸扭力降低" if self.spindle and self.fz < self.spindle.original_fz else ""
+        return f"每齒進給 fz: {self.fz:.3f} mm/tooth (範圍: {fz_min}-{fz_max} mm/tooth{derated})"
+
+    @property
+    def rpm_text(self):
+        return f"主軸轉速 M: {self.rpm:.0f} RPM"
+
+    @property
+    def feed_text(self):
+        return f"進給速度 F: {self.feed:.0f} mm/min"
+
+    @property
+    def life_text(self):
+        return f"預估刀具壽命: {self.life:.0f} min"
+
+    def report(self):
+        inp = self.inp
+        vc, fz, m, f = self.vc, self.fz, self.rpm, self.feed
+        return f"""計算過程:
+1. 材料: {inp.material}
+2. 加工類型: {inp.machining_type}
+3. VC條件: {inp.vc_condition} (VC = {vc:.0f} m/min)
+4. 切削速度條件: {inp.feed_condition} (fz = {fz:.3f} mm/tooth)
+5. 刀具直徑: {inp.tool_diameter} mm
+6. 刀具齒數: {inp.tooth_count}
+
+計算公式:
+主軸轉速 M = (VC × 1000) ÷ (π × D)
+        = ({vc} × 1000) ÷ (3.1416 × {inp.tool_diameter})
+        = {vc*1000:.0f} ÷ {math.pi*inp.tool_diameter:.1f}
+        = {m:.0f} RPM
+
+進給速度 F = M × N × fz
+        = {m:.0f} × {inp.tooth_count} × {fz}
+        = {f:.0f} mm/min
+
+刀具壽命 (Taylor VC × T^n = C):
+        T = {self.life:.0f} min（碳化鎢刀具）
+
+安全限制:
+• 主軸轉速限制: {RPM_LIMITS[0]}-{RPM_LIMITS[1]} RPM
+• 進給速度限制: {FEED_LIMITS[0]}-{FEED_LIMITS[1]} mm/min
+
+建議:
+• 根據實際機台性能調整參數
+• 首次加工建議進行試切削
+• 密切注意刀具磨損情況""" + (f"\n\n{self.spindle.report()}" if self.spindle else "")
+
+
+def spindle_speed(vc, tool_diameter):
+    """主軸轉速 M = (VC × 1000) / (π × D)，已套用安全限制"""
+    return clamp((vc * 1000) / (math.pi * tool_diameter), RPM_LIMITS)
+
+
+def feed_rate(rpm, tooth_count, fz):
+    """進給速度 F = M × N × fz，已套用安全限制"""
+    return clamp(rpm * tooth_count * fz, FEED_LIMITS)
+
+
+def mean_chip_thickness(fz, diameter, width, ops=SCALAR_OPS):
+    """平均切屑厚度 hm = fz·(2·ae/D)/φ（全槽時 hm = 2·fz/π）"""
+    width = ops.minimum(width, diameter)
+    return fz * 2 * width / diameter / engagement_angle(diameter, width, ops)
+
+
+def specific_cutting_force(kc, mc, hm):
+    """Kienzle 比切削力 kc = kc1.1·hm^(-mc) N/mm²"""
+    return kc * hm ** -mc
+
+
+def cutting_power(kc, depth, width, feed):
+    """切削功率 Pc = ap·ae·vf·kc / 6×10⁷ kW"""
+    return depth * width * feed * kc / 6e7
+
+
+def largest_feasible(low, high, feasible, iterations=40):
+    """[low, high] 內使 feasible 成立的最大值（數值越小越容易成立），low 也不成立時返回 None"""
+    if feasible(high):
+        return high
+    if not feasible(low):
+        return None
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if feasible(mid):
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+def machine_profile(name):
+    """依名稱取得機台設定，空白為預設機台"""
+    # machine 模組依賴本模組的限制常數，延遲導入避免循環導入
+    from .machine import DEFAULT_MACHINE, MACHINE_PROFILES
+    if not name:
+        return DEFAULT_MACHINE
+    if name not in MACHINE_PROFILES:
+        raise InputError(f"錯誤: 未知機台 {name}")
+    return MACHINE_PROFILES[name]
+
+
+def fit_spindle(params, inp, machine, vc, fz, vc_min, fz_min):
+    """檢查主軸功率/扭力並在超載時降低切削條件，返回 (vc, fz, rpm, feed, SpindleLoad)
+
+    先降 VC（最低到材料下限；定扭力區內降速不會降低負載率，所以只降到額定轉速），
+    仍超載再降 fz（最低到範圍下限），兩者都到下限仍超載時給出建議最大切深
+    """
+    d, z, depth = inp.tool_diameter, inp.tooth_count, inp.depth
+    width = d if inp.width is None else min(inp.width, d)
+    rpm_limits = (RPM_LIMITS[0], min(RPM_LIMITS[1], machine.max_rpm))
+    feed_limits = (FEED_LIMITS[0], min(FEED_LIMITS[1], machine.max_feed))
+
+    def load(m, fz_):
+        f = clamp(m * z * fz_, feed_limits)
+        kc = specific_cutting_force(params.kc, params.mc, mean_chip_thickness(fz_, d, width))
+        return f, kc, cutting_power(kc, depth, width, f) / machine.efficiency
+
+    def fits(m, fz_):
+        return load(m, fz_)[2] <= machine.available_power(m)
+
+    m = clamp((vc * 1000) / (math.pi * d), rpm_limits)
+    new_vc, new_fz = vc, fz
+    if not fits(m, fz):
+        knee = min(m, max(clamp((vc_min * 1000) / (math.pi * d), rpm_limits), machine.rated_rpm))
+        m = largest_feasible(knee, m, lambda n: fits(n, fz)) or knee
+        new_vc = min(vc, m * math.pi * d / 1000)
+        if not fits(m, fz):
+            low = min(fz_min, fz)
+            new_fz = largest_feasible(low, fz, lambda v: fits(m, v)) or low
+    f, kc, power = load(m, new_fz)
+    available = machine.available_power(m)
+    max_depth = depth if power <= available else depth * available / power
+    spindle = SpindleLoad(machine.name, kc, power, power * TORQUE_FACTOR / m, available,
+                          available * TORQUE_FACTOR / m, vc, fz, depth, max_depth)
+    return new_vc, new_fz, m, f, spindle
+
+
+# 刀具壽命（Taylor：vc·T^n = C）；參考數據的 C、n 為碳化鎢刀具，其他刀具材料以
+# TOOL_MATERIAL_FACTOR 調整 C。材料未提供時以 VC 範圍中值對應 REFERENCE_LIFE 分鐘估計
+TAYLOR_N = 0.25
+REFERENCE_LIFE = 30.0       # min
+
+
+def taylor_constants(params, tool_material='碳化鎢'):
+    """材料的 Taylor 常數 (C, n)"""
+    factor = TOOL_MATERIAL_FACTOR.get(tool_material, 1.0)
+    if params.taylor_c > 0 and params.taylor_n > 0:
+        return params.taylor_c * factor, params.taylor_n
+    vc_min, vc_max = params.vc_range
+    return (vc_min + vc_max) / 2 * REFERENCE_LIFE ** TAYLOR_N * factor, TAYLOR_N
+
+
+def tool_life(params, vc, tool_material='碳化鎢'):
+    """切削速度 vc (m/min) 下的刀具壽命 T = (C / vc)^(1/n) 分鐘"""
+    c, n = taylor_constants(params, tool_material)
+    return (c / vc) ** (1 / n)
+
+
+def compute_cutting(inp):
+    """計算切削條件；指定切深時另檢查主軸功率/扭力並降低 VC、fz 以符合機台"""
+    if inp.tool_diameter <= 0:
+        raise InputError("錯誤: 刀具直徑必須大於0")
+    if inp.tooth_count <= 0:
+        raise InputError("錯誤: 刀具齒數必須大於0")
+    params = store().material(inp.material)
+    if params is None:
+        raise InputError("錯誤: 未知材料")
+
+    vc_min, vc_max = params.vc_range
+    vc = pick_level(inp.vc_condition, vc_min, vc_max)
+
+    # 根據加工類型選擇fz範圍
+    if inp.machining_type == "粗加工":
+        fz_min, fz_max = params.fz_rough
+    else:  # 精加工
+        fz_min, fz_max = params.fz_finish
+    fz = pick_level(inp.feed_condition, fz_min, fz_max)
+
+    if inp.depth is None:
+        m = spindle_speed(vc, inp.tool_diameter)
+        f = feed_rate(m, inp.tooth_count, fz)
+        return CuttingResult(inp, vc, (vc_min, vc_max), fz, (fz_min, fz_max), m, f,
+                             life=tool_life(params, m * math.pi * inp.tool_diameter / 1000))
+
+    if inp.depth <= 0 or (inp.width is not None and inp.width <= 0):
+        raise InputError("錯誤: 切深與切寬必須大於0")
+    vc, fz, m, f, spindle = fit_spindle(params, inp, machine_profile(inp.machine),
+                                        vc, fz, vc_min, fz_min)
+    return CuttingResult(inp, vc, (vc_min, vc_max), fz, (fz_min, fz_max), m, f, spindle,
+                         tool_life(params, m * math.pi * inp.tool_diameter / 1000))
+
+
+# ---------------------------------------------------------------------------
+# 切削預留量
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class AllowanceInput:
+    """切削預留量查詢輸入"""
+    material: str
+    machining_type: str
+
+
+@dataclass(frozen=True)
+class AllowanceResult:
+    """切削預留量查詢結果"""
+    material: str
+    machining_type: str
+    rough: float             # 單邊粗加工預留 mm
+    semi_finish: float       # 半精加工預留 mm
+    tool: str
+    notes: str
+
+    @property
+    def rough_text(self):
+        return f"單邊預留(粗加工): {self.rough} mm"
+
+    @property
+    def semi_finish_text(self):
+        return f"半精加工: {self.semi_finish} mm"
+
+    @property
+    def tool_text(self):
+        return f"參考刀具: {self.tool}"
+
+    def report(self):
+        return f"""材質: {self.material}
+加工類型: {self.machining_type}
+
+加工參數建議:
+• 單邊粗加工預留: {self.rough} mm
+• 半精加工預留: {self.semi_finish} mm
+• 總預留量建議: {self.rough + self.semi_finish + 0.1:.2f} mm
+
+刀具推薦: {self.tool}
+
+注意事項: {self.notes}
+
+加工建議:
+1. 粗加工: 去除大部分材料，保留{self.rough}mm單邊餘量
+2. 半精加工: 精確加工，保留{self.semi_finish}mm單邊餘量
+3. 精加工: 最終加工，達到圖紙尺寸要求
+
+數據來源: CNC銑削加工預留量表
+
+版本備註:
+• v2.9: 增加輸入驗證和性能優化
+• 更新日期: 2024年1月"""
+
+
+def query_allowance(material, machining_type):
+    """查詢預留量，找不到數據時返回 None"""
+    data = store().allowance(material, machining_type)
+    if data is None:
+        return None
+    return AllowanceResult(material, machining_type, data.rough,
+                           data.semi_finish, data.tool, data.notes)
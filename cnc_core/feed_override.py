@@ -0,0 +1,355 @@
+"""
+轉角/圓弧進給修正（串流改寫 G 代碼）
+進給 F = M × N × fz 是以直線切削的徑向吃刀 ae 計算的，在內轉角與小半徑內圓弧
+（包括圓弧進刀）處刀具的接觸角會變大，每齒負荷隨之升高。本模組逐段計算接觸角：
+    直線:     φ0 = acos(1 - 2ae/D)
+    內轉角:   φ = min(φ0 + θ, 180°)，θ 為轉向角
+    內圓弧:   cos φ = ((Rw - ae)² - Rc² - r²) / (2·Rc·r)，Rw = Rc + r
+並依 φ0/φ 降低進給（內圓弧另乘刀心/刃口速度比 Rc/Rw），
+在降速段寫入新的 F 字，之後的第一個切削段恢復原進給。
+
+只預讀一個移動段，逐段輸出，記憶體用量與程式大小無關。
+材料側 side 為沿進給方向看材料在左或右（無刀補的刀心路徑）。
+
+用法: python -m cnc_core.feed_override 輸入.nc 輸出.nc --tool-dia 10 --ae 2 [--side right]
+"""
+
+import argparse
+import math
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Optional
+
+from .engine import InputError
+from .toolpath import arc_center
+
+WRITE_CHUNK = 4096         # 每次寫入的行數
+MIN_FACTOR = 0.3           # 進給修正下限
+
+WORD = re.compile(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+F_WORD = re.compile(r'F\s*[-+]?(?:\d+\.?\d*|\.\d+)', re.IGNORECASE)
+COMMENT = re.compile(r'\([^)]*\)?|;.*')
+AXES = {'X': 0, 'Y': 1, 'Z': 2}
+# 只含這些字的直線段才會被分割
+SPLITTABLE = frozenset('GNXYZF')
+
+
+@dataclass(frozen=True)
+class OverrideOptions:
+    """改寫選項（長度單位與程式相同）"""
+    tool_dia: float
+    ae: float                              # 直線段的徑向吃刀量
+    side: str = 'right'                    # 材料在進給方向的 'left' 或 'right'
+    min_factor: float = MIN_FACTOR
+    slow_length: Optional[float] = None    # 轉角前後的降速長度，預設為刀具半徑
+    decimals: int = 3
+
+    def __post_init__(self):
+        if self.tool_dia <= 0:
+            raise InputError("錯誤：刀具直徑必須大於0")
+        if not 0 < self.ae <= self.tool_dia:
+            raise InputError("錯誤：徑向吃刀量必須大於0且不超過刀具直徑")
+        if self.side not in ('left', 'right'):
+            raise InputError(f"錯誤：未知材料側 {self.side}")
+        if not 0 < self.min_factor <= 1:
+            raise InputError("錯誤：進給修正下限必須在 0~1 之間")
+
+
+@dataclass
+class OverrideStats:
+    """改寫統計"""
+    blocks_in: int = 0
+    blocks_out: int = 0
+    corners: int = 0           # 降速的內轉角數
+    arcs: int = 0              # 降速的內圓弧數
+    min_factor: float = 1.0
+    factors: dict = field(default_factory=dict)   # {修正係數(0.05 級距): 段數}
+
+    def report(self):
+        lines = [
+            f"輸入 {self.blocks_in} 段，輸出 {self.blocks_out} 段",
+            f"內轉角降速 {self.corners} 處，內圓弧降速 {self.arcs} 段",
+            f"最低進給修正 {self.min_factor:.0%}",
+        ]
+        lines += [f"• {k:.0%}: {v} 段" for k, v in sorted(self.factors.items())]
+        return '\n'.join(lines)
+
+
+def straight_engagement(tool_dia, ae):
+    """直線切削的接觸角 φ0 (rad)"""
+    return math.acos(max(-1.0, 1 - 2 * ae / tool_dia))
+
+
+def corner_engagement(tool_dia, ae, turn):
+    """內轉角處的最大接觸角 (rad)，turn 為轉向角 (rad)"""
+    return min(straight_engagement(tool_dia, ae) + abs(turn), math.pi)
+
+
+def arc_engagement(tool_dia, ae, path_radius):
+    """內圓弧（刀心半徑 Rc）的接觸角 (rad)"""
+    r = tool_dia / 2
+    if path_radius <= 0:
+        return math.pi
+    wall = path_radius + r
+    cos_phi = ((wall - ae) ** 2 - path_radius ** 2 - r * r) / (2 * path_radius * r)
+    return math.acos(min(1.0, max(-1.0, cos_phi)))
+
+
+def _wrap(angle):
+    """角度換算至 [-π, π)"""
+    return angle - 2 * math.pi * math.floor((angle + math.pi) / (2 * math.pi))
+
+
+def _fmt_feed(value):
+    return format(round(value, 3), '.12g')
+
+
+def _with_feed(text, feed):
+    """將程式段的 F 字改為 feed（沒有 F 字時插入在註解之前）"""
+    word = f"F{_fmt_feed(feed)}"
+    comment = COMMENT.search(text) if '(' in text or ';' in text else None
+    code_end = comment.start() if comment else len(text)
+    match = F_WORD.search(text, 0, code_end)
+    if match:
+        return text[:match.start()] + word + text[match.end():]
+    code = text[:code_end].rstrip()
+    return f"{code} {word}{' ' + text[code_end:] if code_end < len(text) else ''}"
+
+
+class _Move:
+    """預讀中的 XY 切削段"""
+    __slots__ = ('text', 'start', 'end', 'arc', 'feed', 'splittable',
+                 'start_tangent', 'end_tangent', 'factor', 'head')
+
+    def __init__(self, text, start, end, arc, feed, splittable, start_tangent, end_tangent, factor):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.arc = arc
+        self.feed = feed
+        self.splittable = splittable
+        self.start_tangent = start_tangent
+        self.end_tangent = end_tangent
+        self.factor = factor       # 本段（內圓弧）的修正係數
+        self.head = 1.0            # 起點轉角的修正係數
+
+
+class FeedOverride:
+    """串流改寫器：rewrite() 逐行產生改寫後的程式段，統計見 stats"""
+
+    def __init__(self, options):
+        self.options = options
+        self.stats = OverrideStats()
+        self._phi0 = straight_engagement(options.tool_dia, options.ae)
+        self._slow = options.slow_length if options.slow_length is not None else options.tool_dia / 2
+        # 材料在右側時向左轉（逆時針）為內轉角
+        self._inside_sign = 1 if options.side == 'right' else -1
+
+    def _clamp(self, factor):
+        return max(self.options.min_factor, min(1.0, factor))
+
+    def _arc_factor(self, radius, turn_sign):
+        if turn_sign != self._inside_sign:
+            return 1.0
+        r = self.options.tool_dia / 2
+        phi = arc_engagement(self.options.tool_dia, self.options.ae, radius)
+        return self._clamp(self._phi0 / phi * radius / (radius + r))
+
+    def _corner_factor(self, prev, move):
+        turn = _wrap(move.start_tangent - prev.end_tangent)
+        if turn * self._inside_sign <= 1e-6:
+            return 1.0
+        return self._clamp(self._phi0 / corner_engagement(self.options.tool_dia, self.options.ae, turn))
+
+    def rewrite(self, lines):
+        """逐行改寫（輸入行可含換行符，輸出不含）"""
+        stats = self.stats
+        nd = self.options.decimals
+        position = [0.0, 0.0, 0.0]
+        motion = 0
+        absolute = True
+        plane_xy = True
+        program_f = None
+        self._emitted = None
+        held = None
+
+        def emit(text, desired, is_feed_move):
+            if is_feed_move and desired is not None and desired != self._emitted:
+                text = _with_feed(text, desired)
+                self._emitted = desired
+            stats.blocks_out += 1
+            return text
+
+        def flush(move, tail):
+            """輸出預讀段；tail 為終點轉角的修正係數"""
+            head = move.head
+            base = move.factor
+            if move.feed is None:
+                yield emit(move.text, None, True)
+                return
+            pieces = []
+            length = math.dist(move.start[:2], move.end[:2])
+            if move.arc is None and move.splittable and (head < 1 or tail < 1) \
+                    and length > self._slow * ((head < 1) + (tail < 1)):
+                cuts = [0.0]
+                if head < 1:
+                    cuts.append(self._slow)
+                if tail < 1:
+                    cuts.append(length - self._slow)
+                cuts.append(length)
+                factors = ([head] if head < 1 else []) + [base] + ([tail] if tail < 1 else [])
+                for b, f in zip(cuts[1:], factors):
+                    if pieces and pieces[-1][1] == f:
+                        pieces[-1] = (b, f)
+                    else:
+                        pieces.append((b, f))
+            else:
+                pieces.append((length, min(head, tail, base)))
+
+            for i, (b, f) in enumerate(pieces):
+                self._count(f)
+                if i == len(pieces) - 1:
+                    yield emit(move.text, move.feed * f, True)
+                else:
+                    t = b / length
+                    x, y, z = (s + (e - s) * t for s, e in zip(move.start, move.end))
+                    yield emit(f"G01 X{x:.{nd}f} Y{y:.{nd}f} Z{z:.{nd}f}", move.feed * f, True)
+
+        for raw in lines:
+            text = raw.rstrip('\r\n')
+            stats.blocks_in += 1
+            code = COMMENT.sub('', text) if '(' in text or ';' in text else text
+            words = WORD.findall(code.upper())
+            target = [None, None, None]
+            arc_i = arc_j = radius = None
+            has_f = has_target = False
+            for letter, value in words:
+                axis = AXES.get(letter)
+                if axis is not None:
+                    target[axis] = float(value)
+                    has_target = True
+                elif letter == 'G':
+                    g = float(value)
+                    if g < 4 and g == int(g):
+                        motion = int(g)
+                    elif g == 90:
+                        absolute = True
+                    elif g == 91:
+                        absolute = False
+                    elif g == 17:
+                        plane_xy = True
+                    elif g in (18, 19):
+                        plane_xy = False
+                elif letter == 'F':
+                    program_f = float(value)
+                    has_f = True
+                elif letter == 'I':
+                    arc_i = float(value)
+                elif letter == 'J':
+                    arc_j = float(value)
+                elif letter == 'R':
+                    radius = float(value)
+
+            start = tuple(position)
+            if has_target:
+                for k, v in enumerate(target):
+                    if v is not None:
+                        position[k] = v if absolute else position[k] + v
+            end = tuple(position)
+            full_circle = motion > 1 and (arc_i or arc_j) and end == start
+            is_feed_move = motion > 0 and (end != start or full_circle)
+            xy_move = is_feed_move and plane_xy and (end[:2] != start[:2] or full_circle)
+
+            if not xy_move:
+                if held is not None:
+                    yield from flush(held, 1.0)
+                    held = None
+                if has_f and not is_feed_move:
+                    self._emitted = program_f
+                yield emit(text, program_f, is_feed_move)
+                continue
+
+            # XY 切削段：計算切線方向與圓弧修正
+            arc = None
+            factor = 1.0
+            if motion == 1:
+                tangent = math.atan2(end[1] - start[1], end[0] - start[0])
+                start_tangent = end_tangent = tangent
+            else:
+                clockwise = motion == 2
+                if radius is not None:
+                    center = arc_center(start[:2], end[:2], radius, clockwise)
+                else:
+                    center = (start[0] + (arc_i or 0.0), start[1] + (arc_j or 0.0))
+                rc = math.dist(start[:2], center)
+                turn_sign = -1 if clockwise else 1
+                a0 = math.atan2(start[1] - center[1], start[0] - center[0])
+                a1 = math.atan2(end[1] - center[1], end[0] - center[0])
+                start_tangent = a0 + turn_sign * math.pi / 2
+                end_tangent = a1 + turn_sign * math.pi / 2
+                arc = (center, rc)
+                factor = self._arc_factor(rc, turn_sign)
+                if factor < 1:
+                    stats.arcs += 1
+
+            splittable = absolute and all(letter in SPLITTABLE for letter, _ in words)
+            move = _Move(text, start, end, arc, program_f, splittable, start_tangent, end_tangent, factor)
+            corner = 1.0
+            if held is not None:
+                corner = self._corner_factor(held, move)
+                if corner < 1:
+                    stats.corners += 1
+                yield from flush(held, corner)
+            move.head = corner
+            held = move
+
+        if held is not None:
+            yield from flush(held, 1.0)
+
+    def _count(self, factor):
+        stats = self.stats
+        stats.min_factor = min(stats.min_factor, factor)
+        key = round(factor * 20) / 20
+        stats.factors[key] = stats.factors.get(key, 0) + 1
+
+
+def rewrite(lines, options):
+    """改寫程式段的產生器（不需要統計時使用）"""
+    return FeedOverride(options).rewrite(lines)
+
+
+def rewrite_file(src, dst, options):
+    """逐批讀寫檔案，返回 OverrideStats"""
+    override = FeedOverride(options)
+    with open(src, encoding='latin-1', newline='') as fin, \
+            open(dst, 'w', encoding='latin-1', newline='\n') as fout:
+        blocks = override.rewrite(fin)
+        while True:
+            chunk = list(islice(blocks, WRITE_CHUNK))
+            if not chunk:
+                return override.stats
+            fout.write('\n'.join(chunk))
+            fout.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='內轉角/內圓弧進給修正')
+    parser.add_argument('input', help='輸入 NC 檔')
+    parser.add_argument('output', help='輸出 NC 檔')
+    parser.add_argument('--tool-dia', type=float, required=True, help='刀具直徑')
+    parser.add_argument('--ae', type=float, required=True, help='直線段的徑向吃刀量')
+    parser.add_argument('--side', choices=('left', 'right'), default='right',
+                        help='材料在進給方向的哪一側（順銑為 right）')
+    parser.add_argument('--min-factor', type=float, default=MIN_FACTOR, help='進給修正下限')
+    parser.add_argument('--slow-length', type=float, help='轉角前後的降速長度（預設為刀具半徑）')
+    args = parser.parse_args(argv)
+    try:
+        options = OverrideOptions(args.tool_dia, args.ae, args.side, args.min_factor, args.slow_length)
+    except InputError as e:
+        parser.error(e.message)
+    print(rewrite_file(args.input, args.output, options).report())
+
+
+if __name__ == '__main__':
+    main()
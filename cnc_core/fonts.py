@@ -0,0 +1,110 @@
+"""
+中文字體路徑解析與磁碟快取（不依賴 Kivy）
+解析結果以 mtime 驗證，避免每次啟動都逐一檢查候選字體
+"""
+
+import json
+import os
+import sys
+
+# 建置時由 tools/build_font_subset.py 產生的子集字體（只含應用程式用到的字元）
+SUBSET_FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'fonts', 'cnc_subset.ttf')
+
+
+def default_font_paths(platform=sys.platform):
+    """各平台的候選中文字體（依優先順序）"""
+    if platform == 'win32':
+        # Windows 系統字體
+        return [
+            "C:/Windows/Fonts/msjh.ttc",           # 微軟正黑體
+            "C:/Windows/Fonts/msyh.ttc",           # 微軟雅黑
+            "C:/Windows/Fonts/simhei.ttf",         # 黑體
+            "C:/Windows/Fonts/simsun.ttc",         # 新宋體
+        ]
+    elif platform == 'darwin':
+        # macOS/iOS 系統字體
+        return [
+            "/System/Library/Fonts/PingFang.ttc",
+            "/System/Library/Fonts/STHeiti Light.ttc",
+            "/System/Library/Fonts/STHeiti Medium.ttc",
+            "/Library/Fonts/Arial Unicode.ttf",
+        ]
+    # Linux 和其他系統（包括 Colab）
+    return [
+        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ]
+
+
+def subset_font_path(check=True):
+    """子集字體路徑；check 為 True 且檔案不存在時返回 None"""
+    if check and not os.path.exists(SUBSET_FONT_PATH):
+        return None
+    return SUBSET_FONT_PATH
+
+
+def font_cache_path():
+    """字體快取檔位置（Android 使用應用私有目錄）"""
+    base = os.environ.get('ANDROID_PRIVATE') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cnc_toolkit', 'font_cache.json')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path, data):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 快取只是加速用，寫入失敗不影響使用
+
+
+def resolve_font(paths=None, cache_path=None):
+    """返回第一個存在的字體路徑，找不到時返回 None
+
+    快取命中條件：候選清單相同，且快取的字體 mtime 未改變
+    """
+    paths = list(default_font_paths() if paths is None else paths)
+    cache_path = cache_path or font_cache_path()
+
+    cached = _read_cache(cache_path)
+    if cached and cached.get('candidates') == paths:
+        path = cached.get('path')
+        if path and _mtime(path) == cached.get('mtime'):
+            return path
+
+    for path in paths:
+        mtime = _mtime(path)
+        if mtime is not None:
+            _write_cache(cache_path, {'candidates': paths, 'path': path, 'mtime': mtime})
+            return path
+    return None
+
+
+def preload_font(path, chunk_size=1 << 20):
+    """順序讀取字體檔，讓系統頁快取在首次渲染前就緒（供背景執行緒使用）"""
+    try:
+        with open(path, 'rb') as f:
+            while f.read(chunk_size):
+                pass
+    except OSError:
+        pass
@@ -0,0 +1,223 @@
+"""
+內徑螺旋銑 G 代碼產生器
+依孔位表 (x, y, Dm, 深度, 刀號) 產生螺旋下刀程式：
+刀心軌跡半徑 r = (Dm - Dc)/2，每圈 Z 下降量 p = 2πr·tan(φ)，
+以產生器逐行輸出，數萬個孔的程式也不會整個留在記憶體中
+
+用法: python -m cnc_core.helix 孔位表.csv 輸出.nc --tool 1:10:3000:800 [--angle 3]
+"""
+
+import argparse
+import csv
+import math
+import os
+from dataclasses import dataclass
+from itertools import islice
+
+from .engine import InputError, min_hole_diameter
+
+DEFAULT_ANGLE = 3.0        # 螺旋下刀角 φ (度)
+WRITE_CHUNK = 4096         # 每次寫入的行數
+
+
+@dataclass(frozen=True)
+class HelixTool:
+    """刀具：刀號、直徑 Dc (mm)、主軸轉速 (RPM)、進給 (mm/min)"""
+    number: int
+    diameter: float
+    rpm: float
+    feed: float
+
+
+@dataclass(frozen=True)
+class HoleSpec:
+    """孔位：中心 (x, y)、孔徑 Dm、深度 d（皆為 mm）、刀號"""
+    x: float
+    y: float
+    hole_dia: float
+    depth: float
+    tool: int
+
+
+@dataclass(frozen=True)
+class HelixOptions:
+    """程式選項"""
+    angle_deg: float = DEFAULT_ANGLE
+    top: float = 0.0           # 孔頂面 Z
+    clearance: float = 5.0     # 孔間移動的安全高度（相對頂面）
+    climb: bool = True         # 順銑 (G03)，False 為逆銑 (G02)
+    floor_pass: bool = True    # 到底後再走一整圈清底
+    decimals: int = 3
+    program_number: int = 1000
+
+
+@dataclass(frozen=True)
+class HelixPlan:
+    """單孔螺旋參數"""
+    radius: float              # 刀心軌跡半徑 r mm
+    pitch: float               # 實際每圈下降量 mm（≤ 角度換算值）
+    turns: int                 # 螺旋圈數
+    warning: str = ''
+
+
+def helix_pitch(hole_dia, tool_dia, angle_deg):
+    """角度 φ 對應的每圈下降量 p = π·(Dm - Dc)·tan(φ)"""
+    return math.pi * (hole_dia - tool_dia) * math.tan(math.radians(angle_deg))
+
+
+def plan_hole(hole, tool_dia, angle_deg=DEFAULT_ANGLE):
+    """計算單孔的螺旋半徑、圈數與每圈下降量
+
+    圈數取整後平均分配深度，實際角度不會超過 angle_deg
+    """
+    if tool_dia <= 0:
+        raise InputError('錯誤：刀具直徑必須大於0')
+    if hole.depth <= 0:
+        raise InputError('錯誤：切削深度必須大於0')
+    if hole.hole_dia <= tool_dia:
+        raise InputError(f'錯誤：孔徑必須大於刀具直徑 ({tool_dia}mm)')
+    if not 0 < angle_deg < 90:
+        raise InputError('錯誤：螺旋角度必須介於 0° 與 90° 之間')
+
+    warning = ''
+    min_hole_dia = min_hole_diameter(tool_dia)
+    if hole.hole_dia < min_hole_dia:
+        warning = f'警告：孔徑小於最小建議值 {min_hole_dia:.1f}mm'
+
+    max_pitch = helix_pitch(hole.hole_dia, tool_dia, angle_deg)
+    turns = max(1, math.ceil(hole.depth / max_pitch - 1e-9))
+    return HelixPlan((hole.hole_dia - tool_dia) / 2, hole.depth / turns, turns, warning)
+
+
+def hole_blocks(hole, tool, options=HelixOptions(), plan=None):
+    """單孔的程式段（不含換刀）：定位 → 下到頂面 → 螺旋 → 清底 → 回中心抬刀"""
+    plan = plan or plan_hole(hole, tool.diameter, options.angle_deg)
+    n = options.decimals
+    arc = 'G03' if options.climb else 'G02'
+    x, y, r = hole.x, hole.y, plan.radius
+    top = options.top
+    xs = f"X{x + r:.{n}f} Y{y:.{n}f}"
+    ij = f"I{-r:.{n}f} J0"
+    feed = f"F{tool.feed:.0f}"
+
+    yield f"G00 X{x:.{n}f} Y{y:.{n}f}"
+    yield f"G00 Z{top + options.clearance:.{n}f}"
+    yield f"G01 Z{top:.{n}f} {feed}"
+    yield f"G01 {xs}"
+    for k in range(1, plan.turns + 1):
+        yield f"{arc} {xs} {ij} Z{top - plan.pitch * k:.{n}f}"
+    if options.floor_pass:
+        yield f"{arc} {xs} {ij}"
+    yield f"G01 X{x:.{n}f} Y{y:.{n}f}"
+    yield f"G00 Z{top + options.clearance:.{n}f}"
+
+
+def program_blocks(holes, tools, options=HelixOptions()):
+    """完整程式的程式段產生器
+
+    holes 可為任意可迭代物件（例如 read_hole_table 的產生器），逐孔處理；
+    tools 為 {刀號: HelixTool}，刀號改變時才換刀
+    """
+    n = options.decimals
+    yield '%'
+    yield f"O{options.program_number:04d} (HELICAL HOLES)"
+    yield 'G90 G94 G17 G21'
+    current = None
+    for index, hole in enumerate(holes, 1):
+        tool = tools.get(hole.tool)
+        if tool is None:
+            raise InputError(f'錯誤：第 {index} 孔的刀號 T{hole.tool} 不在刀具表中')
+        try:
+            plan = plan_hole(hole, tool.diameter, options.angle_deg)
+        except InputError as e:
+            raise InputError(e.message.replace('錯誤：', f'錯誤：第 {index} 孔', 1), e.detail) from e
+        if tool.number != current:
+            if current is not None:
+                yield 'M05'
+            yield f"G00 Z{options.top + options.clearance:.{n}f}"
+            yield f"T{tool.number} M06"
+            yield f"S{tool.rpm:.0f} M03"
+            current = tool.number
+        yield (f"(HOLE {index} D{hole.hole_dia:g} Z-{hole.depth:g} "
+               f"TURNS {plan.turns} PITCH {plan.pitch:.{n}f})")
+        if plan.warning:
+            yield "(WARNING: HOLE < 1.2 X TOOL DIA)"
+        yield from hole_blocks(hole, tool, options, plan)
+    yield 'M05'
+    yield 'M30'
+    yield '%'
+
+
+def write_program(file, holes, tools, options=HelixOptions()):
+    """將程式逐批寫入檔案（路徑或文字檔物件），返回程式段數
+
+    路徑輸出先寫入暫存檔，完整產生後才改名，中途出錯時不會留下缺少 M30 的半截程式
+    """
+    if isinstance(file, str):
+        tmp_path = file + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='ascii', newline='\n') as f:
+                count = write_program(f, holes, tools, options)
+            os.replace(tmp_path, file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+    blocks = program_blocks(holes, tools, options)
+    count = 0
+    while True:
+        chunk = list(islice(blocks, WRITE_CHUNK))
+        if not chunk:
+            return count
+        file.write('\n'.join(chunk))
+        file.write('\n')
+        count += len(chunk)
+
+
+def read_hole_table(path):
+    """逐列讀取孔位表 CSV（欄位 x, y, Dm, depth, tool；第一列可為標題）"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                x, y, dm, depth = (float(v) for v in row[:4])
+                tool = int(row[4])
+            except (ValueError, IndexError):
+                if line == 1:
+                    continue  # 標題列
+                raise InputError(f'錯誤：孔位表第 {line} 列格式不正確: {",".join(row)}')
+            yield HoleSpec(x, y, dm, depth, tool)
+
+
+def parse_tool(text):
+    """解析 刀號:直徑:轉速:進給，例如 1:10:3000:800"""
+    try:
+        number, diameter, rpm, feed = text.split(':')
+        return HelixTool(int(number), float(diameter), float(rpm), float(feed))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'刀具格式應為 刀號:直徑:轉速:進給 ({text})')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='產生內徑螺旋銑 G 代碼')
+    parser.add_argument('holes', help='孔位表 CSV (x, y, Dm, depth, tool)')
+    parser.add_argument('output', help='輸出 NC 檔')
+    parser.add_argument('--tool', type=parse_tool, action='append', required=True,
+                        help='刀號:直徑:轉速:進給，可重複指定')
+    parser.add_argument('--angle', type=float, default=DEFAULT_ANGLE, help='螺旋下刀角 (度)')
+    parser.add_argument('--conventional', action='store_true', help='逆銑 (G02)')
+    args = parser.parse_args(argv)
+
+    tools = {t.number: t for t in args.tool}
+    options = HelixOptions(angle_deg=args.angle, climb=not args.conventional)
+    try:
+        count = write_program(args.output, read_hole_table(args.holes), tools, options)
+    except InputError as e:
+        parser.error(e.message)
+    print(f"已產生 {count} 個程式段: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
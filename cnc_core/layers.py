@@ -0,0 +1,123 @@
+"""
+螺旋銑/爬坡銑分層規劃（NumPy）
+將總深度 d 平均分為 n 層，使每層角度 φ = arctan((d/n)/B) 落在「安全」區間，
+並在所有可行的層數中選擇路徑最短、時間最少者；
+B 為內徑螺旋銑的 ΔR、外徑螺旋銑的 W、爬坡銑的 L。
+以 (特徵數 × 層數) 網格一次搜尋，可同時規劃數百個特徵
+
+路徑模型：每層斜坡長度 √(B² + (d/n)²)，層與層之間快速移動回到起點 (距離 B)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import FEED_LIMITS, MILLING_TYPES, SAFE_ANGLE_BANDS, InputError
+
+MAX_LAYERS = 100
+DEFAULT_FEED = 500.0            # 斜坡進給 mm/min（未指定時用於估算時間）
+RAPID_RATE = 10000.0            # 快速移動 mm/min
+
+
+@dataclass
+class LayerPlan:
+    """分層規劃結果，各欄位 shape = (特徵數,)"""
+    layers: np.ndarray          # 層數 n
+    layer_depth: np.ndarray     # 每層深度 mm
+    angle_deg: np.ndarray       # 每層角度 (度)
+    cut_length: np.ndarray      # 切削路徑長度 mm
+    path_length: np.ndarray     # 含層間移動的總路徑長度 mm
+    cycle_time: np.ndarray      # 估計時間 (分鐘)
+    feasible: np.ndarray        # 是否能落在安全區間（MAX_LAYERS 以內）
+
+    def __len__(self):
+        return len(self.layers)
+
+    def summary(self, i=0):
+        """單一特徵的建議文字"""
+        if not self.feasible[i]:
+            if self.layers[i] == 0:
+                return "分層建議：輸入無效，無法規劃"
+            if self.layers[i] == 1:
+                return "分層建議：角度已低於安全區間，不需分層"
+            return f"分層建議：{MAX_LAYERS} 層以內無法達到安全角度，請改變刀具或尺寸"
+        return (f"分層建議：分 {self.layers[i]} 層，每層 {self.layer_depth[i]:.2f} mm，"
+                f"角度 {self.angle_deg[i]:.1f}°\n"
+                f"總路徑 {self.path_length[i]:.0f} mm，約 {self.cycle_time[i]:.1f} 分鐘")
+
+
+def ramp_base(milling_types, tool_dia, dim1, dim2=None):
+    """角度公式的分母 B：ΔR = (Dm - Dc)/2、W 或 L"""
+    milling_types = np.asarray(milling_types)
+    tool_dia = np.asarray(tool_dia, dtype=np.float64)
+    dim1 = np.asarray(dim1, dtype=np.float64)
+    dim2 = np.full(np.broadcast(milling_types, dim1).shape, np.nan) if dim2 is None \
+        else np.asarray(dim2, dtype=np.float64)
+    return np.select(
+        [milling_types == '內徑螺旋銑', milling_types == '外徑螺旋銑'],
+        [(dim1 - tool_dia) / 2, dim2],
+        dim1)
+
+
+def plan_layers(milling_types, tool_dia, depth, dim1, dim2=None,
+                feed=DEFAULT_FEED, rapid=RAPID_RATE, max_layers=MAX_LAYERS):
+    """批次分層規劃
+
+    所有參數依 NumPy 規則廣播；輸入無效（B 或深度非正數）的特徵
+    層數為 0、其餘欄位為 NaN
+    """
+    milling_types = np.asarray(milling_types)
+    unknown = ~np.isin(milling_types, MILLING_TYPES)
+    if unknown.any():
+        raise InputError(f"錯誤: 未知銑削類型 {milling_types[unknown].ravel()[0]}")
+    if np.any(np.asarray(feed) <= 0) or rapid <= 0:
+        raise InputError("錯誤: 進給速度必須大於0")
+
+    base = ramp_base(milling_types, tool_dia, dim1, dim2)
+    milling_types, base, depth, feed = np.broadcast_arrays(
+        milling_types, base, np.asarray(depth, dtype=np.float64),
+        np.clip(np.asarray(feed, dtype=np.float64), *FEED_LIMITS))
+    shape = base.shape
+    base, depth, feed = base.ravel(), depth.ravel(), feed.ravel()
+    bands = np.array([SAFE_ANGLE_BANDS[t] for t in MILLING_TYPES], dtype=np.float64)
+    codes = np.select([milling_types.ravel() == t for t in MILLING_TYPES], range(len(MILLING_TYPES)))
+    low, high = bands[codes].T
+
+    valid = (base > 0) & (depth > 0) & np.isfinite(base)
+    safe_base = np.where(valid, base, 1.0)[:, None]
+
+    # (特徵數, 層數) 網格
+    n = np.arange(1, max_layers + 1, dtype=np.float64)
+    layer_depth = np.where(valid, depth, 0.0)[:, None] / n
+    angle = np.degrees(np.arctan(layer_depth / safe_base))
+    in_band = (angle >= low[:, None]) & (angle < high[:, None])
+
+    ramp = np.hypot(safe_base, layer_depth)
+    cut_length = n * ramp
+    rapid_length = (n - 1) * safe_base
+    cycle_time = cut_length / feed[:, None] + rapid_length / rapid
+
+    feasible = in_band.any(axis=1) & valid
+    # 可行時取時間最短者；不可行時，角度已偏小取 1 層，否則取上限層數
+    best = np.argmin(np.where(in_band, cycle_time, np.inf), axis=1)
+    best = np.where(feasible, best, np.where(angle[:, 0] < low, 0, max_layers - 1))
+    rows = np.arange(len(best))
+
+    def pick(grid):
+        return np.where(valid, grid[rows, best], np.nan).reshape(shape)
+
+    return LayerPlan(
+        layers=np.where(valid, best + 1, 0).reshape(shape),
+        layer_depth=pick(layer_depth),
+        angle_deg=pick(angle),
+        cut_length=pick(cut_length),
+        path_length=pick(cut_length + rapid_length),
+        cycle_time=pick(cycle_time),
+        feasible=feasible.reshape(shape),
+    )
+
+
+def plan_for(inp, feed=DEFAULT_FEED):
+    """單一 HelicalInput 的分層規劃"""
+    return plan_layers([inp.milling_type], [inp.tool_dia], [inp.depth], [inp.dim1],
+                       None if inp.dim2 is None else [inp.dim2], feed=feed)
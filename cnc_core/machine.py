@@ -0,0 +1,76 @@
+"""
+機台參數設定
+週期時間估算使用的進給/快速移動速度與加速度，以及切削條件檢查使用的主軸功率/扭力曲線：
+未指定 power_curve 時，base_rpm 以下為定扭力（功率與轉速成正比），以上為定功率
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Tuple
+
+from .engine import FEED_LIMITS, RPM_LIMITS, TORQUE_FACTOR
+
+
+@dataclass(frozen=True)
+class MachineProfile:
+    """機台參數"""
+    name: str
+    max_feed: float = FEED_LIMITS[1]     # 切削進給上限 mm/min
+    rapid: float = 15000.0               # 快速移動速度 mm/min
+    accel: float = 1500.0                # 軸加速度 mm/s²
+    junction_deviation: float = 0.02     # 轉角偏差 mm（決定轉角速度）
+    tool_change: float = 6.0             # 換刀時間 s
+    max_rpm: float = RPM_LIMITS[1]
+    spindle_power: float = 7.5           # 主軸連續額定功率 kW
+    base_rpm: float = 1500.0             # 額定功率起始轉速（以下為定扭力）
+    efficiency: float = 0.85             # 主軸傳動效率
+    power_curve: Tuple[Tuple[float, float], ...] = ()   # ((RPM, kW), ...)，指定時取代上述模型
+
+    def __post_init__(self):
+        for name in ('max_feed', 'rapid', 'accel', 'junction_deviation',
+                     'spindle_power', 'base_rpm', 'efficiency'):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} 必須大於0")
+        if any(b[0] <= a[0] for a, b in zip(self.power_curve, self.power_curve[1:])):
+            raise ValueError("power_curve 的轉速必須遞增")
+
+    @property
+    def rated_rpm(self):
+        """達到最大功率的最低轉速（以下可用功率隨轉速下降）"""
+        if not self.power_curve:
+            return self.base_rpm
+        peak = max(p for _, p in self.power_curve)
+        return next(n for n, p in self.power_curve if p == peak)
+
+    def available_power(self, rpm):
+        """轉速 rpm 時主軸可用功率 kW（曲線之間線性內插，超出範圍取端點值）"""
+        curve = self.power_curve
+        if not curve:
+            return self.spindle_power * min(1.0, rpm / self.base_rpm)
+        i = bisect_right([n for n, _ in curve], rpm)
+        if i == 0:
+            n, p = curve[0]
+            return p * rpm / n   # 曲線起點以下視為定扭力
+        if i == len(curve):
+            return curve[-1][1]
+        (n0, p0), (n1, p1) = curve[i - 1], curve[i]
+        return p0 + (p1 - p0) * (rpm - n0) / (n1 - n0)
+
+    def available_torque(self, rpm):
+        """轉速 rpm 時主軸可用扭力 N·m"""
+        return self.available_power(rpm) * TORQUE_FACTOR / rpm
+
+
+# 常用機台設定
+MACHINE_PROFILES = {
+    '標準立式加工中心': MachineProfile('標準立式加工中心', max_rpm=12000.0),
+    '高速加工機': MachineProfile('高速加工機', max_feed=FEED_LIMITS[1], rapid=40000.0,
+                              accel=5000.0, junction_deviation=0.01, tool_change=2.5,
+                              spindle_power=15.0, base_rpm=6000.0),
+    '桌上型雕銑機': MachineProfile('桌上型雕銑機', max_feed=3000.0, rapid=5000.0,
+                              accel=500.0, junction_deviation=0.05, tool_change=30.0,
+                              spindle_power=2.2, efficiency=0.9,
+                              power_curve=((6000.0, 0.6), (12000.0, 1.5), (18000.0, 2.2))),
+}
+
+DEFAULT_MACHINE = MACHINE_PROFILES['標準立式加工中心']
@@ -0,0 +1,413 @@
+"""
+NC 程式檢查：以 mmap 串流掃描 S/F/T 與 G94-G97 字，
+依宣告的材料與刀具計算轉速/進給範圍，標示超出範圍的程式段
+
+範圍與切削條件計算器一致：
+    轉速  [M(vc_min), M(vc_max)]，M = VC×1000/(π×D)，已套用 100-20000 RPM 限制
+    進給  [F(S, fz_min), F(S, fz_max)]，F = S×N×fz，已套用 10-5000 mm/min 限制
+fz 範圍預設為粗加工與精加工範圍的聯集；G96 時 S 為切削速度，直接檢查 vc 範圍；
+G95 時 F 為每轉進給，檢查 F/N 是否在 fz 範圍內。括號與分號註解會被略過。
+同一程式段內字的順序不影響結果：先套用該段的 G9x、換刀與 S，再檢查該段的 F；
+T 字只預選刀具，遇到 M06 才換刀（整個程式沒有 M06 時才以 T 字換刀，與 toolpath 相同）
+
+用法: python -m cnc_core.nc_analyzer 程式.nc --material 鋁合金 --tool 1:10:3 [--tool 2:6:2]
+"""
+
+import argparse
+import heapq
+import mmap
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .engine import FEED_LIMITS, InputError, feed_rate, spindle_speed
+from .refdata import store
+
+# S/T/M/G94-G97 與註解很少出現，以 bytes.find 定位；F 字以單一正規表示式批次擷取
+EVENT_TOKENS = (b'S', b'T', b'M', b'G9', b'(', b';')
+F_PATTERN = re.compile(rb'F\s*(-?[\d.]+)')
+NUMBER_PATTERN = re.compile(rb'\s*(-?(?:\d+\.?\d*|\.\d+))')
+MODAL_PATTERN = re.compile(rb'G(9[4-7])(?!\d)')
+
+DEFAULT_TOLERANCE = 0.02   # 允許超出範圍的比例
+MAX_FLAGS = 1000           # 最多保留的標示筆數（總數仍會統計）
+COUNT_CHUNK = 1 << 20      # 計算行號時每次讀取的位元組數
+SCAN_CHUNK = 4 << 20       # 每段掃描的位元組數
+
+
+@dataclass(frozen=True)
+class NCTool:
+    """刀具：直徑 D (mm) 與齒數 N"""
+    diameter: float
+    teeth: int
+
+
+@dataclass(frozen=True)
+class ToolWindow:
+    """單一刀具的允許範圍"""
+    vc: Tuple[float, float]       # m/min
+    fz: Tuple[float, float]       # mm/tooth
+    rpm: Tuple[float, float]      # RPM（已限制）
+    teeth: int
+
+    def feed(self, rpm):
+        """轉速 rpm 下的進給範圍 (mm/min，已限制)"""
+        return feed_rate(rpm, self.teeth, self.fz[0]), feed_rate(rpm, self.teeth, self.fz[1])
+
+
+@dataclass(frozen=True)
+class NCFlag:
+    """超出範圍的程式段"""
+    line: int
+    word: str                     # 例如 'S24000'
+    reason: str
+    window: Optional[Tuple[float, float]]
+    tool: Optional[int] = None
+
+
+@dataclass
+class NCReport:
+    """檢查結果"""
+    path: str
+    material: str
+    size: int = 0                 # 位元組
+    lines: int = 0
+    words: dict = field(default_factory=lambda: {'S': 0, 'F': 0, 'T': 0, 'G': 0})
+    flags: List[NCFlag] = field(default_factory=list)
+    flag_count: int = 0
+    elapsed: float = 0.0          # 秒
+
+    @property
+    def throughput(self):
+        """掃描速度 MB/s"""
+        return self.size / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def report(self, limit=50):
+        lines = [
+            f"檔案: {self.path}",
+            f"材料: {self.material}",
+            f"大小: {self.size / 1e6:.1f} MB，{self.lines} 行，"
+            f"S {self.words['S']} / F {self.words['F']} / T {self.words['T']} / G94-97 {self.words['G']} 個字",
+            f"掃描時間: {self.elapsed:.2f} s ({self.throughput:.0f} MB/s)",
+            f"超出範圍: {self.flag_count} 處",
+        ]
+        for flag in self.flags[:limit]:
+            tool = f" T{flag.tool}" if flag.tool is not None else ''
+            limits = f" ({_fmt(flag.window[0])}-{_fmt(flag.window[1])})" if flag.window else ''
+            lines.append(f"  第 {flag.line} 行{tool} {flag.word}: {flag.reason}{limits}")
+        if self.flag_count > limit:
+            lines.append(f"  ... 另有 {self.flag_count - limit} 處")
+        return '\n'.join(lines)
+
+
+def _fmt(value):
+    return f"{value:.0f}" if value >= 10 else f"{value:g}"
+
+
+def tool_window(material, tool, machining_type=None):
+    """材料與刀具的允許範圍；machining_type 為 None 時 fz 取粗/精加工的聯集"""
+    params = store().material(material)
+    if params is None:
+        raise InputError("錯誤: 未知材料")
+    if tool.diameter <= 0:
+        raise InputError("錯誤: 刀具直徑必須大於0")
+    if tool.teeth <= 0:
+        raise InputError("錯誤: 刀具齒數必須大於0")
+    if machining_type == "粗加工":
+        fz = params.fz_rough
+    elif machining_type == "精加工":
+        fz = params.fz_finish
+    else:
+        fz = (min(params.fz_rough[0], params.fz_finish[0]), max(params.fz_rough[1], params.fz_finish[1]))
+    vc_min, vc_max = params.vc_range
+    rpm = (spindle_speed(vc_min, tool.diameter), spindle_speed(vc_max, tool.diameter))
+    return ToolWindow(params.vc_range, fz, rpm, tool.teeth)
+
+
+def _outside(value, window, tolerance):
+    low, high = window
+    return value < low * (1 - tolerance) or value > high * (1 + tolerance)
+
+
+def _count_newlines(buf, start, end):
+    """分段計算換行數，避免複製大範圍資料"""
+    count = 0
+    for pos in range(start, end, COUNT_CHUNK):
+        count += buf[pos:min(pos + COUNT_CHUNK, end)].count(b'\n')
+    return count
+
+
+class _Scanner:
+    """掃描狀態：目前刀具、轉速與 G94-G97 模態"""
+
+    def __init__(self, buf, report, windows, window, tolerance, max_flags):
+        self.buf = buf
+        self.report = report
+        self.windows = windows
+        self.window = window
+        self.tolerance = tolerance
+        self.max_flags = max_flags
+        self.tool_number = None
+        self.pending_tool = None   # 最近的 T 字（預選刀具）
+        self.tool_changes = False  # 程式中已出現 M06
+        self.rpm = None
+        # 目前程式段內待套用的狀態：T 字位置、是否有 M06、S 字 [(位置, 值)]
+        self.block_tool = None
+        self.block_change = False
+        self.block_speeds = []
+        self.css = False           # G96 恆線速
+        self.per_rev = False       # G95 每轉進給
+        self.line = 1
+        self.line_pos = 0
+
+    def flag(self, pos, word, reason, limits, count=1):
+        report = self.report
+        report.flag_count += count
+        if len(report.flags) < self.max_flags:
+            self.line += _count_newlines(self.buf, self.line_pos, pos)
+            self.line_pos = pos
+            report.flags.append(NCFlag(self.line, word, reason, limits, self.tool_number))
+
+    def feed_problem(self, feed):
+        """進給 feed 超出範圍時返回 (原因, 範圍)，否則 None"""
+        window = self.window
+        if window is None:
+            return None
+        if self.per_rev:
+            # 每轉進給 F = N × fz
+            limits = (window.fz[0] * window.teeth, window.fz[1] * window.teeth)
+            if _outside(feed, limits, self.tolerance):
+                return "每轉進給超出範圍", limits
+        elif self.rpm is not None and not self.css:
+            limits = window.feed(self.rpm)
+            if _outside(feed, limits, self.tolerance):
+                return "進給超出範圍", limits
+        elif _outside(feed, FEED_LIMITS, 0):
+            return "進給超出安全限制", FEED_LIMITS
+        return None
+
+    def feeds(self, start, end):
+        """檢查 [start, end) 內的所有 F 字（此範圍內狀態不變）
+
+        相同數值只判斷一次；只有超出範圍的數值才逐一定位
+        """
+        if start >= end:
+            return
+        values = F_PATTERN.findall(self.buf, start, end)
+        if not values:
+            return
+        self.report.words['F'] += len(values)
+        bad = {}
+        for raw, count in Counter(values).items():
+            try:
+                problem = self.feed_problem(float(raw))
+            except ValueError:
+                continue
+            if problem:
+                bad[raw] = problem
+                self.report.flag_count += count
+        if not bad or len(self.report.flags) >= self.max_flags:
+            return
+        # 依位置順序記錄，總數已計入 flag_count
+        pattern = re.compile(rb'F\s*(' + b'|'.join(re.escape(v) for v in bad) + rb')(?![\d.])')
+        for m in pattern.finditer(self.buf, start, end):
+            reason, limits = bad[m.group(1)]
+            self.flag(m.start(), f"F{float(m.group(1)):g}", reason, limits, count=0)
+            if len(self.report.flags) >= self.max_flags:
+                break
+
+    def event(self, pos, kind):
+        """處理 S/T/M/G9x 字或註解，返回處理後的位置；T、M06 與 S 留到程式段結束時套用"""
+        buf = self.buf
+        if kind == b'(':
+            line_end = _line_end(buf, pos)
+            end = buf.find(b')', pos, line_end)
+            return line_end if end == -1 else end + 1
+        if kind == b';':
+            return _line_end(buf, pos)
+        if kind == b'G9':
+            m = MODAL_PATTERN.match(buf, pos)
+            if m is None:
+                return pos + 1
+            self.report.words['G'] += 1
+            g = m.group(1)
+            if g == b'96':
+                self.css = True
+            elif g == b'97':
+                self.css = False
+            else:
+                self.per_rev = g == b'95'
+            return m.end()
+
+        m = NUMBER_PATTERN.match(buf, pos + 1)
+        if m is None:
+            return pos + 1
+        value = float(m.group(1))
+        if kind == b'S':
+            self.report.words['S'] += 1
+            self.block_speeds.append((pos, value))
+        elif kind == b'T':
+            self.report.words['T'] += 1
+            self.pending_tool = int(value)
+            self.block_tool = pos
+        elif value == 6:
+            self.block_change = True
+        return m.end()
+
+    def end_block(self):
+        """套用程式段內的換刀與 S 字（F 字由呼叫端隨後檢查）"""
+        if self.block_change:
+            self.tool_changes = True
+            self.change_tool(self.block_tool)
+        elif self.block_tool is not None and not self.tool_changes:
+            self.change_tool(self.block_tool)      # 沒有 M06 的程式以 T 字換刀
+        for pos, value in self.block_speeds:
+            self.speed(pos, value)
+        self.block_tool = None
+        self.block_change = False
+        self.block_speeds = []
+
+    def change_tool(self, pos):
+        number = self.pending_tool
+        if number is None or number == self.tool_number:
+            return
+        self.tool_number = number
+        self.window = self.windows.get(number)
+        if self.window is None:
+            self.flag(pos, f"T{number}", "刀號未定義，略過此刀具的檢查", None)
+
+    def speed(self, pos, value):
+        self.rpm = value
+        window = self.window
+        if window is None:
+            return
+        if self.css:
+            if _outside(value, window.vc, self.tolerance):
+                self.flag(pos, f"S{value:g}", "切削速度 (G96) 超出範圍", window.vc)
+        elif _outside(value, window.rpm, self.tolerance):
+            self.flag(pos, f"S{value:g}", "轉速超出範圍", window.rpm)
+
+    def run(self, chunk_size=SCAN_CHUNK):
+        buf = self.buf
+        size = len(buf)
+        start = 0
+        while start < size:
+            # 分段處理（段尾對齊換行），F 字清單的大小與檔案大小無關
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = buf.rfind(b'\n', start, end)
+                end = newline + 1 if newline != -1 else end
+            events = [_find_all(buf, token, start, end) for token in EVENT_TOKENS]
+            cursor = start
+            block_end = start      # 含事件的程式段結尾（換行位置）
+            spans = []             # 該段內註解以外的範圍，段結束後才檢查其中的 F 字
+            for pos, kind in heapq.merge(*events):
+                if pos < cursor:
+                    continue       # 位於註解內或已處理的字
+                if pos >= block_end:
+                    cursor = self._finish_block(cursor, block_end, spans)
+                    # 之前的程式段沒有事件，狀態不變，可直接檢查
+                    line_start = max(buf.rfind(b'\n', cursor, pos) + 1, cursor)
+                    self.feeds(cursor, line_start)
+                    cursor = line_start
+                    block_end = _line_end(buf, pos)
+                    spans = []
+                spans.append((cursor, pos))
+                cursor = self.event(pos, kind)
+            cursor = self._finish_block(cursor, block_end, spans)
+            self.feeds(cursor, end)
+            start = end
+
+    def _finish_block(self, cursor, block_end, spans):
+        """程式段結束：先套用狀態，再檢查段內的 F 字，返回新的位置"""
+        if cursor < block_end:
+            spans.append((cursor, block_end))
+            cursor = block_end
+        self.end_block()
+        for span in spans:
+            self.feeds(*span)
+        return cursor
+
+
+def _line_end(buf, pos):
+    end = buf.find(b'\n', pos)
+    return len(buf) if end == -1 else end
+
+
+def _find_all(buf, token, start, end):
+    """token 在 [start, end) 內的所有位置 [(位置, token)]（bytes.find 逐一搜尋，速度接近 memchr）"""
+    found = []
+    pos = buf.find(token, start, end)
+    while pos != -1:
+        found.append((pos, token))
+        pos = buf.find(token, pos + 1, end)
+    return found
+
+
+def scan(buf, material, tools, default_tool=None, machining_type=None,
+         tolerance=DEFAULT_TOLERANCE, max_flags=MAX_FLAGS, report=None):
+    """掃描 bytes/mmap 內容，返回 NCReport
+
+    tools 為 {刀號: NCTool}；default_tool 用於第一個 T 字之前的程式段
+    """
+    report = report or NCReport('<buffer>', material)
+    windows = {number: tool_window(material, tool, machining_type) for number, tool in tools.items()}
+    default_window = tool_window(material, default_tool, machining_type) if default_tool else None
+    _Scanner(buf, report, windows, default_window, tolerance, max_flags).run()
+    report.size = len(buf)
+    report.lines = _count_newlines(buf, 0, len(buf)) + (1 if len(buf) and buf[-1:] != b'\n' else 0)
+    return report
+
+
+def analyze(path, material, tools, default_tool=None, machining_type=None,
+            tolerance=DEFAULT_TOLERANCE, max_flags=MAX_FLAGS):
+    """以 mmap 檢查 NC 檔（記憶體用量與檔案大小無關）"""
+    start = time.perf_counter()
+    report = NCReport(path, material)
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            buf = b''     # 空檔案無法 mmap
+        try:
+            scan(buf, material, tools, default_tool, machining_type, tolerance, max_flags, report)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def parse_tool(text):
+    """解析 刀號:直徑:齒數，例如 1:10:3"""
+    try:
+        number, diameter, teeth = text.split(':')
+        return int(number), NCTool(float(diameter), int(teeth))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'刀具格式應為 刀號:直徑:齒數 ({text})')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='檢查 NC 程式的轉速與進給')
+    parser.add_argument('path', help='NC 檔')
+    parser.add_argument('--material', required=True, help='材料')
+    parser.add_argument('--tool', type=parse_tool, action='append', required=True,
+                        help='刀號:直徑:齒數，可重複指定；第一把也用於 T 字之前的程式段')
+    parser.add_argument('--type', choices=('粗加工', '精加工'), help='加工類型（預設粗/精加工皆可）')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='容許誤差比例')
+    parser.add_argument('--limit', type=int, default=50, help='列出的標示筆數')
+    args = parser.parse_args(argv)
+
+    tools = dict(args.tool)
+    try:
+        report = analyze(args.path, args.material, tools, default_tool=args.tool[0][1],
+                         machining_type=args.type, tolerance=args.tolerance)
+    except InputError as e:
+        parser.error(e.message)
+    print(report.report(args.limit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+最大金屬移除率切削條件搜尋（NumPy）
+在材料 VC/fz 範圍 × ap × ae 的連續空間中取樣，轉速與進給和切削條件計算器一樣限制在
+安全範圍與機台上限內（以限制後實際的 VC、fz 計算），再向量化檢查：
+    主軸可用功率（Kienzle kc）、刀尖撓度（懸臂樑，與 compute_tool 相同）、最低刀具壽命（Taylor）
+可行解取 MRR 與刀具壽命的 Pareto 前緣，再在前緣各點附近細分取樣數次。
+取樣點多時依 VC 分段交給多個行程計算，各行程只傳回區段內的前緣。
+
+    MRR = ap·ae·vf / 1000 (cm³/min)
+
+用法: python -m cnc_core.optimize 碳鋼 --dia 10 --teeth 4 [--type 粗加工] [--machine 名稱]
+      [--stick-out 35] [--min-life 15] [--max-ap 10] [--max-ae 10] [--resolution 24] [--workers 4]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from .deflection import ARRAY_OPS, cutting_force
+from .engine import (
+    DEFLECTION_LIMIT, FEED_LIMITS, HOLDER_STIFFNESS, RPM_LIMITS, TOOL_MODULUS, InputError,
+    cutting_power, mean_chip_thickness, specific_cutting_force, taylor_constants, tool_deflection,
+)
+from .machine import DEFAULT_MACHINE, MACHINE_PROFILES, MachineProfile
+from .refdata import store
+from .spindle import available_power
+
+DEFAULT_RESOLUTION = 24        # 每個變數的取樣點數
+REFINE_ROUNDS = 3              # 前緣附近細分次數
+REFINE_POINTS = 5              # 細分時每個變數的取樣點數
+POOL_THRESHOLD = 1_000_000     # 取樣點超過此數才使用行程池
+MIN_FRACTION = 0.05            # ap、ae 的搜尋下限（佔上限的比例）
+CONSTRAINTS = ('功率', '撓度', '壽命')
+
+
+@dataclass(frozen=True)
+class OptimizeOptions:
+    """搜尋條件"""
+    material: str
+    diameter: float
+    teeth: int
+    machining_type: str = '粗加工'
+    tool_material: str = '碳化鎢'
+    machine: MachineProfile = DEFAULT_MACHINE
+    stick_out: Optional[float] = None      # 刀具伸長 mm，None 為 3 倍直徑
+    deflection_limit: float = DEFLECTION_LIMIT
+    min_life: float = 15.0                 # 最低刀具壽命 min
+    max_depth: Optional[float] = None      # ap 上限 mm，None 為 1 倍直徑
+    max_width: Optional[float] = None      # ae 上限 mm，None 為全槽
+
+    def __post_init__(self):
+        if self.diameter <= 0 or self.teeth <= 0:
+            raise InputError("錯誤：刀具直徑與齒數必須大於0")
+        if self.deflection_limit <= 0 or self.min_life < 0:
+            raise InputError("錯誤：撓度上限必須大於0，最低壽命不可為負")
+        for name in ('stick_out', 'max_depth', 'max_width'):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise InputError("錯誤：請輸入有效的正數")
+        if store().material(self.material) is None:
+            raise InputError(f"錯誤: 未知材料 {self.material}")
+
+    @property
+    def bounds(self):
+        """((vc), (fz), (ap), (ae)) 的搜尋範圍"""
+        params = store().material(self.material)
+        fz = params.fz_rough if self.machining_type == '粗加工' else params.fz_finish
+        ap = self.max_depth or self.diameter
+        ae = min(self.max_width or self.diameter, self.diameter)
+        return (tuple(params.vc_range), tuple(fz), (ap * MIN_FRACTION, ap), (ae * MIN_FRACTION, ae))
+
+
+@dataclass(frozen=True)
+class CuttingPoint:
+    """一組可行的切削條件"""
+    vc: float
+    fz: float
+    depth: float
+    width: float
+    rpm: float
+    feed: float
+    mrr: float                 # cm³/min
+    life: float                # min
+    power: float               # 所需功率 kW
+    deflection: float          # mm
+
+
+@dataclass
+class OptimizeResult:
+    """搜尋結果：front 依 MRR 由大到小（壽命由短到長）"""
+    options: OptimizeOptions
+    front: list
+    evaluated: int
+    feasible: int
+    violations: dict = field(default_factory=dict)   # 各限制不滿足的取樣點數
+
+    @property
+    def best(self):
+        """MRR 最大的可行解"""
+        return self.front[0] if self.front else None
+
+    def report(self, rows=10):
+        opt = self.options
+        lines = [f"{opt.material} D{opt.diameter:g} {opt.teeth} 刃 {opt.machining_type}，"
+                 f"{opt.machine.name}，最低壽命 {opt.min_life:g} min",
+                 f"取樣 {self.evaluated:,} 點，可行 {self.feasible:,} 點"]
+        if self.violations:
+            lines.append("不滿足：" + "，".join(f"{k} {v:,}" for k, v in self.violations.items() if v))
+        if not self.front:
+            lines.append("沒有可行的切削條件，請放寬壽命、撓度限制或縮短刀具伸長")
+            return '\n'.join(lines)
+        lines += ["", "MRR 與刀具壽命 Pareto 前緣："]
+        step = max(1, len(self.front) // rows)
+        for p in self.front[::step][:rows]:
+            lines.append(f"• MRR {p.mrr:.1f} cm³/min，壽命 {p.life:.0f} min：VC {p.vc:.0f}，"
+                         f"fz {p.fz:.3f}，ap {p.depth:.2f}，ae {p.width:.2f}，"
+                         f"S{p.rpm:.0f} F{p.feed:.0f}，{p.power:.2f} kW，撓度 {p.deflection * 1000:.0f} μm")
+        return '\n'.join(lines)
+
+
+def _problem(opt):
+    """傳給各行程的常數（只含可序列化的數值）"""
+    params = store().material(opt.material)
+    c, n = taylor_constants(params, opt.tool_material)
+    return dict(
+        diameter=opt.diameter, teeth=opt.teeth, kc=params.kc, mc=params.mc,
+        modulus=TOOL_MODULUS.get(opt.tool_material, TOOL_MODULUS["碳化鎢"]),
+        stick_out=opt.stick_out or 3 * opt.diameter, limit=opt.deflection_limit,
+        taylor=(c, n), min_life=opt.min_life, machine=opt.machine,
+        rpm_limits=(RPM_LIMITS[0], min(RPM_LIMITS[1], opt.machine.max_rpm)),
+        feed_limits=(FEED_LIMITS[0], min(FEED_LIMITS[1], opt.machine.max_feed)),
+    )
+
+
+def _pareto(mrr, life):
+    """MRR 與壽命都越大越好的非支配點索引，依 MRR 由大到小"""
+    order = np.lexsort((-life, -mrr))
+    best = np.maximum.accumulate(life[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = life[order][1:] > best[:-1]
+    return order[keep]
+
+
+def _evaluate(args):
+    """評估 vc × fz × ap × ae 的全部組合，返回 (前緣欄位, 可行數, 各限制不滿足數)"""
+    vc, fz, ap, ae, prob = args
+    vc, fz, ap, ae = (a.ravel() for a in np.meshgrid(vc, fz, ap, ae, indexing='ij'))
+    d, z = prob['diameter'], prob['teeth']
+    # 轉速、進給限制後的實際 VC、fz
+    rpm = np.clip(vc * 1000 / (np.pi * d), *prob['rpm_limits'])
+    feed = np.clip(rpm * z * fz, *prob['feed_limits'])
+    vc = rpm * np.pi * d / 1000
+    fz = feed / (rpm * z)
+    # 功率與撓度使用 engine 的公式（以 NumPy 陣列呼叫），與 compute_cutting、compute_tool 一致
+    kc = specific_cutting_force(prob['kc'], prob['mc'], mean_chip_thickness(fz, d, ae, ARRAY_OPS))
+    machine = prob['machine']
+    power = cutting_power(kc, ap, ae, feed) / machine.efficiency
+    force = cutting_force(d, z, fz, ap, ae, kc)
+    deflection = tool_deflection(prob['stick_out'], d, prob['modulus'], force, HOLDER_STIFFNESS)
+    c, n = prob['taylor']
+    life = (c / vc) ** (1 / n)
+
+    checks = (
+        power <= available_power(machine, rpm),
+        deflection <= prob['limit'],
+        life >= prob['min_life'],
+    )
+    ok = np.logical_and.reduce(checks)
+    violations = [int((~c_).sum()) for c_ in checks]
+    idx = np.flatnonzero(ok)
+    mrr = ap[idx] * ae[idx] * feed[idx] / 1000
+    keep = idx[_pareto(mrr, life[idx])]
+    columns = np.stack([vc[keep], fz[keep], ap[keep], ae[keep], rpm[keep], feed[keep],
+                        ap[keep] * ae[keep] * feed[keep] / 1000, life[keep], power[keep],
+                        deflection[keep]], axis=1)
+    return columns, len(idx), violations
+
+
+def _merge(results):
+    columns = np.concatenate([r[0] for r in results]) if results else np.empty((0, 10))
+    feasible = sum(r[1] for r in results)
+    violations = np.sum([r[2] for r in results], axis=0) if results else np.zeros(len(CONSTRAINTS))
+    front = columns[_pareto(columns[:, 6], columns[:, 7])] if len(columns) else columns
+    return front, feasible, violations
+
+
+def _axes(bounds, points):
+    return [np.linspace(lo, hi, points) for lo, hi in bounds]
+
+
+def optimize(options, resolution=DEFAULT_RESOLUTION, refine=REFINE_ROUNDS, workers=None):
+    """搜尋最大 MRR 的切削條件，返回 MRR 與刀具壽命的 Pareto 前緣
+
+    workers 為行程數（None 為 CPU 核心數）；取樣點少於 POOL_THRESHOLD 時不使用行程池
+    """
+    if resolution < 2:
+        raise InputError("錯誤：取樣點數至少為 2")
+    prob = _problem(options)
+    bounds = options.bounds
+    vc, fz, ap, ae = _axes(bounds, resolution)
+    total = resolution ** 4
+    workers = min(workers or os.cpu_count() or 1, resolution)
+    if workers > 1 and total >= POOL_THRESHOLD:
+        # 依 VC 分段，每個行程處理數個 VC 值的全部組合
+        jobs = [(chunk, fz, ap, ae, prob) for chunk in np.array_split(vc, workers * 4)]
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_evaluate, jobs))
+    else:
+        per_job = max(1, POOL_THRESHOLD // resolution ** 3)
+        results = [_evaluate((vc[i:i + per_job], fz, ap, ae, prob))
+                   for i in range(0, resolution, per_job)]
+    front, feasible, violations = _merge(results)
+    evaluated = total
+
+    # 在前緣各點附近（±1 個網格間距）細分取樣
+    steps = np.array([(hi - lo) / (resolution - 1) for lo, hi in bounds])
+    lows = np.array([lo for lo, _ in bounds])
+    highs = np.array([hi for _, hi in bounds])
+    for _ in range(refine):
+        if not len(front):
+            break
+        results = [(front, 0, np.zeros(len(CONSTRAINTS), dtype=int))]
+        for point in front[:, :4]:
+            lo = np.maximum(point - steps, lows)
+            hi = np.minimum(point + steps, highs)
+            axes = [np.linspace(a, b, REFINE_POINTS) for a, b in zip(lo, hi)]
+            results.append(_evaluate((*axes, prob)))
+        evaluated += (len(results) - 1) * REFINE_POINTS ** 4
+        front, extra, _ = _merge(results)
+        feasible += extra
+        steps = steps * 2 / (REFINE_POINTS - 1)
+
+    points = [CuttingPoint(*(float(v) for v in row)) for row in front]
+    return OptimizeResult(options, points, evaluated, feasible,
+                          dict(zip(CONSTRAINTS, (int(v) for v in violations))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='最大金屬移除率切削條件搜尋')
+    parser.add_argument('material', help='材料')
+    parser.add_argument('--dia', type=float, required=True, help='刀具直徑 mm')
+    parser.add_argument('--teeth', type=int, required=True, help='齒數')
+    parser.add_argument('--type', default='粗加工', choices=('粗加工', '精加工'))
+    parser.add_argument('--tool-material', default='碳化鎢', choices=list(TOOL_MODULUS))
+    parser.add_argument('--machine', choices=list(MACHINE_PROFILES), default=DEFAULT_MACHINE.name)
+    parser.add_argument('--stick-out', type=float, help='刀具伸長 mm（預設 3 倍直徑）')
+    parser.add_argument('--deflection', type=float, default=DEFLECTION_LIMIT, help='允許撓度 mm')
+    parser.add_argument('--min-life', type=float, default=15.0, help='最低刀具壽命 min')
+    parser.add_argument('--max-ap', type=float, help='軸向切深上限 mm')
+    parser.add_argument('--max-ae', type=float, help='徑向切寬上限 mm')
+    parser.add_argument('--resolution', type=int, default=DEFAULT_RESOLUTION, help='每個變數的取樣點數')
+    parser.add_argument('--workers', type=int, help='行程數（預設為 CPU 核心數）')
+    args = parser.parse_args(argv)
+    try:
+        options = OptimizeOptions(args.material, args.dia, args.teeth, args.type, args.tool_material,
+                                  MACHINE_PROFILES[args.machine], args.stick_out, args.deflection,
+                                  args.min_life, args.max_ap, args.max_ae)
+        result = optimize(options, args.resolution, workers=args.workers)
+    except InputError as e:
+        parser.error(e.message)
+    print(result.report())
+
+
+if __name__ == '__main__':
+    main()
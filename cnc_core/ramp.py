@@ -0,0 +1,78 @@
+"""
+往復斜坡下刀：G 代碼與批次計算
+單一下刀的計算見 engine.ramp_entry；ramp_entries 以 NumPy 一次計算整個程式的所有型腔下刀
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import RAMP_MAX_ANGLE, InputError, ramp_entry
+
+
+def ramp_moves(entry, x, y, heading_deg=0.0, top=0.0, feed=None, decimals=3):
+    """往復下刀的 G01 程式段
+
+    從 (x, y, top) 沿 heading_deg 方向來回於槽長內，每趟下降 entry.pass_depth；
+    entry.cleanup 為 True 時到底後再走一趟平底。不含快速定位與抬刀
+    """
+    n = decimals
+    dx = entry.length * math.cos(math.radians(heading_deg))
+    dy = entry.length * math.sin(math.radians(heading_deg))
+    ends = (f"X{x + dx:.{n}f} Y{y + dy:.{n}f}", f"X{x:.{n}f} Y{y:.{n}f}")
+
+    first = f"G01 X{x:.{n}f} Y{y:.{n}f} Z{top:.{n}f}"
+    yield first if feed is None else f"{first} F{feed:.0f}"
+    for k in range(1, entry.passes + 1):
+        yield f"G01 {ends[(k - 1) % 2]} Z{top - entry.pass_depth * k:.{n}f}"
+    if entry.cleanup:
+        yield f"G01 {ends[entry.passes % 2]}"
+
+
+def ramp_program(length, depth, x, y, max_angle=RAMP_MAX_ANGLE, heading_deg=0.0,
+                 top=0.0, feed=None, decimals=3):
+    """計算並產生單一往復下刀的程式段"""
+    return ramp_moves(ramp_entry(length, depth, max_angle), x, y, heading_deg, top, feed, decimals)
+
+
+@dataclass
+class RampBatch:
+    """批次往復下刀結果，各欄位 shape 為輸入廣播後的形狀"""
+    passes: np.ndarray          # 趟數（無效輸入為 0）
+    pass_depth: np.ndarray      # 每趟下降量 mm
+    angle_deg: np.ndarray       # 實際角度 (度)
+    total_length: np.ndarray    # 總切削長度 mm
+    time_min: np.ndarray        # 切削時間 (分鐘)，未指定進給時為 NaN
+
+    def totals(self):
+        """全部下刀的 (總長度 mm, 總時間 分鐘)，忽略無效項"""
+        return float(np.nansum(self.total_length)), float(np.nansum(self.time_min))
+
+
+def ramp_entries(lengths, depths, max_angles=RAMP_MAX_ANGLE, feeds=None, cleanup=True):
+    """批次計算往復下刀（與 ramp_entry 相同公式）
+
+    所有參數依 NumPy 規則廣播；長度、深度或角度無效的項目趟數為 0、其餘為 NaN
+    """
+    L, d, alpha = np.broadcast_arrays(np.asarray(lengths, dtype=np.float64),
+                                      np.asarray(depths, dtype=np.float64),
+                                      np.asarray(max_angles, dtype=np.float64))
+    if feeds is not None and np.any(np.asarray(feeds) <= 0):
+        raise InputError('錯誤：進給速度必須大於0')
+
+    valid = (L > 0) & (d > 0) & (alpha > 0) & (alpha < 90)
+    L_safe = np.where(valid, L, 1.0)
+    rise = L_safe * np.tan(np.radians(np.where(valid, alpha, 45.0)))
+    passes = np.maximum(1, np.ceil(np.where(valid, d, 0.0) / rise - 1e-9))
+    pass_depth = np.where(valid, d, np.nan) / passes
+    total = passes * np.hypot(L_safe, pass_depth) + (L_safe if cleanup else 0)
+    time_min = np.full(total.shape, np.nan) if feeds is None else total / np.asarray(feeds, dtype=np.float64)
+
+    return RampBatch(
+        passes=np.where(valid, passes, 0).astype(np.int64),
+        pass_depth=pass_depth,
+        angle_deg=np.degrees(np.arctan(pass_depth / L_safe)),
+        total_length=np.where(valid, total, np.nan),
+        time_min=np.where(valid, time_min, np.nan),
+    )
@@ -0,0 +1,430 @@
+"""
+參考數據存儲：材料參數、球刀參考步距、切削預留量
+數據來源為 data/reference.json，由 tools/pack_refdata.py 打包為唯讀的 data/refdata.bin；
+執行時以 mmap 延遲載入（首次查詢才開啟），字串去重後以整數 id 引用，
+查詢透過檔案內的排序索引二分搜尋，不在載入時建立任何字典
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import NamedTuple, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SOURCE_PATH = os.path.join(DATA_DIR, 'reference.json')
+DATA_PATH = os.path.join(DATA_DIR, 'refdata.bin')
+
+MAGIC = b'CNCR'
+VERSION = 3
+NO_STRING = 0xFFFFFFFF
+NOTE_SEPARATOR = '；'
+
+# 檔頭：magic, 版本, 保留, 4 個數量, 10 個區段偏移
+HEADER = struct.Struct('<4sHH4I10I')
+U32 = struct.Struct('<I')
+# 材料：名稱 id, 預留量記錄起點, 記錄數, vc_min, vc_max, fz 粗加工範圍, fz 精加工範圍, kc1.1, mc, Taylor C, n
+MATERIAL = struct.Struct('<III4x10d')
+# 參考步距：直徑, 步距（依直徑排序）
+STEP = struct.Struct('<2d')
+# 預留量：材料 id, 加工類型 id, 刀具 id, 注意事項 id, 材料附註 id, 粗加工, 半精加工
+FEATURE = struct.Struct('<5I4x2d')
+
+SECTIONS = ('str_offsets', 'str_blob', 'materials', 'steps', 'features',
+            'mat_name_idx', 'feat_key_idx', 'rough_idx', 'semi_idx', 'vc_idx')
+
+
+class MaterialParams(NamedTuple):
+    """材料切削參數"""
+    name: str
+    vc_range: Tuple[float, float]
+    fz_rough: Tuple[float, float]
+    fz_finish: Tuple[float, float]
+    kc: float = 0.0          # 比切削力 kc1.1 N/mm²（切屑厚度 1 mm 時）
+    mc: float = 0.0          # Kienzle 指數：kc = kc1.1·h^(-mc)
+    taylor_c: float = 0.0    # Taylor 刀具壽命 vc·T^n = C（碳化鎢刀具，vc m/min，T min）
+    taylor_n: float = 0.0
+
+
+class AllowanceRecord(NamedTuple):
+    """切削預留量記錄"""
+    material: str
+    machining_type: str
+    rough: float
+    semi_finish: float
+    tool: str
+    notes: str
+
+
+def _num(value):
+    """整數值還原為 int（vc 以整數顯示）"""
+    return int(value) if value.is_integer() else value
+
+
+# ---------------------------------------------------------------------------
+# 打包
+# ---------------------------------------------------------------------------
+
+def pack(data):
+    """將 reference.json 的內容打包為二進位格式"""
+    materials = data['materials']
+    allowance = data['allowance']
+    steps = sorted((float(d), float(p)) for d, p in data['reference_steps'])
+
+    # 收集並排序所有字串，id 即為排序後的位置，查詢時可二分搜尋
+    strings = set()
+    for m in materials:
+        strings.add(m['name'])
+    feature_rows = []
+    for material, features in allowance.items():
+        strings.add(material)
+        for feature, rec in features.items():
+            note, _, extra = rec['notes'].partition(NOTE_SEPARATOR)
+            strings.update((feature, rec['tool'], note))
+            if extra:
+                strings.add(extra)
+            feature_rows.append((material, feature, rec, note, extra))
+    table = sorted(strings, key=lambda s: s.encode('utf-8'))
+    sid = {s: i for i, s in enumerate(table)}
+
+    blob = bytearray()
+    offsets = [0]
+    for s in table:
+        blob += s.encode('utf-8')
+        offsets.append(len(blob))
+
+    # 預留量記錄依材料分組並保留原始順序
+    order = {m['name']: i for i, m in enumerate(materials)}
+    feature_rows.sort(key=lambda r: order.get(r[0], len(order)))
+    starts = {}
+    for i, (material, *_rest) in enumerate(feature_rows):
+        starts.setdefault(material, i)
+    counts = {m: len(f) for m, f in allowance.items()}
+
+    mat_bytes = b''.join(
+        MATERIAL.pack(sid[m['name']], starts.get(m['name'], 0), counts.get(m['name'], 0),
+                      *m['vc_range'], *m['fz_rough'], *m['fz_finish'], m['kc'], m['mc'],
+                      m['taylor_c'], m['taylor_n'])
+        for m in materials)
+    step_bytes = b''.join(STEP.pack(d, p) for d, p in steps)
+    feat_bytes = b''.join(
+        FEATURE.pack(sid[material], sid[feature], sid[rec['tool']], sid[note],
+                     sid[extra] if extra else NO_STRING, rec['rough'], rec['semi_finish'])
+        for material, feature, rec, note, extra in feature_rows)
+
+    def index(keys):
+        return b''.join(U32.pack(i) for i in sorted(range(len(keys)), key=keys.__getitem__))
+
+    sections = [
+        b''.join(U32.pack(o) for o in offsets),
+        bytes(blob),
+        mat_bytes,
+        step_bytes,
+        feat_bytes,
+        index([sid[m['name']] for m in materials]),
+        index([(sid[r[0]], sid[r[1]]) for r in feature_rows]),
+        index([r[2]['rough'] for r in feature_rows]),
+        index([r[2]['semi_finish'] for r in feature_rows]),
+        index([m['vc_range'][0] for m in materials]),
+    ]
+
+    out = bytearray(HEADER.size)
+    section_offsets = []
+    for section in sections:
+        out += b'\0' * (-len(out) % 8)  # 8 位元組對齊
+        section_offsets.append(len(out))
+        out += section
+    HEADER.pack_into(out, 0, MAGIC, VERSION, 0, len(table), len(materials), len(steps),
+                     len(feature_rows), *section_offsets)
+    return bytes(out)
+
+
+# ---------------------------------------------------------------------------
+# 讀取
+# ---------------------------------------------------------------------------
+
+class ReferenceStore:
+    """唯讀參考數據（buffer 可為 mmap 或 bytes）"""
+
+    def __init__(self, buffer):
+        magic, version, _, n_strings, n_materials, n_steps, n_features, *offsets = \
+            HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("參考數據格式不符，請重新執行 tools/pack_refdata.py")
+        self._buf = buffer
+        self.n_strings = n_strings
+        self.n_materials = n_materials
+        self.n_steps = n_steps
+        self.n_features = n_features
+        self._off = dict(zip(SECTIONS, offsets))
+
+    # 字串表 ---------------------------------------------------------------
+
+    def _string_bytes(self, sid):
+        start, end = struct.unpack_from('<2I', self._buf, self._off['str_offsets'] + sid * 4)
+        base = self._off['str_blob']
+        return self._buf[base + start:base + end]
+
+    def string(self, sid):
+        return self._string_bytes(sid).decode('utf-8')
+
+    def string_id(self, text):
+        """字串的 id，不存在時返回 None（字串表已排序，二分搜尋）"""
+        key = text.encode('utf-8')
+        lo, hi = 0, self.n_strings
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_strings and self._string_bytes(lo) == key:
+            return lo
+        return None
+
+    def _index(self, name, i):
+        return U32.unpack_from(self._buf, self._off[name] + i * 4)[0]
+
+    # 材料 ---------------------------------------------------------------
+
+    def _material_raw(self, i):
+        return MATERIAL.unpack_from(self._buf, self._off['materials'] + i * MATERIAL.size)
+
+    def _material_params(self, i):
+        name_id, _, _, vc_min, vc_max, fr_min, fr_max, ff_min, ff_max, kc, mc, tc, tn = \
+            self._material_raw(i)
+        return MaterialParams(self.string(name_id), (_num(vc_min), _num(vc_max)),
+                              (fr_min, fr_max), (ff_min, ff_max), _num(kc), mc, _num(tc), tn)
+
+    def _find_material(self, name):
+        sid = self.string_id(name)
+        if sid is None:
+            return None
+        lo, hi = 0, self.n_materials
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._material_raw(self._index('mat_name_idx', mid))[0] < sid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_materials:
+            i = self._index('mat_name_idx', lo)
+            if self._material_raw(i)[0] == sid:
+                return i
+        return None
+
+    def material_names(self):
+        """材料名稱（原始順序）"""
+        return [self.string(self._material_raw(i)[0]) for i in range(self.n_materials)]
+
+    def material(self, name):
+        """材料參數，找不到時返回 None"""
+        i = self._find_material(name)
+        return None if i is None else self._material_params(i)
+
+    def materials_with_vc_in(self, low, high, overlap=True):
+        """vc 範圍落在 [low, high] 的材料
+
+        overlap 為 True 時只要範圍有交集即符合，否則必須完全包含在內
+        """
+        # vc_idx 依 vc_min 排序：vc_min > high 的材料都不符合
+        vc_mins = _SortedColumn(self.n_materials,
+                                lambda k: self._material_raw(self._index('vc_idx', k))[3])
+        end = bisect_right(vc_mins, high)
+        result = []
+        for k in range(end):
+            i = self._index('vc_idx', k)
+            vc_min, vc_max = self._material_raw(i)[3:5]
+            if (vc_max >= low) if overlap else (vc_min >= low and vc_max <= high):
+                result.append(self._material_params(i))
+        return result
+
+    # 參考步距 -----------------------------------------------------------
+
+    def reference_steps(self):
+        """[(直徑, 步距), ...]，依直徑排序"""
+        base = self._off['steps']
+        return [STEP.unpack_from(self._buf, base + i * STEP.size) for i in range(self.n_steps)]
+
+    def reference_step(self, diameter):
+        """標準直徑的參考步距，不在表中時返回 None"""
+        base = self._off['steps']
+        diameters = _SortedColumn(self.n_steps,
+                                  lambda i: STEP.unpack_from(self._buf, base + i * STEP.size)[0])
+        i = bisect_left(diameters, diameter)
+        if i < self.n_steps and diameters[i] == diameter:
+            return STEP.unpack_from(self._buf, base + i * STEP.size)[1]
+        return None
+
+    def nearest_reference_step(self, diameter):
+        """最接近直徑的參考步距；與兩側等距時取較小直徑"""
+        steps = self.reference_steps()
+        if not steps:
+            return None
+        i = bisect_left([d for d, _ in steps], diameter)
+        candidates = steps[max(i - 1, 0):i + 1]
+        return min(candidates, key=lambda s: (abs(s[0] - diameter), s[0]))[1]
+
+    # 切削預留量 ---------------------------------------------------------
+
+    def _feature_raw(self, i):
+        return FEATURE.unpack_from(self._buf, self._off['features'] + i * FEATURE.size)
+
+    def _feature_record(self, i):
+        mat_id, feat_id, tool_id, note_id, extra_id, rough, semi = self._feature_raw(i)
+        notes = self.string(note_id)
+        if extra_id != NO_STRING:
+            notes += NOTE_SEPARATOR + self.string(extra_id)
+        return AllowanceRecord(self.string(mat_id), self.string(feat_id), rough, semi,
+                               self.string(tool_id), notes)
+
+    def features(self, material):
+        """材料的加工類型（原始順序）"""
+        i = self._find_material(material)
+        if i is None:
+            return []
+        _, start, count = self._material_raw(i)[:3]
+        return [self.string(self._feature_raw(k)[1]) for k in range(start, start + count)]
+
+    def allowance(self, material, machining_type):
+        """預留量記錄，找不到時返回 None"""
+        mat_id, feat_id = self.string_id(material), self.string_id(machining_type)
+        if mat_id is None or feat_id is None:
+            return None
+        keys = _SortedColumn(self.n_features,
+                             lambda k: self._feature_raw(self._index('feat_key_idx', k))[:2])
+        k = bisect_left(keys, (mat_id, feat_id))
+        if k < self.n_features and keys[k] == (mat_id, feat_id):
+            return self._feature_record(self._index('feat_key_idx', k))
+        return None
+
+    def _features_below(self, index, column, limit, inclusive):
+        values = _SortedColumn(self.n_features,
+                               lambda k: self._feature_raw(self._index(index, k))[column])
+        end = (bisect_right if inclusive else bisect_left)(values, limit)
+        return [self._feature_record(self._index(index, k)) for k in range(end)]
+
+    def features_with_rough_below(self, limit, inclusive=False):
+        """粗加工預留量小於 limit (mm) 的所有記錄，由小到大"""
+        return self._features_below('rough_idx', 5, limit, inclusive)
+
+    def features_with_semi_finish_below(self, limit, inclusive=False):
+        """半精加工預留量小於 limit (mm) 的所有記錄，由小到大"""
+        return self._features_below('semi_idx', 6, limit, inclusive)
+
+
+class _SortedColumn:
+    """將排序索引包裝成可供 bisect 使用的序列（按需讀取，不複製）"""
+
+    def __init__(self, length, getter):
+        self._length = length
+        self._getter = getter
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        return self._getter(i)
+
+
+_store = None
+
+
+def load(path=DATA_PATH):
+    """開啟參考數據檔；可以 mmap 時使用 mmap，否則讀入記憶體"""
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            buffer = f.read()
+    return ReferenceStore(buffer)
+
+
+def store():
+    """共用的參考數據（首次呼叫時載入）"""
+    global _store
+    if _store is None:
+        _store = load()
+    return _store
+
+
+# ---------------------------------------------------------------------------
+# 與舊版字典相容的唯讀視圖
+# ---------------------------------------------------------------------------
+
+class MaterialParamsView(Mapping):
+    """{材料: {"vc_range", "fz_rough", "fz_finish", "kc", "mc", "taylor_c", "taylor_n"}}"""
+
+    def __getitem__(self, name):
+        params = store().material(name)
+        if params is None:
+            raise KeyError(name)
+        return {"vc_range": params.vc_range, "fz_rough": params.fz_rough,
+                "fz_finish": params.fz_finish, "kc": params.kc, "mc": params.mc,
+                "taylor_c": params.taylor_c, "taylor_n": params.taylor_n}
+
+    def __contains__(self, name):
+        return isinstance(name, str) and store().material(name) is not None
+
+    def __iter__(self):
+        return iter(store().material_names())
+
+    def __len__(self):
+        return store().n_materials
+
+
+class ReferenceStepView(Mapping):
+    """{直徑: 參考步距}"""
+
+    def __getitem__(self, diameter):
+        step = store().reference_step(float(diameter))
+        if step is None:
+            raise KeyError(diameter)
+        return step
+
+    def __contains__(self, diameter):
+        try:
+            return store().reference_step(float(diameter)) is not None
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return (d for d, _ in store().reference_steps())
+
+    def __len__(self):
+        return store().n_steps
+
+
+class _FeatureView(Mapping):
+    def __init__(self, material):
+        self._material = material
+
+    def __getitem__(self, machining_type):
+        rec = store().allowance(self._material, machining_type)
+        if rec is None:
+            raise KeyError(machining_type)
+        return {"rough": rec.rough, "semi_finish": rec.semi_finish,
+                "tool": rec.tool, "notes": rec.notes}
+
+    def __iter__(self):
+        return iter(store().features(self._material))
+
+    def __len__(self):
+        return len(store().features(self._material))
+
+
+class AllowanceDataView(Mapping):
+    """{材料: {加工類型: {"rough", "semi_finish", "tool", "notes"}}}"""
+
+    def __getitem__(self, material):
+        if not store().features(material):
+            raise KeyError(material)
+        return _FeatureView(material)
+
+    def __iter__(self):
+        s = store()
+        return (m for m in s.material_names() if s.features(m))
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,300 @@
+"""
+切除體積與粗加工時間估算（高度場）
+將零件 STL（與毛坯 STL 或方塊）以頂面高度場表示，依 預留量 表的粗加工/半精加工預留：
+    粗加工    毛坯頂面 → 零件 + 粗加工預留
+    半精加工  零件 + 粗加工預留 → 零件 + 半精加工預留
+    精加工    零件 + 半精加工預留 → 零件
+逐格計算各工序的切除體積（零件外的區域切到零件底面）。
+時間以切削條件計算的進給估算：粗加工以切除率 Q = ap·ae·F，半精/精加工以表面積 ÷ 步距 ÷ F。
+預留量以垂直偏置近似，適用於由上方加工的 2.5D/3 軸零件。
+
+三角形以向量化方式分批光柵化（大三角形先細分），
+高度場格數超過 max_cells 時自動放大格距，記憶體用量有上限。
+
+用法: python -m cnc_core.removal 零件.stl --material 鋁合金 --feature 曲面
+      [--stock-box x0 y0 z0 x1 y1 z1 | --stock 毛坯.stl] [--cell 0.5]
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import (
+    CuttingInput, InputError, compute_cutting, query_allowance, reference_step,
+)
+from .stl import read_stl
+
+STAGES = ('粗加工', '半精加工', '精加工')
+MAX_CELLS = 4_000_000          # 高度場格數上限（float32 約 16 MB）
+RASTER_CHUNK = 1 << 15         # 每批讀取的三角形數
+RASTER_BATCH = 2048            # 細分後每批光柵化的三角形數
+ROW_BLOCK = 256                # 統計時每批處理的列數
+RASTER_SPAN = 8                # 三角形外框超過此格數時細分
+STOCK_MARGIN = 2.0             # 未指定毛坯時，零件外框四周與頂面的餘量 mm
+
+# 各工序的切削深度與步距（相對刀具直徑）
+ROUGH_AP = 0.5
+ROUGH_AE = 0.5
+SEMI_AE = 0.25
+
+
+@dataclass(frozen=True)
+class StageTool:
+    """工序刀具：直徑 mm、齒數"""
+    diameter: float
+    teeth: int
+
+
+DEFAULT_TOOLS = {
+    '粗加工': StageTool(10, 3),
+    '半精加工': StageTool(6, 2),
+    '精加工': StageTool(6, 2),
+}
+
+
+@dataclass(frozen=True)
+class StageEstimate:
+    """單一工序的切除量與時間"""
+    stage: str
+    allowance: float           # 工序後留下的預留量 mm
+    volume: float              # 切除體積 mm³
+    area: float                # 加工表面積 mm²
+    feed: float                # 進給 mm/min
+    ap: float                  # 切削深度 mm（半精/精加工為單層）
+    ae: float                  # 步距 mm
+    time_min: float
+
+
+@dataclass
+class RemovalEstimate:
+    """切除體積與時間估算結果"""
+    material: str
+    feature: str
+    cell: float
+    shape: tuple               # (ny, nx)
+    stock_volume: float        # mm³
+    part_volume: float
+    stages: list
+
+    @property
+    def removed_volume(self):
+        return sum(s.volume for s in self.stages)
+
+    @property
+    def total_time(self):
+        return sum(s.time_min for s in self.stages)
+
+    def report(self):
+        lines = [
+            f"材料: {self.material}，加工類型: {self.feature}",
+            f"高度場 {self.shape[1]}×{self.shape[0]}（格距 {self.cell:.3g} mm）",
+            f"毛坯 {self.stock_volume / 1000:.1f} cm³，零件 {self.part_volume / 1000:.1f} cm³，"
+            f"切除 {self.removed_volume / 1000:.1f} cm³",
+            "",
+        ]
+        for s in self.stages:
+            lines.append(
+                f"• {s.stage}（留 {s.allowance:g} mm）：{s.volume / 1000:.2f} cm³，"
+                f"F{s.feed:.0f} ap {s.ap:.2f} ae {s.ae:.2f}，約 {s.time_min:.1f} 分鐘"
+            )
+        lines += ["", f"預估切削時間合計: {self.total_time:.1f} 分鐘（不含快速移動與換刀）"]
+        return '\n'.join(lines)
+
+
+@dataclass(frozen=True)
+class Grid:
+    """高度場網格：原點 (x0, y0)、格距、(ny, nx)"""
+    x0: float
+    y0: float
+    cell: float
+    shape: tuple
+
+    @classmethod
+    def covering(cls, x0, y0, x1, y1, cell, max_cells=MAX_CELLS):
+        """涵蓋範圍的網格；格數超過上限時放大格距"""
+        if cell <= 0:
+            raise InputError("錯誤：格距必須大於0")
+        cell = max(cell, math.sqrt((x1 - x0) * (y1 - y0) / max_cells))
+        return cls(x0, y0, cell, (max(1, math.ceil((y1 - y0) / cell)), max(1, math.ceil((x1 - x0) / cell))))
+
+
+def _subdivide(tris, limit):
+    """將外框超過 limit 的三角形四等分，直到全部符合"""
+    done = []
+    while len(tris):
+        span = np.ptp(tris[:, :, :2], axis=1).max(axis=1)
+        big = span > limit
+        done.append(tris[~big])
+        big = tris[big]
+        if not len(big):
+            break
+        a, b, c = big[:, 0], big[:, 1], big[:, 2]
+        ab, bc, ca = (a + b) / 2, (b + c) / 2, (c + a) / 2
+        tris = np.concatenate([np.stack(t, axis=1) for t in
+                               ((a, ab, ca), (ab, b, bc), (ca, bc, c), (ab, bc, ca))])
+    return np.concatenate(done) if done else tris
+
+
+def height_map(vertices, grid, chunk=RASTER_CHUNK):
+    """三角網格在各格中心的最高點（沒有三角形的格為 -inf），float32 (ny, nx)"""
+    ny, nx = grid.shape
+    heights = np.full(ny * nx, -np.inf, dtype=np.float32)
+    span = RASTER_SPAN
+    offsets = np.arange(span + 1)
+    for i in range(0, len(vertices), chunk):
+        small = _subdivide(np.asarray(vertices[i:i + chunk], dtype=np.float64), (span - 1) * grid.cell)
+        for j in range(0, len(small), RASTER_BATCH):
+            _rasterize(heights, small[j:j + RASTER_BATCH], grid, offsets)
+    return heights.reshape(ny, nx)
+
+
+def _rasterize(heights, tris, grid, offsets):
+    """將外框不超過 RASTER_SPAN 格的三角形寫入高度場（取最大值）"""
+    ny, nx = grid.shape
+    # 每個三角形檢查外框起點開始的 (span+1)² 個格中心
+    lo = tris[:, :, :2].min(axis=1)
+    col0 = np.floor((lo[:, 0] - grid.x0) / grid.cell - 0.5).astype(np.int64)
+    row0 = np.floor((lo[:, 1] - grid.y0) / grid.cell - 0.5).astype(np.int64)
+    cols = col0[:, None, None] + offsets[None, None, :]
+    rows = row0[:, None, None] + offsets[None, :, None]
+    px = grid.x0 + (cols + 0.5) * grid.cell
+    py = grid.y0 + (rows + 0.5) * grid.cell
+
+    (ax, ay, az), (bx, by, bz), (cx, cy, cz) = (tris[:, k, :].T[:, :, None, None] for k in range(3))
+    det = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w0 = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / det
+        w1 = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / det
+        w2 = 1 - w0 - w1
+        z = w0 * az + w1 * bz + w2 * cz
+    eps = -1e-9      # 垂直面 det = 0，權重為 NaN，不會被選入
+    inside = ((w0 >= eps) & (w1 >= eps) & (w2 >= eps)
+              & (cols >= 0) & (cols < nx) & (rows >= 0) & (rows < ny))
+    np.maximum.at(heights, (rows * nx + cols)[inside], z[inside].astype(np.float32))
+
+
+def _accumulate(stock_top, target, levels, cell, bottom, part_bottom):
+    """逐列區塊累計各工序的切除體積與加工表面積，以及毛坯/零件體積"""
+    ny = target.shape[0]
+    n = len(levels) - 1
+    volume, area = np.zeros(n), np.zeros(n)
+    stock_volume = part_volume = 0.0
+    for r0 in range(0, ny, ROW_BLOCK):
+        r1 = min(ny, r0 + ROW_BLOCK)
+        # 表面積因子 sqrt(1 + gx² + gy²)，區塊上下各多取一列計算梯度
+        lo, hi = max(0, r0 - 1), min(ny, r1 + 1)
+        ext = target[lo:hi].astype(np.float64)
+        gx = np.gradient(ext, cell, axis=1) if ext.shape[1] > 1 else np.zeros_like(ext)
+        gy = np.gradient(ext, cell, axis=0) if ext.shape[0] > 1 else np.zeros_like(ext)
+        factor = np.sqrt(1 + gx * gx + gy * gy)[r0 - lo:r0 - lo + r1 - r0]
+
+        t, s = target[r0:r1], stock_top[r0:r1]
+        in_stock = np.isfinite(s)
+        for k in range(n):
+            upper = np.minimum(s, t + np.float32(levels[k]))
+            thickness = np.where(in_stock, np.maximum(upper - (t + np.float32(levels[k + 1])), 0), 0)
+            volume[k] += thickness.sum(dtype=np.float64)
+            area[k] += factor[thickness > 0].sum()
+        stock_volume += np.where(in_stock, s - np.float32(bottom), 0).sum(dtype=np.float64)
+        part_volume += np.maximum(t - np.float32(part_bottom), 0).sum(dtype=np.float64)
+    cell_area = cell * cell
+    return volume * cell_area, area * cell_area, float(stock_volume * cell_area), float(part_volume * cell_area)
+
+
+def estimate_removal(part, material, feature, stock_box=None, stock=None, cell=0.5,
+                     tools=None, max_cells=MAX_CELLS):
+    """估算各工序的切除體積與時間
+
+    part、stock 為 stl.Mesh（或三角形頂點陣列）；stock_box 為 (x0, y0, z0, x1, y1, z1)，
+    兩者皆未指定時以零件外框加 STOCK_MARGIN 作為毛坯
+    """
+    allowance = query_allowance(material, feature)
+    if allowance is None:
+        raise InputError("錯誤：未找到相關數據")
+    tools = {**DEFAULT_TOOLS, **(tools or {})}
+    part_v = np.asarray(getattr(part, 'vertices', part))
+    p_lo = part_v.reshape(-1, 3).min(axis=0).astype(np.float64)
+    p_hi = part_v.reshape(-1, 3).max(axis=0).astype(np.float64)
+
+    if stock is not None:
+        stock_v = np.asarray(getattr(stock, 'vertices', stock))
+        s_lo = stock_v.reshape(-1, 3).min(axis=0).astype(np.float64)
+        s_hi = stock_v.reshape(-1, 3).max(axis=0).astype(np.float64)
+    else:
+        if stock_box is None:
+            m = STOCK_MARGIN
+            stock_box = (p_lo[0] - m, p_lo[1] - m, p_lo[2], p_hi[0] + m, p_hi[1] + m, p_hi[2] + m)
+        s_lo, s_hi = np.array(stock_box[:3], dtype=np.float64), np.array(stock_box[3:], dtype=np.float64)
+        if np.any(s_hi <= s_lo):
+            raise InputError("錯誤：毛坯尺寸必須大於0")
+
+    grid = Grid.covering(min(p_lo[0], s_lo[0]), min(p_lo[1], s_lo[1]),
+                         max(p_hi[0], s_hi[0]), max(p_hi[1], s_hi[1]), cell, max_cells)
+    ny, nx = grid.shape
+    if stock is not None:
+        stock_top = height_map(stock_v, grid)
+    else:
+        xs = grid.x0 + (np.arange(nx) + 0.5) * grid.cell
+        ys = grid.y0 + (np.arange(ny) + 0.5) * grid.cell
+        inside = ((xs >= s_lo[0]) & (xs <= s_hi[0]))[None, :] & ((ys >= s_lo[1]) & (ys <= s_hi[1]))[:, None]
+        stock_top = np.where(inside, np.float32(s_hi[2]), np.float32(-np.inf))
+    bottom = s_lo[2]
+
+    # 目標曲面：零件頂面，零件外切到零件底面（不低於毛坯底面）
+    target = height_map(part_v, grid)
+    target = np.where(np.isfinite(target), target, np.float32(max(p_lo[2], bottom)))
+
+    levels = [np.inf, allowance.rough, allowance.semi_finish, 0.0]
+    volume, area, stock_volume, part_volume = _accumulate(stock_top, target, levels, grid.cell,
+                                                          bottom, p_lo[2])
+    stages = []
+    for k, stage in enumerate(STAGES):
+        tool = tools[stage]
+        cutting = compute_cutting(CuttingInput(material, tool.diameter, tool.teeth,
+                                               '粗加工' if stage == '粗加工' else '精加工'))
+        if stage == '粗加工':
+            ap, ae = ROUGH_AP * tool.diameter, ROUGH_AE * tool.diameter
+            time_min = volume[k] / (ap * ae * cutting.feed)
+        else:
+            ap = levels[k] - levels[k + 1]
+            ae = SEMI_AE * tool.diameter if stage == '半精加工' else (reference_step(tool.diameter)
+                                                                     or SEMI_AE * tool.diameter / 2)
+            time_min = area[k] / ae / cutting.feed
+        stages.append(StageEstimate(stage, levels[k + 1], float(volume[k]), float(area[k]), cutting.feed, ap,
+                                    ae, float(time_min)))
+    return RemovalEstimate(material, feature, grid.cell, grid.shape, stock_volume, part_volume, stages)
+
+
+def _tool(text):
+    try:
+        diameter, teeth = text.split(':')
+        return StageTool(float(diameter), int(teeth))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"刀具格式應為 直徑:齒數，收到 {text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='切除體積與加工時間估算')
+    parser.add_argument('part', help='零件 STL')
+    parser.add_argument('--material', required=True)
+    parser.add_argument('--feature', required=True, help='加工類型，例如 曲面、型腔')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--stock-box', type=float, nargs=6, metavar=('X0', 'Y0', 'Z0', 'X1', 'Y1', 'Z1'))
+    group.add_argument('--stock', help='毛坯 STL')
+    parser.add_argument('--cell', type=float, default=0.5, help='高度場格距 mm')
+    for stage, flag in zip(STAGES, ('--rough-tool', '--semi-tool', '--finish-tool')):
+        parser.add_argument(flag, type=_tool, default=DEFAULT_TOOLS[stage], help=f'{stage}刀具 直徑:齒數')
+    args = parser.parse_args(argv)
+    tools = dict(zip(STAGES, (args.rough_tool, args.semi_tool, args.finish_tool)))
+    try:
+        result = estimate_removal(read_stl(args.part), args.material, args.feature, args.stock_box,
+                                  read_stl(args.stock) if args.stock else None, args.cell, tools)
+    except InputError as e:
+        parser.error(e.message)
+    print(result.report())
+
+
+if __name__ == '__main__':
+    main()
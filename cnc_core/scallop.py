@@ -0,0 +1,118 @@
+"""
+球刀殘餘高度向量化計算（NumPy）
+一次計算 直徑 × 步距 整個網格，並依表面質量分級
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import REFERENCE_STEP_DATA, SCALLOP_QUALITY, quality_height_limit
+
+# 表面質量名稱（優良/良好/一般/較差）與預設分級上限 (μm)
+QUALITY_NAMES = tuple(name for _, name, _ in SCALLOP_QUALITY)
+QUALITY_BANDS = tuple(limit for limit, _, _ in SCALLOP_QUALITY if limit is not None)
+
+# 無效格子（步距 >= 直徑 或非正數）的質量代碼
+INVALID = -1
+
+
+def reference_diameters():
+    """參考步距表中的標準直徑（由小到大）"""
+    return np.array(sorted(REFERENCE_STEP_DATA), dtype=np.float64)
+
+
+def scallop_grid(diameters, steps, dtype=np.float64):
+    """計算殘餘高度網格 h = R - sqrt(R² - (P/2)²)
+
+    返回 shape 為 (直徑數, 步距數) 的陣列，單位 mm；
+    步距 >= 直徑 或輸入非正數的格子為 NaN
+    """
+    D = np.asarray(diameters, dtype=dtype).reshape(-1, 1)
+    P = np.asarray(steps, dtype=dtype).reshape(1, -1)
+    R = D / 2
+    half = P / 2
+
+    # 原地運算，避免百萬格網格產生多餘的暫存陣列
+    h = np.empty((D.shape[0], P.shape[1]), dtype=dtype)
+    np.subtract(R * R, half * half, out=h)
+    np.maximum(h, 0, out=h)
+    np.sqrt(h, out=h)
+    np.subtract(R, h, out=h)
+
+    invalid = (P >= D) | (D <= 0) | (P <= 0)
+    if invalid.any():
+        h[np.broadcast_to(invalid, h.shape)] = np.nan
+    return h
+
+
+def quality_grid(heights, bands=QUALITY_BANDS):
+    """依殘餘高度分級，返回質量代碼陣列（索引對應 QUALITY_NAMES）
+
+    bands 為分級上限 (μm)，由小到大；h < bands[0] 為 0，依此類推。
+    NaN 格子為 INVALID。
+    """
+    h_um = np.asarray(heights) * 1000
+    codes = np.searchsorted(np.asarray(bands, dtype=h_um.dtype), h_um, side='right')
+    codes = codes.astype(np.int8)
+    codes[np.isnan(h_um)] = INVALID
+    return codes
+
+
+@dataclass
+class ScallopSweep:
+    """殘餘高度網格掃描結果"""
+    diameters: np.ndarray    # (n,) 球刀直徑 mm
+    steps: np.ndarray        # (m,) 步距 mm
+    heights: np.ndarray      # (n, m) 殘餘高度 mm
+    quality: np.ndarray      # (n, m) 質量代碼
+    names: tuple = QUALITY_NAMES
+
+    def counts(self):
+        """每個直徑各質量等級的格子數，shape = (n, 等級數)"""
+        n_rows, n_levels = len(self.diameters), len(self.names)
+        # 無效格子放到額外的一欄，計數後丟棄
+        codes = np.where(self.quality >= 0, self.quality, n_levels).astype(np.int64)
+        codes += np.arange(n_rows)[:, None] * (n_levels + 1)
+        out = np.bincount(codes.ravel(), minlength=n_rows * (n_levels + 1))
+        return out.reshape(n_rows, n_levels + 1)[:, :n_levels]
+
+    def quality_names(self):
+        """質量代碼轉換為名稱陣列（無效格子為空字串）"""
+        table = np.array(self.names + ('',), dtype=object)
+        return table[self.quality]
+
+
+def sweep(steps, diameters=None, bands=QUALITY_BANDS, names=QUALITY_NAMES, dtype=np.float64):
+    """直徑 × 步距 網格掃描
+
+    diameters 預設為參考步距表的全部標準直徑；
+    bands/names 可自訂公差帶（names 需比 bands 多一個等級）
+    """
+    if diameters is None:
+        diameters = reference_diameters()
+    if len(names) != len(bands) + 1:
+        raise ValueError("names 數量必須比 bands 多一個")
+    diameters = np.asarray(diameters, dtype=dtype).ravel()
+    steps = np.asarray(steps, dtype=dtype).ravel()
+    heights = scallop_grid(diameters, steps, dtype=dtype)
+    return ScallopSweep(diameters, steps, heights, quality_grid(heights, bands), tuple(names))
+
+
+def max_step(diameters, heights, dtype=np.float64):
+    """批次反算最大步距 P = 2·sqrt(h·(2R-h))
+
+    diameters 與 heights (mm) 依 NumPy 規則廣播，例如整個刀庫的直徑
+    對應同一目標高度；h >= R 時返回直徑，非正數輸入為 NaN
+    """
+    D = np.asarray(diameters, dtype=dtype)
+    h = np.asarray(heights, dtype=dtype)
+    R = D / 2
+    hc = np.minimum(h, R)
+    P = 2 * np.sqrt(np.maximum(hc * (2 * R - hc), 0))
+    return np.where((D > 0) & (h > 0), P, np.nan)
+
+
+def max_step_for_quality(diameters, quality, dtype=np.float64):
+    """批次計算保持表面質量等級（優良/良好/一般）的最大步距"""
+    return max_step(diameters, quality_height_limit(quality), dtype=dtype)
@@ -0,0 +1,239 @@
+"""
+工單主軸負載批次檢查（NumPy）
+一次計算整份工單在指定機台上的所需功率/扭力，並以與 compute_cutting 相同的規則降低 VC、fz：
+先降 VC（至材料下限或額定轉速），再降 fz（至範圍下限），仍超載時給出建議最大切深。
+二分搜尋以固定次數對所有工單同時進行，結果與逐筆呼叫 compute_cutting 相同（差異僅在浮點末位）。
+
+工單 CSV 欄位：工單, 材料, 刀具直徑, 齒數, 加工類型, VC條件, fz條件, 切深[, 切寬]（第一列可為標題）
+
+用法: python -m cnc_core.spindle 工單.csv [--machine 桌上型雕銑機] [--csv 結果.csv]
+"""
+
+import argparse
+import csv
+from dataclasses import dataclass
+
+import numpy as np
+
+from .deflection import ARRAY_OPS
+from .engine import (
+    FEED_LIMITS, RPM_LIMITS, TORQUE_FACTOR, InputError, cutting_power, mean_chip_thickness,
+    specific_cutting_force,
+)
+from .machine import DEFAULT_MACHINE, MACHINE_PROFILES
+from .refdata import store
+
+BISECT_ITERATIONS = 40     # 與 engine.largest_feasible 相同
+
+
+@dataclass
+class JobLoads:
+    """工單負載（每筆工單一個元素）"""
+    job: np.ndarray
+    machine: str
+    vc: np.ndarray                 # 降低後 m/min
+    fz: np.ndarray
+    rpm: np.ndarray
+    feed: np.ndarray
+    kc: np.ndarray                 # N/mm²
+    power: np.ndarray              # 所需功率 kW
+    available_power: np.ndarray
+    torque: np.ndarray             # 所需扭力 N·m
+    available_torque: np.ndarray
+    original_vc: np.ndarray
+    original_fz: np.ndarray
+    depth: np.ndarray
+    max_depth: np.ndarray
+
+    def __len__(self):
+        return len(self.job)
+
+    @property
+    def load(self):
+        return self.power / self.available_power
+
+    @property
+    def derated(self):
+        return (self.vc < self.original_vc) | (self.fz < self.original_fz)
+
+    @property
+    def overloaded(self):
+        return self.max_depth < self.depth
+
+    def report(self, rows=20):
+        derated, over = self.derated, self.overloaded
+        lines = [f"{self.machine}：工單 {len(self):,} 筆，降低條件 {int(derated.sum())} 筆，"
+                 f"降至下限仍超載 {int(over.sum())} 筆"]
+        order = np.argsort(-self.load, kind='stable')[:rows]
+        for i in order:
+            text = (f"• {self.job[i]}：{self.power[i]:.2f}/{self.available_power[i]:.2f} kW"
+                    f"（{self.load[i]:.0%}），VC {self.original_vc[i]:.0f}→{self.vc[i]:.0f}，"
+                    f"fz {self.original_fz[i]:.3f}→{self.fz[i]:.3f}")
+            if over[i]:
+                text += f"，切深請降至 {self.max_depth[i]:.2f} mm"
+            lines.append(text)
+        if len(self) > rows:
+            lines.append(f"…其餘 {len(self) - rows:,} 筆")
+        return '\n'.join(lines)
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('工單', 'VC', 'fz', '轉速', '進給', 'kc', '功率kW', '可用kW',
+                             '扭力Nm', '可用Nm', '建議最大切深'))
+            for i in range(len(self)):
+                writer.writerow((self.job[i], f"{self.vc[i]:.1f}", f"{self.fz[i]:.4f}",
+                                 f"{self.rpm[i]:.0f}", f"{self.feed[i]:.0f}", f"{self.kc[i]:.0f}",
+                                 f"{self.power[i]:.3f}", f"{self.available_power[i]:.3f}",
+                                 f"{self.torque[i]:.2f}", f"{self.available_torque[i]:.2f}",
+                                 f"{self.max_depth[i]:.3f}"))
+
+
+def available_power(machine, rpm):
+    """machine.available_power 的向量化版本（運算順序相同）"""
+    rpm = np.asarray(rpm, dtype=np.float64)
+    curve = machine.power_curve
+    if not curve:
+        return machine.spindle_power * np.minimum(1.0, rpm / machine.base_rpm)
+    n = np.array([c[0] for c in curve])
+    p = np.array([c[1] for c in curve])
+    i = np.clip(np.searchsorted(n, rpm, side='right'), 1, len(n) - 1)
+    n0, n1, p0, p1 = n[i - 1], n[i], p[i - 1], p[i]
+    inner = p0 + (p1 - p0) * (rpm - n0) / (n1 - n0)
+    return np.where(rpm < n[0], p[0] * rpm / n[0], np.where(rpm >= n[-1], p[-1], inner))
+
+
+def _level(levels, low, high):
+    """pick_level 的向量化版本"""
+    return np.where(levels == "高", high, np.where(levels == "中", (low + high) / 2, low))
+
+
+def _bisect(low, high, feasible):
+    """每個元素在 [low, high] 內使 feasible 成立的最大值（呼叫前 low 已成立、high 不成立）"""
+    for _ in range(BISECT_ITERATIONS):
+        mid = (low + high) / 2
+        ok = feasible(mid)
+        low = np.where(ok, mid, low)
+        high = np.where(ok, high, mid)
+    return low
+
+
+def evaluate_jobs(material, diameter, teeth, depth, width=None, machining_type='粗加工',
+                  vc_level='中', fz_level='中', machine=DEFAULT_MACHINE, job=None):
+    """整份工單的主軸負載與降低後的切削條件；width 中的 NaN 視為全槽"""
+    diameter = np.asarray(diameter, dtype=np.float64)
+    teeth = np.asarray(teeth, dtype=np.float64)
+    depth = np.asarray(depth, dtype=np.float64)
+    n = np.broadcast(diameter, teeth, depth).size
+    diameter, teeth, depth = (np.broadcast_to(a, (n,)) for a in (diameter, teeth, depth))
+    if not (np.all(diameter > 0) and np.all(teeth > 0)):
+        raise InputError("錯誤: 刀具直徑與齒數必須大於0")
+    width = diameter if width is None else np.broadcast_to(np.asarray(width, dtype=np.float64), (n,))
+    width = np.minimum(np.where(np.isnan(width), diameter, width), diameter)
+    if not (np.all(depth > 0) and np.all(width > 0)):
+        raise InputError("錯誤: 切深與切寬必須大於0")
+
+    # 材料參數：每種材料查詢一次
+    names, inverse = np.unique(np.broadcast_to(np.asarray(material, dtype=str), (n,)),
+                               return_inverse=True)
+    data = store()
+    params = [data.material(name) for name in names]
+    for name, p in zip(names, params):
+        if p is None:
+            raise InputError(f"錯誤: 未知材料 {name}")
+    rough = np.broadcast_to(np.asarray(machining_type, dtype=str), (n,)) == "粗加工"
+    table = np.array([(*p.vc_range, *p.fz_rough, *p.fz_finish, p.kc, p.mc) for p in params])[inverse]
+    vc_min, vc_max = table[:, 0], table[:, 1]
+    fz_min = np.where(rough, table[:, 2], table[:, 4])
+    fz_max = np.where(rough, table[:, 3], table[:, 5])
+    kc11, mc = table[:, 6], table[:, 7]
+    vc = _level(np.broadcast_to(np.asarray(vc_level, dtype=str), (n,)), vc_min, vc_max)
+    fz = _level(np.broadcast_to(np.asarray(fz_level, dtype=str), (n,)), fz_min, fz_max)
+
+    rpm_limits = (RPM_LIMITS[0], min(RPM_LIMITS[1], machine.max_rpm))
+    feed_limits = (FEED_LIMITS[0], min(FEED_LIMITS[1], machine.max_feed))
+
+    def load(m, fz_, rows=slice(None)):
+        # 與 engine.fit_spindle 相同的公式，以 NumPy 陣列呼叫
+        f = np.clip(m * teeth[rows] * fz_, *feed_limits)
+        hm = mean_chip_thickness(fz_, diameter[rows], width[rows], ARRAY_OPS)
+        kc = specific_cutting_force(kc11[rows], mc[rows], hm)
+        return f, kc, cutting_power(kc, depth[rows], width[rows], f) / machine.efficiency
+
+    def fits(m, fz_, rows=slice(None)):
+        return load(m, fz_, rows)[2] <= available_power(machine, m)
+
+    # 先降轉速（VC），定扭力區內不降；二分搜尋只針對超載的工單
+    m = np.clip((vc * 1000) / (np.pi * diameter), *rpm_limits)
+    floor = np.clip((vc_min * 1000) / (np.pi * diameter), *rpm_limits)
+    knee = np.minimum(m, np.maximum(floor, machine.rated_rpm))
+    over = np.flatnonzero(~fits(m, fz))
+    ok = fits(knee[over], fz[over], over)
+    rows = over[ok]
+    m = m.copy()
+    m[over[~ok]] = knee[over[~ok]]
+    m[rows] = _bisect(knee[rows], m[rows], lambda x: fits(x, fz[rows], rows))
+    new_vc = vc.copy()
+    new_vc[over] = np.minimum(vc[over], m[over] * np.pi * diameter[over] / 1000)
+
+    # 再降每齒進給
+    over = over[~fits(m[over], fz[over], over)]
+    low = np.minimum(fz_min, fz)
+    ok = fits(m[over], low[over], over)
+    rows = over[ok]
+    new_fz = fz.copy()
+    new_fz[over[~ok]] = low[over[~ok]]
+    new_fz[rows] = _bisect(low[rows], fz[rows], lambda v: fits(m[rows], v, rows))
+
+    f, kc, power = load(m, new_fz)
+    available = available_power(machine, m)
+    max_depth = np.where(power <= available, depth, depth * available / power)
+    job = np.arange(1, n + 1) if job is None else np.asarray(job)
+    return JobLoads(job, machine.name, new_vc, new_fz, m, f, kc, power, available,
+                    power * TORQUE_FACTOR / m, available * TORQUE_FACTOR / m,
+                    vc, fz, depth.copy(), max_depth)
+
+
+def read_jobs(path):
+    """讀取工單 CSV，返回 evaluate_jobs 的關鍵字參數"""
+    columns = tuple([] for _ in range(9))
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                values = (row[0].strip(), row[1].strip(), float(row[2]), int(row[3]),
+                          row[4].strip(), row[5].strip(), row[6].strip(), float(row[7]),
+                          float(row[8]) if len(row) > 8 and row[8].strip() else np.nan)
+            except (ValueError, IndexError):
+                if line == 1:
+                    continue  # 標題列
+                raise InputError(f'錯誤：工單第 {line} 列格式不正確: {",".join(row)}')
+            for column, value in zip(columns, values):
+                column.append(value)
+    if not columns[0]:
+        raise InputError("錯誤：工單沒有資料")
+    job, material, diameter, teeth, machining_type, vc_level, fz_level, depth, width = columns
+    return dict(job=np.array(job), material=material, diameter=diameter, teeth=teeth,
+                machining_type=machining_type, vc_level=vc_level, fz_level=fz_level,
+                depth=depth, width=width)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='工單主軸功率/扭力檢查')
+    parser.add_argument('jobs', help='工單 CSV（工單, 材料, 刀具直徑, 齒數, 加工類型, VC條件, fz條件, 切深[, 切寬]）')
+    parser.add_argument('--machine', choices=list(MACHINE_PROFILES), default=DEFAULT_MACHINE.name)
+    parser.add_argument('--csv', help='輸出結果 CSV')
+    parser.add_argument('--rows', type=int, default=20, help='報告列出的工單數')
+    args = parser.parse_args(argv)
+    try:
+        result = evaluate_jobs(machine=MACHINE_PROFILES[args.machine], **read_jobs(args.jobs))
+    except InputError as e:
+        parser.error(e.message)
+    print(result.report(args.rows))
+    if args.csv:
+        result.write_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
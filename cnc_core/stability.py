@@ -0,0 +1,318 @@
+"""
+銑削顫振穩定性葉瓣圖（零階近似 ZOA，Altintas & Budak）
+刀尖頻響函數 G(ω)（x、y 兩方向，mm/N）與平均方向係數 [α0] 組成特徵值問題
+    det([I] + Λ·[α0]·[G(iωc)]) = 0，Λ = -1/(2a0)·(a1 ± sqrt(a1² - 4a0))
+    a0 = Gxx·Gyy·(αxx·αyy - αxy·αyx)，a1 = αxx·Gxx + αyy·Gyy
+臨界軸向切深與對應主軸轉速（κ = ΛI/ΛR，ε = π - 2·atan(κ)，k 為葉瓣序號）
+    a_lim = -2π·ΛR·(1 + κ²) / (N·Kt)
+    n = 60·fc / (N·(k + ε/2π))
+各葉瓣在轉速網格上取下包絡即為各轉速的穩定切深；葉瓣依序號分配給多個行程平行計算。
+
+頻響可由模態參數（頻率、阻尼比、剛性）產生，或讀入敲擊測試的 CSV（頻率 Hz, 實部, 虛部 [, y 實部, y 虛部]，
+單位 m/N）或先前以 save_frf 存下的 .npz。
+
+用法: python -m cnc_core.stability --dia 10 --teeth 4 --ae 5 (--mode 850:0.03:20000 | --frf 刀尖.csv)
+      [--mode-y ...] [--kt 2000] [--conventional] [--workers 4] [--csv 葉瓣.csv]
+"""
+
+import argparse
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import DEFAULT_KC, RADIAL_FORCE_RATIO, RPM_LIMITS, InputError
+
+RPM_POINTS = 4000          # 轉速網格點數
+FREQ_POINTS = 8000         # 由模態產生頻響時的頻率點數
+POCKET_RATIO = 0.9         # 穩定區間：切深不低於峰值此比例的轉速範圍
+MIN_POCKET_GAIN = 1.2      # 峰值切深至少為臨界切深的此倍數才視為穩定區
+LOBE_BATCH = 1 << 20       # 每批計算的 葉瓣×特徵值×頻率 點數
+
+
+@dataclass(frozen=True)
+class Mode:
+    """單自由度模態：固有頻率 Hz、阻尼比、剛性 N/mm"""
+    frequency: float
+    damping: float
+    stiffness: float
+
+    def __post_init__(self):
+        if self.frequency <= 0 or self.stiffness <= 0 or not 0 < self.damping < 1:
+            raise InputError("錯誤：模態參數無效", "頻率、剛性須大於0，阻尼比介於0與1之間")
+
+    def response(self, freq):
+        """頻響 mm/N"""
+        r = np.asarray(freq, dtype=np.float64) / self.frequency
+        return 1 / (self.stiffness * (1 - r * r + 2j * self.damping * r))
+
+
+@dataclass
+class FRF:
+    """刀尖頻響：頻率 Hz 與 x、y 方向的直接頻響 mm/N（交叉項忽略）"""
+    freq: np.ndarray
+    xx: np.ndarray
+    yy: np.ndarray
+
+    @classmethod
+    def from_modes(cls, modes_x, modes_y=None, freq=None, points=FREQ_POINTS):
+        """由模態疊加產生頻響；modes_y 省略時與 x 相同（對稱刀具）"""
+        modes_x = list(modes_x)
+        modes_y = modes_x if modes_y is None else list(modes_y)
+        if not modes_x or not modes_y:
+            raise InputError("錯誤：至少需要一個模態")
+        if freq is None:
+            fn = [m.frequency for m in modes_x + modes_y]
+            freq = np.linspace(0.5 * min(fn), 1.5 * max(fn), points)
+        freq = np.asarray(freq, dtype=np.float64)
+        return cls(freq, sum(m.response(freq) for m in modes_x),
+                   sum(m.response(freq) for m in modes_y))
+
+
+def save_frf(path, frf):
+    """以 .npz 儲存頻響"""
+    np.savez(path, freq=frf.freq, xx=frf.xx, yy=frf.yy)
+
+
+def load_frf(path, unit=1000.0):
+    """讀入頻響：.npz（save_frf 格式，mm/N）或 CSV（unit 為換算成 mm/N 的倍數，預設 m/N）"""
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return FRF(data['freq'], data['xx'], data['yy'])
+    rows = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                values = [float(v) for v in row[:5] if v.strip()]
+                if len(values) not in (3, 5):
+                    raise ValueError
+            except ValueError:
+                if line == 1:
+                    continue  # 標題列
+                raise InputError(f'錯誤：頻響第 {line} 列格式不正確: {",".join(row)}')
+            rows.append(values if len(values) == 5 else values + values[1:])
+    if len(rows) < 2:
+        raise InputError("錯誤：頻響資料不足")
+    data = np.array(rows)
+    order = np.argsort(data[:, 0])
+    data = data[order]
+    return FRF(data[:, 0], (data[:, 1] + 1j * data[:, 2]) * unit,
+               (data[:, 3] + 1j * data[:, 4]) * unit)
+
+
+def immersion(diameter, width, climb=True):
+    """徑向切寬對應的切入、切出角（弧度，自 y 軸起算）"""
+    if diameter <= 0 or width <= 0:
+        raise InputError("錯誤：請輸入有效的正數")
+    ratio = min(width / diameter, 1.0)
+    # 順銑自 acos(2a/D - 1) 切入至 π 切出，逆銑自 0 切入至 acos(1 - 2a/D) 切出，兩者接觸弧長相同
+    if climb:
+        return math.acos(2 * ratio - 1), math.pi
+    return 0.0, math.acos(1 - 2 * ratio)
+
+
+def directional_factors(phi_start, phi_exit, kr=RADIAL_FORCE_RATIO):
+    """平均方向係數 (αxx, αxy, αyx, αyy)"""
+    def terms(p):
+        c, s = math.cos(2 * p), math.sin(2 * p)
+        return (c - 2 * kr * p + kr * s, -s - 2 * p + kr * c,
+                -s + 2 * p + kr * c, -c - 2 * kr * p - kr * s)
+    return tuple(0.5 * (b - a) for a, b in zip(terms(phi_start), terms(phi_exit)))
+
+
+def _eigenvalues(frf, alpha):
+    """兩個特徵值 Λ，形狀 (2, 頻率數)"""
+    axx, axy, ayx, ayy = alpha
+    a0 = frf.xx * frf.yy * (axx * ayy - axy * ayx)
+    a1 = axx * frf.xx + ayy * frf.yy
+    root = np.sqrt(a1 * a1 - 4 * a0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pair = np.stack([-(a1 + root) / (2 * a0), -(a1 - root) / (2 * a0)])
+        # a0 ≈ 0（單方向柔性）時退化為一次方程式 Λ = -1/a1
+        single = np.abs(a0) < 1e-12 * np.abs(a1) ** 2
+        pair[0] = np.where(single, -1 / a1, pair[0])
+        pair[1] = np.where(single, np.nan, pair[1])
+    return pair
+
+
+def _rasterize(envelope, rpm, speeds, depth):
+    """將葉瓣線段內插到轉速網格並取最小值；speeds 形狀 (葉瓣, 特徵值, 頻率)"""
+    n1, n2 = speeds[..., :-1].ravel(), speeds[..., 1:].ravel()
+    a1 = np.broadcast_to(depth[:, :-1], speeds[..., :-1].shape).ravel()
+    a2 = np.broadcast_to(depth[:, 1:], speeds[..., 1:].shape).ravel()
+    # 相鄰兩頻率點都穩定可算時才連成線段，再內插到落在線段轉速範圍內的網格點
+    lo, hi = np.minimum(n1, n2), np.maximum(n1, n2)
+    ok = np.isfinite(a1) & np.isfinite(a2) & (hi >= rpm[0]) & (lo <= rpm[-1])
+    n1, n2, a1, a2, lo, hi = n1[ok], n2[ok], a1[ok], a2[ok], lo[ok], hi[ok]
+    start = np.searchsorted(rpm, lo, side='left')
+    count = np.searchsorted(rpm, hi, side='right') - start
+    total = int(count.sum())
+    if total == 0:
+        return
+    seg = np.repeat(np.arange(len(count)), count)
+    grid = start[seg] + np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+    span = n2[seg] - n1[seg]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(span != 0, (rpm[grid] - n1[seg]) / span, 0.0)
+    np.minimum.at(envelope, grid, a1[seg] + t * (a2[seg] - a1[seg]))
+
+
+def _lobe_envelope(args):
+    """一組葉瓣序號在轉速網格上的最小穩定切深（行程池的工作函式）"""
+    lobes, freq, depth, phase, rpm, teeth = args
+    envelope = np.full(len(rpm), np.inf)
+    batch = max(1, LOBE_BATCH // depth.size)
+    for i in range(0, len(lobes), batch):
+        k = np.asarray(lobes[i:i + batch], dtype=np.float64)[:, None, None]
+        _rasterize(envelope, rpm, 60 * freq / (teeth * (k + phase / (2 * np.pi))), depth)
+    return envelope
+
+
+@dataclass(frozen=True)
+class Pocket:
+    """穩定轉速區：峰值轉速、峰值切深、切深不低於峰值 POCKET_RATIO 的轉速範圍"""
+    rpm: float
+    depth: float
+    low: float
+    high: float
+
+
+@dataclass
+class LobeDiagram:
+    """葉瓣圖：各轉速的穩定軸向切深 mm"""
+    rpm: np.ndarray
+    depth: np.ndarray          # inf 為頻響範圍內沒有葉瓣落在此轉速（不受頻響範圍限制）
+    critical: float            # 無條件穩定切深（全轉速範圍的最小值）mm
+    teeth: int
+
+    def depth_at(self, rpm):
+        """指定轉速的穩定切深 mm"""
+        return float(np.interp(rpm, self.rpm, self.depth))
+
+    def pockets(self, count=5):
+        """穩定區（葉瓣間的切深峰值），依切深由大到小；轉速範圍內沒有葉瓣時為空"""
+        finite = np.isfinite(self.depth)
+        if not finite.any():
+            return []
+        d = np.where(finite, self.depth, self.depth[finite].max())
+        peak = np.flatnonzero((d[1:-1] >= d[:-2]) & (d[1:-1] > d[2:])) + 1
+        if d[-1] > d[-2]:
+            peak = np.append(peak, len(d) - 1)
+        peak = peak[d[peak] >= self.critical * MIN_POCKET_GAIN]
+        peak = peak[np.argsort(-d[peak], kind='stable')][:count]
+        result = []
+        for i in peak:
+            # 範圍只延伸到切深開始高於此峰值為止，避免涵蓋相鄰較高的穩定區
+            inside = (d >= d[i] * POCKET_RATIO) & (d <= d[i])
+            lo = i
+            while lo > 0 and inside[lo - 1]:
+                lo -= 1
+            hi = i
+            while hi < len(d) - 1 and inside[hi + 1]:
+                hi += 1
+            result.append(Pocket(float(self.rpm[i]), float(d[i]),
+                                 float(self.rpm[lo]), float(self.rpm[hi])))
+        return result
+
+    def nearest_stable(self, rpm, depth):
+        """最接近 rpm 且穩定切深不小於 depth 的轉速，沒有時返回 None"""
+        ok = np.flatnonzero(self.depth >= depth)
+        if len(ok) == 0:
+            return None
+        return float(self.rpm[ok[np.argmin(np.abs(self.rpm[ok] - rpm))]])
+
+    def report(self, count=5):
+        lines = [f"轉速 {self.rpm[0]:.0f}-{self.rpm[-1]:.0f} RPM，{self.teeth} 刃",
+                 f"無條件穩定切深 {self.critical:.2f} mm", "", "最佳轉速區："]
+        pockets = self.pockets(count)
+        if not np.isfinite(self.depth).any():
+            lines.append("• 轉速範圍內沒有葉瓣，穩定切深不受頻響範圍限制")
+        elif not pockets:
+            lines.append("• 無明顯穩定區，請以無條件穩定切深加工")
+        for p in pockets:
+            lines.append(f"• {p.rpm:.0f} RPM：穩定切深 {p.depth:.2f} mm"
+                         f"（{p.low:.0f}-{p.high:.0f} RPM 內不低於 {p.depth * POCKET_RATIO:.2f} mm）")
+        return '\n'.join(lines)
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('轉速', '穩定切深'))
+            for n, a in zip(self.rpm, self.depth):
+                writer.writerow((f"{n:.1f}", f"{a:.4f}"))
+
+
+def stability_lobes(frf, teeth, diameter, width, kt=DEFAULT_KC, kr=RADIAL_FORCE_RATIO,
+                    climb=True, rpm_range=RPM_LIMITS, points=RPM_POINTS, workers=None):
+    """計算葉瓣圖；workers 為行程數（None 為 CPU 核心數，1 為不使用行程池）"""
+    if teeth < 1 or kt <= 0 or points < 2 or not 0 < rpm_range[0] < rpm_range[1]:
+        raise InputError("錯誤：請輸入有效的正數")
+    alpha = directional_factors(*immersion(diameter, width, climb), kr)
+    lam = _eigenvalues(frf, alpha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kappa = lam.imag / lam.real
+        depth = np.where(lam.real < 0, -2 * np.pi * lam.real * (1 + kappa ** 2) / (teeth * kt), np.nan)
+    phase = np.pi - 2 * np.arctan(np.nan_to_num(kappa))
+    rpm = np.linspace(rpm_range[0], rpm_range[1], points)
+
+    # 葉瓣序號上限：最高頻率在最低轉速下的齒通過倍數
+    lobes = np.arange(int(math.ceil(60 * frf.freq.max() / (teeth * rpm_range[0]))) + 1)
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(lobes))
+    jobs = [(lobes[w::workers], frf.freq, depth, phase, rpm, teeth) for w in range(workers)]
+    if workers == 1:
+        envelopes = [_lobe_envelope(jobs[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            envelopes = list(pool.map(_lobe_envelope, jobs))
+    envelope = np.minimum.reduce(envelopes)
+    finite = depth[np.isfinite(depth)]
+    if finite.size == 0:
+        raise InputError("錯誤：頻響範圍內沒有顫振解", "請確認頻響資料包含刀尖的主要模態")
+    return LobeDiagram(rpm, envelope, float(finite.min()), int(teeth))
+
+
+def parse_mode(text):
+    """解析 頻率:阻尼比:剛性，例如 850:0.03:20000"""
+    try:
+        frequency, damping, stiffness = (float(v) for v in text.split(':'))
+        return Mode(frequency, damping, stiffness)
+    except (ValueError, InputError):
+        raise argparse.ArgumentTypeError(f'模態格式應為 頻率Hz:阻尼比:剛性N/mm ({text})')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='銑削穩定性葉瓣圖（零階近似）')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--mode', type=parse_mode, action='append',
+                        help='x 方向模態 頻率Hz:阻尼比:剛性N/mm，可重複指定')
+    source.add_argument('--frf', help='刀尖頻響 CSV（m/N）或 .npz')
+    parser.add_argument('--mode-y', type=parse_mode, action='append', help='y 方向模態（預設同 x）')
+    parser.add_argument('--dia', type=float, required=True, help='刀具直徑 mm')
+    parser.add_argument('--teeth', type=int, required=True, help='刃數')
+    parser.add_argument('--ae', type=float, required=True, help='徑向切寬 mm')
+    parser.add_argument('--kt', type=float, default=DEFAULT_KC, help='切線比切削力 N/mm²')
+    parser.add_argument('--kr', type=float, default=RADIAL_FORCE_RATIO, help='徑向/切線力比')
+    parser.add_argument('--conventional', action='store_true', help='逆銑')
+    parser.add_argument('--rpm', type=float, nargs=2, default=RPM_LIMITS, metavar=('MIN', 'MAX'))
+    parser.add_argument('--workers', type=int, help='行程數（預設為 CPU 核心數）')
+    parser.add_argument('--csv', help='輸出葉瓣 CSV')
+    args = parser.parse_args(argv)
+    try:
+        frf = load_frf(args.frf) if args.frf else FRF.from_modes(args.mode, args.mode_y)
+        diagram = stability_lobes(frf, args.teeth, args.dia, args.ae, args.kt, args.kr,
+                                  not args.conventional, tuple(args.rpm), workers=args.workers)
+    except InputError as e:
+        parser.error(e.message)
+    print(diagram.report())
+    if args.csv:
+        diagram.write_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+二進位 STL 讀寫
+以 mmap + numpy.frombuffer 零複製讀取：每個三角形 50 bytes
+（法向量 3×float32、頂點 3×3×float32、屬性 uint16），數百萬個三角形也不需要解析
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import InputError
+
+HEADER_SIZE = 84
+FACET_DTYPE = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+
+@dataclass
+class Mesh:
+    """三角網格（陣列為檔案緩衝區的唯讀視圖）"""
+    normals: np.ndarray        # (n, 3)
+    vertices: np.ndarray       # (n, 3, 3)
+    buffer: object = None      # 保持 mmap 開啟
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @property
+    def bounds(self):
+        """(最小點, 最大點)"""
+        v = self.vertices.reshape(-1, 3)
+        return v.min(axis=0), v.max(axis=0)
+
+
+def read_stl(path):
+    """讀取二進位 STL"""
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:     # 空檔案
+            buffer = f.read()
+    count = struct.unpack_from('<I', buffer, 80)[0] if len(buffer) >= HEADER_SIZE else -1
+    if len(buffer) != HEADER_SIZE + count * FACET_DTYPE.itemsize:
+        if bytes(buffer[:5]) == b'solid':
+            raise InputError("錯誤：只支援二進位 STL，請將 ASCII STL 另存為二進位格式")
+        raise InputError("錯誤：STL 檔案大小與三角形數量不符")
+    facets = np.frombuffer(buffer, dtype=FACET_DTYPE, count=count, offset=HEADER_SIZE)
+    return Mesh(facets['normal'], facets['vertices'], buffer)
+
+
+def write_stl(path, vertices, normals=None, header=b'cnc_core'):
+    """寫入二進位 STL；normals 省略時由頂點計算"""
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3, 3)
+    if normals is None:
+        normals = facet_normals(vertices)
+    facets = np.zeros(len(vertices), dtype=FACET_DTYPE)
+    facets['normal'] = normals
+    facets['vertices'] = vertices
+    with open(path, 'wb') as f:
+        f.write(header[:80].ljust(80, b'\0'))
+        f.write(struct.pack('<I', len(facets)))
+        f.write(facets.tobytes())
+
+
+def facet_normals(vertices, return_area=False):
+    """由頂點計算單位法向量（退化三角形為 0），可同時返回面積"""
+    v = np.asarray(vertices, dtype=np.float64)
+    cross = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    norm = np.sqrt(np.einsum('ij,ij->i', cross, cross))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normals = np.nan_to_num(cross / norm[:, None])
+    return (normals, norm / 2) if return_area else normals
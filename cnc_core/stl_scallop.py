@@ -0,0 +1,198 @@
+"""
+斜面/曲面的球刀殘餘高度（STL 網格）
+h = R - sqrt(R² - (P/2)²) 只適用於平面。平行銑削時步距 P 是在 XY 平面沿步距方向 s 量測的，
+斜面上沿表面的實際步距為
+    P_eff = P·sqrt(1 + g²)，g = (n_x·s_x + n_y·s_y) / n_z（表面沿 s 方向的斜率）
+每個三角形以 P_eff 計算殘餘高度，依坡度（法向量與 Z 軸夾角）分段統計面積加權結果，
+並反算各坡度段達到目標殘餘高度所需的 XY 步距。
+
+分批計算，數百萬個三角形也只需數秒。
+
+用法: python -m cnc_core.stl_scallop 模型.stl --dia 6 --step 0.3 [--direction 0] [--target 0.005]
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import InputError, max_step_for_height, scallop_height, scallop_quality
+from .stl import facet_normals, read_stl
+
+SLOPE_BANDS = (0, 15, 30, 45, 60, 75, 90)    # 坡度分段（度）
+CHUNK = 1 << 20                               # 每批三角形數
+STEEP_LIMIT = 0.1                             # 所需步距小於平面步距的此比例時建議改用等高加工
+VERTICAL_TOL = 1e-6                           # |n_z| 在此以內視為垂直面（可加工，斜率無限大）
+
+
+@dataclass(frozen=True)
+class SlopeBand:
+    """坡度段統計"""
+    low: float                 # 坡度下限（度）
+    high: float
+    area: float                # mm²
+    mean_scallop: float        # 面積加權平均殘餘高度 mm
+    max_scallop: float
+    step: float                # 此段全部達到目標所需的 XY 步距 mm（0 表示平行銑削無法達成）
+
+
+@dataclass
+class MeshScallop:
+    """網格殘餘高度分析結果"""
+    tool_dia: float
+    step: float
+    direction_deg: float       # 走刀方向（XY 平面，度）
+    target: float              # 目標殘餘高度 mm
+    facets: int
+    area: float
+    undercut_area: float       # 朝下（刀具無法從上方加工）的面積
+    exceed_area: float         # 殘餘高度超過目標的面積
+    bands: list
+
+    @property
+    def exceed_ratio(self):
+        machinable = self.area - self.undercut_area
+        return self.exceed_area / machinable if machinable > 0 else 0.0
+
+    def report(self):
+        flat = scallop_height(self.tool_dia, self.step)
+        machinable = self.area - self.undercut_area
+        lines = [
+            f"三角形 {self.facets:,}，表面積 {self.area:,.0f} mm²"
+            + (f"（朝下 {self.undercut_area:,.0f} mm² 不計）" if self.undercut_area else ""),
+            f"球刀 D{self.tool_dia:g}，步距 {self.step:g} mm，走刀方向 {self.direction_deg:g}°",
+            f"平面殘餘高度 {flat * 1000:.1f} μm，目標 {self.target * 1000:.1f} μm，"
+            f"超過目標的面積 {self.exceed_ratio:.1%}",
+            "",
+        ]
+        for band in self.bands:
+            if band.area == 0:
+                continue
+            if band.step <= 0:
+                need = "需改用等高加工或改變走刀方向"
+            else:
+                need = f"所需步距 {band.step:.3f} mm"
+                if band.step < STEEP_LIMIT * max_step_for_height(self.tool_dia, self.target):
+                    need += "（建議改用等高加工）"
+            lines.append(
+                f"• 坡度 {band.low:g}-{band.high:g}°：面積 {band.area / machinable:.1%}，"
+                f"殘餘 平均 {band.mean_scallop * 1000:.1f} / 最大 {band.max_scallop * 1000:.1f} μm"
+                f"（{scallop_quality(band.max_scallop)[0]}），{need}"
+            )
+        return '\n'.join(lines)
+
+
+def _chunks(mesh, chunk):
+    for i in range(0, len(mesh), chunk):
+        yield facet_normals(mesh.vertices[i:i + chunk], return_area=True)
+
+
+def _scallop(radius, step, g):
+    """依表面斜率 g 的實際步距計算殘餘高度（步距超過直徑時為 R）"""
+    half = step * np.sqrt(1 + g * g) / 2
+    return radius - np.sqrt(np.maximum(radius * radius - half * half, 0))
+
+
+def _machinable(nz):
+    """可從上方加工的面（朝上或垂直）"""
+    return nz > -VERTICAL_TOL
+
+
+def _gradient(normals, direction_deg):
+    """沿步距方向（走刀方向的垂直方向）的表面斜率 |g|，朝下的面為 NaN
+
+    垂直面橫越步距方向時為 inf（殘餘高度 = R）；與步距方向平行的垂直面沿牆面的步距即 P，斜率為 0
+    """
+    theta = math.radians(direction_deg)
+    sx, sy = -math.sin(theta), math.cos(theta)
+    nz = normals[:, 2]
+    across = np.abs(normals[:, 0] * sx + normals[:, 1] * sy)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        g = across / nz
+    vertical = np.where(across > VERTICAL_TOL, np.inf, 0.0)
+    g = np.where(np.abs(nz) <= VERTICAL_TOL, vertical, g)
+    return np.where(_machinable(nz), g, np.nan)
+
+
+def mesh_scallop(mesh, tool_dia, step, direction_deg=0.0, target=None, bands=SLOPE_BANDS, chunk=CHUNK):
+    """分析網格的殘餘高度；target 預設為平面殘餘高度"""
+    if tool_dia <= 0 or step <= 0:
+        raise InputError("錯誤：請輸入有效的正數")
+    R = tool_dia / 2
+    target = scallop_height(tool_dia, step) if target is None else target
+    edges = np.radians(np.asarray(bands, dtype=np.float64))
+    nb = len(bands) - 1
+
+    area_sum = np.zeros(nb)
+    weighted = np.zeros(nb)
+    max_h = np.zeros(nb)
+    max_g = np.zeros(nb)
+    total = undercut = exceed = 0.0
+    for normals, area in _chunks(mesh, chunk):
+        total += area.sum()
+        g = _gradient(normals, direction_deg)
+        down = np.isnan(g)
+        undercut += area[down].sum()
+        up = ~down & (area > 0)
+        g, area, nz = g[up], area[up], normals[up, 2]
+        slope = np.arccos(np.clip(nz, -1, 1))
+        band = np.clip(np.searchsorted(edges, slope, side='right') - 1, 0, nb - 1)
+        h = _scallop(R, step, g)
+        area_sum += np.bincount(band, weights=area, minlength=nb)
+        weighted += np.bincount(band, weights=area * h, minlength=nb)
+        np.maximum.at(max_h, band, h)
+        np.maximum.at(max_g, band, np.where(np.isfinite(g), g, np.inf))
+        exceed += area[h > target + 1e-12].sum()
+
+    flat_step = max_step_for_height(tool_dia, target)
+    result = []
+    for k in range(nb):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = weighted[k] / area_sum[k] if area_sum[k] else 0.0
+        need = flat_step / math.sqrt(1 + max_g[k] ** 2) if math.isfinite(max_g[k]) else 0.0
+        result.append(SlopeBand(bands[k], bands[k + 1], float(area_sum[k]), float(mean),
+                                float(max_h[k]), need))
+    return MeshScallop(tool_dia, step, direction_deg, target, len(mesh), float(total),
+                       float(undercut), float(exceed), result)
+
+
+def best_direction(mesh, tool_dia, step, target=None, angles=range(0, 180, 15), chunk=CHUNK):
+    """比較各走刀方向，返回 [(角度, 超過目標的面積比例)]，依比例由小到大排序"""
+    R = tool_dia / 2
+    target = scallop_height(tool_dia, step) if target is None else target
+    exceed = dict.fromkeys(angles, 0.0)
+    machinable = 0.0
+    for normals, area in _chunks(mesh, chunk):
+        up = _machinable(normals[:, 2])
+        normals, area = normals[up], area[up]
+        machinable += area.sum()
+        for angle in angles:
+            h = _scallop(R, step, _gradient(normals, angle))
+            exceed[angle] += area[h > target + 1e-12].sum()
+    ranked = [(angle, float(exceed[angle] / machinable) if machinable else 0.0) for angle in angles]
+    return sorted(ranked, key=lambda item: item[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='STL 網格的球刀殘餘高度分析')
+    parser.add_argument('path', help='二進位 STL')
+    parser.add_argument('--dia', type=float, required=True, help='球刀直徑 mm')
+    parser.add_argument('--step', type=float, required=True, help='XY 步距 mm')
+    parser.add_argument('--direction', type=float, default=0.0, help='走刀方向（度，0 為沿 X）')
+    parser.add_argument('--target', type=float, help='目標殘餘高度 mm（預設為平面值）')
+    parser.add_argument('--compare', action='store_true', help='比較各走刀方向')
+    args = parser.parse_args(argv)
+    try:
+        mesh = read_stl(args.path)
+        print(mesh_scallop(mesh, args.dia, args.step, args.direction, args.target).report())
+        if args.compare:
+            print("\n走刀方向比較（超過目標的面積）:")
+            for angle, ratio in best_direction(mesh, args.dia, args.step, args.target):
+                print(f"• {angle}°: {ratio:.1%}")
+    except InputError as e:
+        parser.error(e.message)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+刀具更換排程
+依 Taylor 刀具壽命累計每把刀的磨損：每段工單消耗 切削時間 / T(vc) 的壽命比例，
+在用量超過 1 - reserve 前安排換刀（split 時可在工單中途換刀）。
+各機台平行加工，以 heapq 事件佇列依時間順序處理各機台的換刀請求；換刀需要操作員，
+取最早空閒的操作員（同樣以 heapq 維護），操作員忙碌時機台等待。
+
+工單 CSV 欄位：工單, 機台, 刀號, 材料, VC, 切削時間 min[, 其他時間 min]（第一列可為標題），
+同一機台的工單依檔案順序加工。
+
+用法: python -m cnc_core.tool_change 工單.csv [--operators 2] [--change-time 5] [--reserve 0.1] [--split]
+"""
+
+import argparse
+import csv
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from .engine import InputError, TOOL_MATERIAL_FACTOR, tool_life
+from .refdata import store
+
+
+@dataclass(frozen=True)
+class Job:
+    """一段工單：在機台上以某把刀切削"""
+    name: str
+    machine: str
+    tool: int
+    material: str
+    vc: float                  # 切削速度 m/min
+    minutes: float             # 切削時間 min
+    other: float = 0.0         # 非切削時間（定位、量測等）min
+    tool_material: str = '碳化鎢'
+
+    @classmethod
+    def from_cutting(cls, name, machine, tool, result, minutes, other=0.0):
+        """由 compute_cutting 的結果建立工單（以限制後轉速的實際 VC 計算壽命）"""
+        vc = result.rpm * math.pi * result.inp.tool_diameter / 1000
+        return cls(name, machine, tool, result.inp.material, vc, minutes, other)
+
+
+@dataclass(frozen=True)
+class ScheduleOptions:
+    """排程設定"""
+    change_time: float = 5.0   # 人工換刀（含對刀）時間 min
+    operators: int = 1         # 可同時換刀的操作員數
+    reserve: float = 0.1       # 保留的壽命比例（用量超過 1 - reserve 即換刀）
+    split: bool = False        # 允許在工單中途換刀；否則在工單開始前換刀
+
+    def __post_init__(self):
+        if self.change_time < 0 or self.operators < 1 or not 0 <= self.reserve < 1:
+            raise InputError("錯誤：換刀時間不可為負，操作員至少 1 人，保留比例介於 0 與 1 之間")
+
+
+@dataclass
+class ToolChange:
+    """一次換刀"""
+    time: float                # 開始換刀時間 min（自排程起點）
+    machine: str
+    tool: int
+    job: str                   # 換刀時正要加工或正在加工的工單
+    worn: float                # 換下刀具已用的壽命比例
+    wait: float                # 等待操作員的時間 min
+    mid_job: bool = False
+
+
+@dataclass
+class ToolUsage:
+    """每把刀（機台, 刀號）的使用統計"""
+    used: float = 0.0          # 目前這支刀已用的壽命比例
+    changes: int = 0
+    cutting: float = 0.0       # 累計切削時間 min
+
+
+@dataclass
+class Schedule:
+    """排程結果"""
+    changes: list
+    makespan: float            # 全部完成的時間 min
+    jobs: int
+    tools: Dict[Tuple[str, int], ToolUsage]
+    finish: Dict[str, float]   # 各機台完成時間 min
+    overruns: list = field(default_factory=list)   # 單段工單就超過一支新刀可用壽命的工單名稱
+
+    @property
+    def wait(self):
+        return sum(c.wait for c in self.changes)
+
+    def report(self, rows=20):
+        lines = [f"工單 {self.jobs:,} 段，機台 {len(self.finish)} 台，刀具 {len(self.tools):,} 把",
+                 f"換刀 {len(self.changes):,} 次，等待操作員共 {self.wait:.0f} min，"
+                 f"全部完成 {self.makespan / 60:.1f} h"]
+        if self.overruns:
+            lines.append(f"警告：{len(self.overruns)} 段工單超過一支新刀的壽命"
+                         f"（{', '.join(self.overruns[:5])}{'…' if len(self.overruns) > 5 else ''}），"
+                         "請降低 VC 或分段加工")
+        if self.changes:
+            lines += ["", "換刀時間表："]
+            for c in self.changes[:rows]:
+                mid = "（中途）" if c.mid_job else ""
+                wait = f"，等待 {c.wait:.0f} min" if c.wait > 0 else ""
+                lines.append(f"• {c.time / 60:7.2f} h  {c.machine} T{c.tool} → {c.job}{mid}"
+                             f"，已用壽命 {c.worn:.0%}{wait}")
+            if len(self.changes) > rows:
+                lines.append(f"…其餘 {len(self.changes) - rows:,} 次")
+        return '\n'.join(lines)
+
+
+class _LifeTable:
+    """(材料, VC, 刀具材料) → 刀具壽命 min，每種組合只計算一次"""
+
+    def __init__(self):
+        self._params = {}
+        self.life = {}
+
+    def __call__(self, job):
+        key = (job.material, job.vc, job.tool_material)
+        life = self.life.get(key)
+        if life is None:
+            params = self._params.get(job.material)
+            if params is None:
+                params = store().material(job.material)
+                if params is None:
+                    raise InputError(f"錯誤: 未知材料 {job.material}（工單 {job.name}）")
+                self._params[job.material] = params
+            if job.vc <= 0:
+                raise InputError(f"錯誤: 工單 {job.name} 的 VC 必須大於0")
+            if job.tool_material not in TOOL_MATERIAL_FACTOR:
+                raise InputError(f"錯誤: 未知刀具材料 {job.tool_material}（工單 {job.name}）")
+            life = self.life[key] = tool_life(params, job.vc, job.tool_material)
+        return life
+
+
+def schedule(jobs, options=ScheduleOptions(), worn=None):
+    """排定換刀；worn 為 {(機台, 刀號): 已用壽命比例}，未列出的刀具視為新刀"""
+    queues = {}
+    for job in jobs:
+        if job.minutes < 0 or job.other < 0:
+            raise InputError(f"錯誤: 工單 {job.name} 的時間不可為負")
+        queues.setdefault(job.machine, []).append(job)
+
+    life_of = _LifeTable()
+    lives = life_of.life           # 已計算的壽命，迴圈內直接查表
+    limit = 1 - options.reserve
+    tools = {}
+    if worn:
+        for key, used in worn.items():
+            tools[key] = ToolUsage(used=used)
+    overruns = []
+    finish = {}
+
+    def run(machine, queue):
+        """依序加工一台機台的工單；需要換刀時 yield (時間, 工單, 刀具, 是否中途)，取回換刀完成時間"""
+        t = 0.0
+        split = options.split
+        for job in queue:
+            key = (machine, job.tool)
+            usage = tools.get(key)
+            if usage is None:
+                usage = tools[key] = ToolUsage()
+            life = lives.get((job.material, job.vc, job.tool_material)) or life_of(job)
+            minutes = job.minutes
+            need = minutes / life
+            t += job.other
+            if need > limit:
+                overruns.append(job.name)
+            if split:
+                remaining = minutes
+                while usage.used + remaining / life > limit + 1e-12:
+                    cut = max(0.0, (limit - usage.used) * life)
+                    t += cut
+                    remaining -= cut
+                    usage.used += cut / life
+                    usage.cutting += cut
+                    t = yield t, job, usage, job.minutes - remaining > 1e-9
+                usage.used += remaining / life
+                usage.cutting += remaining
+                t += remaining
+            else:
+                if usage.used > 0 and usage.used + need > limit + 1e-12:
+                    t = yield t, job, usage, False
+                usage.used += need
+                usage.cutting += minutes
+                t += minutes
+        finish[machine] = t
+
+    # 機台之間只在換刀時競爭操作員，因此事件只需要換刀請求：(時間, 序號, 機台, 請求)；
+    # 兩次換刀之間的工單在各機台的 generator 內直接推進，序號讓同時間的請求依機台出現順序處理
+    events = []
+    runners = {}
+    for seq, (machine, queue) in enumerate(queues.items()):
+        runners[machine] = runner = run(machine, queue)
+        request = next(runner, None)
+        if request is not None:
+            events.append((request[0], seq, machine, request))
+    heapq.heapify(events)
+
+    changes = []
+    operators = [0.0] * options.operators      # 各操作員的空閒時間（heap）
+    while events:
+        t, seq, machine, (_, job, usage, mid_job) = heapq.heappop(events)
+        start = max(t, operators[0])
+        end = start + options.change_time
+        heapq.heapreplace(operators, end)
+        changes.append(ToolChange(start, machine, job.tool, job.name, usage.used, start - t, mid_job))
+        usage.used = 0.0
+        usage.changes += 1
+        try:
+            request = runners[machine].send(end)
+        except StopIteration:
+            continue
+        heapq.heappush(events, (request[0], seq, machine, request))
+
+    changes.sort(key=lambda c: c.time)
+    return Schedule(changes, max(finish.values(), default=0.0), sum(map(len, queues.values())), tools, finish, overruns)
+
+
+def read_jobs(path):
+    """逐列讀取工單 CSV"""
+    jobs = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                other = float(row[6]) if len(row) > 6 and row[6].strip() else 0.0
+                jobs.append(Job(row[0].strip(), row[1].strip(), int(row[2]), row[3].strip(),
+                                float(row[4]), float(row[5]), other))
+            except (ValueError, IndexError):
+                if line == 1:
+                    continue  # 標題列
+                raise InputError(f'錯誤：工單第 {line} 列格式不正確: {",".join(row)}')
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='依刀具壽命排定換刀')
+    parser.add_argument('jobs', help='工單 CSV（工單, 機台, 刀號, 材料, VC, 切削時間[, 其他時間]）')
+    parser.add_argument('--operators', type=int, default=1, help='操作員數')
+    parser.add_argument('--change-time', type=float, default=5.0, help='換刀時間 min')
+    parser.add_argument('--reserve', type=float, default=0.1, help='保留壽命比例')
+    parser.add_argument('--split', action='store_true', help='允許工單中途換刀')
+    parser.add_argument('--rows', type=int, default=20, help='列出的換刀次數')
+    args = parser.parse_args(argv)
+    try:
+        options = ScheduleOptions(args.change_time, args.operators, args.reserve, args.split)
+        result = schedule(read_jobs(args.jobs), options)
+    except InputError as e:
+        parser.error(e.message)
+    print(result.report(args.rows))
+
+
+if __name__ == '__main__':
+    main()
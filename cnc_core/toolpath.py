@@ -0,0 +1,220 @@
+"""
+G 代碼移動解析
+將程式轉換為移動陣列（終點、移動類型、進給、圓弧中心、刀具、工序），
+供週期時間估算等 NumPy 計算使用。逐行串流解析，資料以 array 緊湊存放
+
+支援 G00-G03、G17（圓弧 I/J 或 R）、G90/G91、G20/G21、G94/G95、T/M06；
+獨立一行的註解視為工序名稱
+"""
+
+import math
+import re
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
+
+RAPID, LINEAR, ARC_CW, ARC_CCW = 0, 1, 2, 3
+
+WORD = re.compile(rb'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+AXES = {b'X': 0, b'Y': 1, b'Z': 2}
+COMMENT = re.compile(rb'\(([^)]*)\)?|;(.*)')
+DEFAULT_OPERATION = '(未命名)'
+
+
+@dataclass
+class Moves:
+    """移動陣列（長度 n）；第 i 段由 start[i] 移動到 end[i]"""
+    start: np.ndarray          # (n, 3) mm
+    end: np.ndarray            # (n, 3) mm
+    kind: np.ndarray           # (n,) RAPID/LINEAR/ARC_CW/ARC_CCW
+    feed: np.ndarray           # (n,) mm/min（快速移動為 NaN）
+    center: np.ndarray         # (n, 2) 圓弧中心 XY（直線為 NaN）
+    tool: np.ndarray           # (n,) tools 的索引
+    operation: np.ndarray      # (n,) operations 的索引
+    tools: tuple               # 刀號（None 表示換刀前）
+    operations: tuple          # 工序名稱
+    tool_changes: int = 0
+
+    def __len__(self):
+        return len(self.kind)
+
+
+class MoveBuilder:
+    """逐段累積移動（供解析器與工具路徑產生器共用）"""
+
+    def __init__(self, position=(0.0, 0.0, 0.0)):
+        self.position = list(position)
+        self._start = array('d')
+        self._end = array('d')
+        self._kind = array('b')
+        self._feed = array('d')
+        self._center = array('d')
+        self._tool = array('i')
+        self._op = array('i')
+        self.tools = {}
+        self.operations = {}
+        self.tool_changes = 0
+        self.tool_index = self._index(self.tools, None)
+        self.op_index = self._index(self.operations, DEFAULT_OPERATION)
+
+    @staticmethod
+    def _index(table, key):
+        return table.setdefault(key, len(table))
+
+    def set_tool(self, number, change=True):
+        self.tool_index = self._index(self.tools, number)
+        self.tool_changes += change
+
+    def set_operation(self, name):
+        self.op_index = self._index(self.operations, name)
+
+    def move(self, kind, end, feed=math.nan, center=(math.nan, math.nan)):
+        if end == self.position and kind < ARC_CW:
+            return     # 零長度直線
+        self._start.extend(self.position)
+        self._end.extend(end)
+        self._kind.append(kind)
+        self._feed.append(feed)
+        self._center.extend(center)
+        self._tool.append(self.tool_index)
+        self._op.append(self.op_index)
+        self.position = list(end)
+
+    def build(self):
+        def table(d):
+            return tuple(sorted(d, key=d.get))
+
+        return Moves(
+            start=np.frombuffer(self._start, dtype=np.float64).reshape(-1, 3),
+            end=np.frombuffer(self._end, dtype=np.float64).reshape(-1, 3),
+            kind=np.frombuffer(self._kind, dtype=np.int8),
+            feed=np.frombuffer(self._feed, dtype=np.float64),
+            center=np.frombuffer(self._center, dtype=np.float64).reshape(-1, 2),
+            tool=np.frombuffer(self._tool, dtype=np.int32),
+            operation=np.frombuffer(self._op, dtype=np.int32),
+            tools=table(self.tools),
+            operations=table(self.operations),
+            tool_changes=self.tool_changes,
+        )
+
+
+def arc_center(start, end, radius, clockwise):
+    """R 格式圓弧的中心（R < 0 表示大於 180° 的圓弧）"""
+    (x0, y0), (x1, y1) = start, end
+    dx, dy = x1 - x0, y1 - y0
+    chord = math.hypot(dx, dy)
+    if chord == 0:
+        return x0, y0
+    h = math.sqrt(max(radius * radius - chord * chord / 4, 0.0))
+    # 順時針小圓弧的中心在弦的右側
+    sign = -1 if clockwise else 1
+    if radius < 0:
+        sign = -sign
+    mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+    return mx - sign * h * dy / chord, my + sign * h * dx / chord
+
+
+def parse_gcode(lines, operation_pattern=None, position=(0.0, 0.0, 0.0)):
+    """解析 G 代碼，返回 Moves
+
+    lines 為文字或位元組行的可迭代物件（例如開啟的檔案或 helix.program_blocks）；
+    operation_pattern 為正規表示式時，只有符合的註解才開始新工序
+    """
+    builder = MoveBuilder(position)
+    op_re = re.compile(operation_pattern) if operation_pattern else None
+    motion = RAPID
+    absolute = True
+    scale = 1.0
+    per_rev = False
+    feed = 0.0
+    rpm = 0.0
+    pending_tool = None
+    findall = WORD.findall
+
+    for raw in lines:
+        line = raw.encode('ascii', 'replace') if isinstance(raw, str) else raw
+        if b'(' in line or b';' in line:
+            comment = COMMENT.search(line)
+            code = line[:comment.start()]
+            if not code.strip(b' \t\r\n%/'):
+                name = (comment.group(1) or comment.group(2) or b'').decode('ascii', 'replace').strip()
+                if name and (op_re is None or op_re.search(name)):
+                    builder.set_operation(name)
+                continue
+            line = code + line[comment.end():]
+        words = findall(line.upper())
+        if not words:
+            continue
+
+        target = [None, None, None]
+        arc_i = arc_j = radius = None
+        tool_change = has_target = False
+        for letter, value in words:
+            axis = AXES.get(letter)
+            if axis is not None:
+                target[axis] = float(value) * scale
+                has_target = True
+            elif letter == b'G':
+                g = float(value)
+                if g < 4 and g == int(g):
+                    motion = int(g)
+                elif g == 90:
+                    absolute = True
+                elif g == 91:
+                    absolute = False
+                elif g == 20:
+                    scale = 25.4
+                elif g == 21:
+                    scale = 1.0
+                elif g == 94:
+                    per_rev = False
+                elif g == 95:
+                    per_rev = True
+            elif letter == b'F':
+                feed = float(value) * scale
+            elif letter == b'I':
+                arc_i = float(value) * scale
+            elif letter == b'J':
+                arc_j = float(value) * scale
+            elif letter == b'R':
+                radius = float(value) * scale
+            elif letter == b'S':
+                rpm = float(value)
+            elif letter == b'T':
+                pending_tool = int(float(value))
+            elif letter == b'M' and float(value) == 6:
+                tool_change = True
+
+        if tool_change:
+            builder.set_tool(pending_tool)
+        elif pending_tool is not None and not builder.tool_changes:
+            builder.set_tool(pending_tool, change=False)   # 沒有 M06 的程式以 T 字換刀
+        if not has_target:
+            continue
+
+        pos = builder.position
+        if absolute:
+            end = [pos[k] if v is None else v for k, v in enumerate(target)]
+        else:
+            end = [pos[k] + (v or 0.0) for k, v in enumerate(target)]
+
+        if motion == RAPID:
+            builder.move(RAPID, end)
+            continue
+        rate = feed * rpm if per_rev else feed
+        if motion == LINEAR:
+            builder.move(LINEAR, end, rate)
+        elif radius is not None:
+            center = arc_center(pos[:2], end[:2], radius, motion == ARC_CW)
+            builder.move(motion, end, rate, center)
+        else:
+            builder.move(motion, end, rate, (pos[0] + (arc_i or 0.0), pos[1] + (arc_j or 0.0)))
+
+    return builder.build()
+
+
+def parse_file(path, operation_pattern=None):
+    """解析 NC 檔（逐行讀取，不一次載入整個檔案）"""
+    with open(path, 'rb') as f:
+        return parse_gcode(f, operation_pattern)
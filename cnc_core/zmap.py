@@ -0,0 +1,350 @@
+"""
+Z-map（高度場）切削模擬（NumPy）
+以規則網格記錄每個格點的毛坯高度，將球刀/平底刀沿刀具路徑掃掠，取最低值：
+    球刀：刀心沿線段移動的球面下包絡 z = zc(s) - sqrt(ρ² - e²)，
+          最低點位置 e = k·ρ / sqrt(1 + k²)（k 為線段斜率，ρ² = R² - 垂直距離²）
+    平底刀：刀底在可接觸區間兩端的較低者
+圓弧以弦偏差 ≤ 格距/4 的直線逼近。
+
+依 tile×tile 分塊處理：每塊只掃掠與其相交的線段，算完即統計並丟棄
+（可選擇寫入磁碟 memmap），0.01 mm 網格的大型模板也只佔用一塊的記憶體。
+
+結果為殘留量 = 模擬高度 - 目標曲面，可與 預留量 表的 粗加工/半精加工 值比較。
+
+用法: python -m cnc_core.zmap 程式.nc --dia 10 [--flat] --cell 0.01 --top 0 --target -0.5
+      [--material 鋁合金 --type 曲面 --stage 粗加工]
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import InputError, query_allowance
+from .toolpath import ARC_CW, ARC_CCW, RAPID, parse_file, parse_gcode
+
+DEFAULT_TILE = 512             # 每塊格點數（邊長）
+DEFAULT_OVERVIEW = 512         # 殘留高度總覽圖的最大邊長
+HIST_RANGE = (-2.0, 8.0)       # 殘留量直方圖範圍 mm
+HIST_STEP = 0.001              # 直方圖級距 mm
+STAGES = {'粗加工': 'rough', '半精加工': 'semi_finish'}
+
+
+@dataclass(frozen=True)
+class Cutter:
+    """刀具：直徑 mm，ball=True 為球刀，False 為平底刀"""
+    diameter: float
+    ball: bool = True
+
+    def __post_init__(self):
+        if self.diameter <= 0:
+            raise InputError("錯誤：刀具直徑必須大於0")
+
+    @property
+    def radius(self):
+        return self.diameter / 2
+
+
+@dataclass
+class ZMapResult:
+    """模擬結果（殘留量 = 模擬高度 - 目標曲面，單位 mm）"""
+    bounds: tuple              # (x0, y0, x1, y1)
+    cell: float
+    shape: tuple               # (ny, nx)
+    block: int                 # 總覽圖每格代表的格點數（邊長）
+    peak: np.ndarray           # 總覽圖：每塊最大殘留（未切削為 NaN）
+    valley: np.ndarray         # 總覽圖：每塊最小殘留
+    cut_cells: int
+    min_residual: float
+    max_residual: float
+    mean_residual: float
+    histogram: np.ndarray      # HIST_RANGE 內每 HIST_STEP 的格點數
+
+    @property
+    def scallop_map(self):
+        """每塊的峰谷差（總覽圖）"""
+        return self.peak - self.valley
+
+    @property
+    def scallop(self):
+        """整體殘留高度（最大 - 最小殘留）"""
+        return self.max_residual - self.min_residual
+
+    def fraction_below(self, value):
+        """殘留量小於 value 的格點比例"""
+        if not self.cut_cells:
+            return 0.0
+        k = int(np.clip(round((value - HIST_RANGE[0]) / HIST_STEP), 0, len(self.histogram)))
+        return float(self.histogram[:k].sum()) / self.cut_cells
+
+    def report(self):
+        total = self.shape[0] * self.shape[1]
+        if not self.cut_cells:
+            return f"網格 {self.shape[1]}×{self.shape[0]}，沒有被切削的格點"
+        return '\n'.join([
+            f"網格 {self.shape[1]}×{self.shape[0]}（格距 {self.cell} mm），"
+            f"切削 {self.cut_cells / total:.1%}",
+            f"殘留量: 最小 {self.min_residual:.4f} / 平均 {self.mean_residual:.4f} / "
+            f"最大 {self.max_residual:.4f} mm",
+            f"殘留高度（峰-谷）: {self.scallop * 1000:.1f} μm",
+        ])
+
+
+@dataclass
+class AllowanceCheck:
+    """殘留量與預留量表的比較"""
+    stage: str
+    target: float              # 表列預留量 mm
+    min_residual: float
+    max_residual: float
+    gouge: float               # 過切（殘留 < 0）的比例
+    short: float               # 預留不足的比例
+    excess: float              # 殘留過多（> 2 倍預留）的比例
+
+    @property
+    def ok(self):
+        return self.gouge == 0 and self.short == 0
+
+    def report(self):
+        lines = [
+            f"{self.stage}預留 {self.target} mm，模擬殘留 {self.min_residual:.3f} ~ {self.max_residual:.3f} mm",
+        ]
+        if self.gouge:
+            lines.append(f"⚠ 過切: {self.gouge:.2%} 的格點低於目標曲面")
+        if self.short:
+            lines.append(f"⚠ 預留不足: {self.short:.2%} 的格點少於 {self.target} mm")
+        if self.excess:
+            lines.append(f"⚠ 殘留過多: {self.excess:.2%} 的格點超過 {2 * self.target:g} mm，下一工序負荷不均")
+        if self.ok and not self.excess:
+            lines.append("✓ 預留量均勻，符合表列值")
+        return '\n'.join(lines)
+
+
+def check_allowance(result, material, machining_type, stage='粗加工', tolerance=None):
+    """將模擬殘留與 預留量 表比較；tolerance 預設為半個格距"""
+    if stage not in STAGES:
+        raise InputError(f"錯誤：未知工序 {stage}")
+    data = query_allowance(material, machining_type)
+    if data is None:
+        raise InputError("錯誤：未找到相關數據")
+    target = getattr(data, STAGES[stage])
+    tol = result.cell / 2 if tolerance is None else tolerance
+    return AllowanceCheck(
+        stage=stage,
+        target=target,
+        min_residual=result.min_residual,
+        max_residual=result.max_residual,
+        gouge=result.fraction_below(-tol),
+        short=result.fraction_below(target - tol) - result.fraction_below(-tol),
+        excess=1 - result.fraction_below(2 * target + tol),
+    )
+
+
+def tool_segments(moves, chord=0.0025):
+    """切削移動的刀尖線段 (a, b)，圓弧以弦偏差 ≤ chord 的直線逼近；快速移動不計"""
+    cut = moves.kind != RAPID
+    arc = (moves.kind == ARC_CW) | (moves.kind == ARC_CCW)
+    line = cut & ~arc
+    starts, ends = [moves.start[line]], [moves.end[line]]
+    for i in np.flatnonzero(arc):
+        (x0, y0, z0), (x1, y1, z1) = moves.start[i], moves.end[i]
+        cx, cy = moves.center[i]
+        r = math.hypot(x0 - cx, y0 - cy)
+        a0 = math.atan2(y0 - cy, x0 - cx)
+        sweep = math.atan2(y1 - cy, x1 - cx) - a0
+        if moves.kind[i] == ARC_CW:
+            sweep = -((-sweep) % (2 * math.pi) or 2 * math.pi)
+        else:
+            sweep = sweep % (2 * math.pi) or 2 * math.pi
+        step = 2 * math.acos(max(-1.0, 1 - chord / r)) if r > chord else math.pi
+        n = max(1, math.ceil(abs(sweep) / step))
+        t = np.linspace(0, 1, n + 1)
+        pts = np.column_stack([cx + r * np.cos(a0 + sweep * t), cy + r * np.sin(a0 + sweep * t),
+                               z0 + (z1 - z0) * t])
+        pts[-1] = (x1, y1, z1)
+        starts.append(pts[:-1])
+        ends.append(pts[1:])
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def _envelope(xs, ys, a, b, cutter):
+    """刀具從刀尖 a 掃掠到 b 的下包絡高度，(len(ys), len(xs))；未接觸處為 inf"""
+    R = cutter.radius
+    wx = xs[None, :] - a[0]
+    wy = ys[:, None] - a[1]
+    ux, uy, dz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    length = math.hypot(ux, uy)
+
+    if length < 1e-12:
+        # 垂直下刀
+        d2 = wx * wx + wy * wy
+        inside = d2 <= R * R
+        z = min(a[2], b[2])
+        if cutter.ball:
+            return np.where(inside, z + R - np.sqrt(np.maximum(R * R - d2, 0)), np.inf)
+        return np.where(inside, z, np.inf)
+
+    ex, ey = ux / length, uy / length
+    along = wx * ex + wy * ey
+    perp = wx * ey - wy * ex
+    rho2 = R * R - perp * perp
+    rho = np.sqrt(np.maximum(rho2, 0))
+    slope = dz / length
+    if cutter.ball:
+        s = np.clip(along - slope * rho / math.sqrt(1 + slope * slope), 0, length)
+        e = along - s
+        depth2 = rho2 - e * e
+        z = a[2] + R + slope * s - np.sqrt(np.maximum(depth2, 0))
+        return np.where((rho2 >= 0) & (depth2 >= 0), z, np.inf)
+    # 平底刀：可接觸區間 [along - ρ, along + ρ] ∩ [0, L]，取較低一端
+    lo = np.clip(along - rho, 0, length)
+    hi = np.clip(along + rho, 0, length)
+    touch = (rho2 >= 0) & (along - rho <= length) & (along + rho >= 0)
+    z = a[2] + slope * (lo if slope >= 0 else hi)
+    return np.where(touch, z, np.inf)
+
+
+def _tile_buckets(lo, hi, origin, tile_size, n_tiles):
+    """每段線段涵蓋的分塊（CSR）：返回 (起始索引, 線段索引)，依分塊編號排序"""
+    tx0 = np.clip(np.floor((lo[:, 0] - origin[0]) / tile_size), 0, n_tiles[0] - 1).astype(np.int64)
+    tx1 = np.clip(np.floor((hi[:, 0] - origin[0]) / tile_size), 0, n_tiles[0] - 1).astype(np.int64)
+    ty0 = np.clip(np.floor((lo[:, 1] - origin[1]) / tile_size), 0, n_tiles[1] - 1).astype(np.int64)
+    ty1 = np.clip(np.floor((hi[:, 1] - origin[1]) / tile_size), 0, n_tiles[1] - 1).astype(np.int64)
+    nx, ny = tx1 - tx0 + 1, ty1 - ty0 + 1
+    count = nx * ny
+    seg = np.repeat(np.arange(len(lo)), count)
+    k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    tile_id = (ty0[seg] + k // nx[seg]) * n_tiles[0] + tx0[seg] + k % nx[seg]
+    order = np.argsort(tile_id, kind='stable')
+    offsets = np.searchsorted(tile_id[order], np.arange(n_tiles[0] * n_tiles[1] + 1))
+    return offsets, seg[order]
+
+
+def simulate(moves, cutter, cell=0.01, top=0.0, target=0.0, bounds=None,
+             tile=DEFAULT_TILE, overview=DEFAULT_OVERVIEW, out=None):
+    """模擬 Moves 的切削結果
+
+    target 為目標曲面高度（數值或 f(x, y) 向量化函數）；
+    bounds 預設為路徑範圍加刀具半徑；out 為檔案路徑時另將完整高度場寫入 float32 memmap
+    """
+    if cell <= 0:
+        raise InputError("錯誤：格距必須大於0")
+    R = cutter.radius
+    a, b = tool_segments(moves, chord=cell / 4)
+    # 只保留刀具會低於毛坯頂面的線段
+    low = np.minimum(a[:, 2], b[:, 2]) < top
+    a, b = a[low], b[low]
+    lo = np.minimum(a, b)[:, :2] - R
+    hi = np.maximum(a, b)[:, :2] + R
+    if bounds is None:
+        if not len(a):
+            raise InputError("錯誤：程式沒有低於毛坯頂面的切削移動")
+        bounds = (*lo.min(axis=0), *hi.max(axis=0))
+    x0, y0, x1, y1 = bounds
+    nx = max(1, int(math.ceil((x1 - x0) / cell)))
+    ny = max(1, int(math.ceil((y1 - y0) / cell)))
+
+    # 總覽圖的區塊大小，分塊邊長取其整數倍以便對齊
+    block = max(1, math.ceil(max(nx, ny) / overview))
+    tile = max(block, tile // block * block)
+    n_tiles = (math.ceil(nx / tile), math.ceil(ny / tile))
+    offsets, order = _tile_buckets(lo, hi, (x0, y0), tile * cell, n_tiles)
+
+    peak = np.full((math.ceil(ny / block), math.ceil(nx / block)), np.nan)
+    valley = peak.copy()
+    histogram = np.zeros(int(round((HIST_RANGE[1] - HIST_RANGE[0]) / HIST_STEP)), dtype=np.int64)
+    cut_cells, total, r_min, r_max = 0, 0.0, np.inf, -np.inf
+    heights = None if out is None else np.lib.format.open_memmap(out, mode='w+', dtype=np.float32,
+                                                                 shape=(ny, nx))
+
+    for ty in range(n_tiles[1]):
+        for tx in range(n_tiles[0]):
+            i0, j0 = ty * tile, tx * tile
+            h, w = min(tile, ny - i0), min(tile, nx - j0)
+            xs = x0 + (j0 + np.arange(w) + 0.5) * cell
+            ys = y0 + (i0 + np.arange(h) + 0.5) * cell
+            z = np.full((h, w), float(top))
+            t = ty * n_tiles[0] + tx
+            for s in order[offsets[t]:offsets[t + 1]]:
+                # 只計算線段外框內的格點
+                c0 = max(0, int((lo[s, 0] - xs[0]) / cell))
+                c1 = min(w, int((hi[s, 0] - xs[0]) / cell) + 2)
+                r0 = max(0, int((lo[s, 1] - ys[0]) / cell))
+                r1 = min(h, int((hi[s, 1] - ys[0]) / cell) + 2)
+                if c0 >= c1 or r0 >= r1:
+                    continue
+                window = z[r0:r1, c0:c1]
+                np.minimum(window, _envelope(xs[c0:c1], ys[r0:r1], a[s], b[s], cutter), out=window)
+            if heights is not None:
+                heights[i0:i0 + h, j0:j0 + w] = z
+
+            cut = z < top
+            goal = target(xs[None, :], ys[:, None]) if callable(target) else target
+            residual = z - goal
+            values = residual[cut]
+            if values.size:
+                cut_cells += values.size
+                total += float(values.sum())
+                r_min = min(r_min, float(values.min()))
+                r_max = max(r_max, float(values.max()))
+                idx = np.clip(((values - HIST_RANGE[0]) / HIST_STEP).astype(np.int64), 0, len(histogram) - 1)
+                histogram += np.bincount(idx, minlength=len(histogram))
+
+            # 總覽圖：每 block×block 取最大/最小殘留
+            bh, bw = math.ceil(h / block), math.ceil(w / block)
+            pad = np.full((bh * block, bw * block), np.nan)
+            pad[:h, :w] = np.where(cut, residual, np.nan)
+            blocks = pad.reshape(bh, block, bw, block)
+            has = ~np.isnan(blocks).all(axis=(1, 3))
+            bi, bj = i0 // block, j0 // block
+            peak[bi:bi + bh, bj:bj + bw] = np.where(has, np.fmax.reduce(np.fmax.reduce(blocks, axis=3), axis=1), np.nan)
+            valley[bi:bi + bh, bj:bj + bw] = np.where(has, np.fmin.reduce(np.fmin.reduce(blocks, axis=3), axis=1), np.nan)
+
+    if heights is not None:
+        heights.flush()
+    return ZMapResult(
+        bounds=(x0, y0, x1, y1),
+        cell=cell,
+        shape=(ny, nx),
+        block=block,
+        peak=peak,
+        valley=valley,
+        cut_cells=cut_cells,
+        min_residual=r_min if cut_cells else math.nan,
+        max_residual=r_max if cut_cells else math.nan,
+        mean_residual=total / cut_cells if cut_cells else math.nan,
+        histogram=histogram,
+    )
+
+
+def simulate_program(lines, cutter, **kwargs):
+    """解析 G 代碼後模擬（參數同 simulate）"""
+    return simulate(parse_gcode(lines), cutter, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Z-map 切削模擬：殘留高度與預留量檢查')
+    parser.add_argument('path', help='NC 檔')
+    parser.add_argument('--dia', type=float, required=True, help='刀具直徑')
+    parser.add_argument('--flat', action='store_true', help='平底刀（預設為球刀）')
+    parser.add_argument('--cell', type=float, default=0.01, help='格距 mm')
+    parser.add_argument('--top', type=float, default=0.0, help='毛坯頂面 Z')
+    parser.add_argument('--target', type=float, default=0.0, help='目標曲面 Z（平面）')
+    parser.add_argument('--material', help='材料（與 --type 一起指定時檢查預留量）')
+    parser.add_argument('--type', help='加工類型，例如 曲面')
+    parser.add_argument('--stage', choices=list(STAGES), default='粗加工')
+    parser.add_argument('--heights', help='將完整高度場寫入 .npy（memmap）')
+    args = parser.parse_args(argv)
+    try:
+        result = simulate(parse_file(args.path), Cutter(args.dia, ball=not args.flat), cell=args.cell,
+                          top=args.top, target=args.target, out=args.heights)
+        print(result.report())
+        if args.material and args.type:
+            print(check_allowance(result, args.material, args.type, args.stage).report())
+    except InputError as e:
+        parser.error(e.message)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,14 @@ CNC加工工具包 v2.9 - 手機版 (Kivy) - Google Colab 兼容版
 import os
 import sys
 import math
+import time
+import threading
 from os import environ
 from functools import partial
 
+# 啟動計時起點（用於回報首個可互動畫面的時間）
+_START_TIME = time.perf_counter()
+
 # 必須在導入 Kivy 之前設置環境變量
 environ['KIVY_NO_CONSOLELOG'] = '1'  # 關閉控制台日誌
 environ['KIVY_NO_FILELOG'] = '1'     # 關閉文件日誌
@@ -38,55 +43,52 @@ from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.core.text import LabelBase
-from kivy.properties import StringProperty, ListProperty, NumericProperty
+from kivy.properties import StringProperty, ListProperty, NumericProperty, BooleanProperty
 from kivy.clock import Clock, mainthread
 from kivy.graphics import Color, Rectangle
 
-# 檢查系統平台並設置字體
-if sys.platform == 'win32':
-    # Windows 系統字體
-    font_paths = [
-        "C:/Windows/Fonts/msjh.ttc",           # 微軟正黑體
-        "C:/Windows/Fonts/msyh.ttc",           # 微軟雅黑
-        "C:/Windows/Fonts/simhei.ttf",         # 黑體
-        "C:/Windows/Fonts/simsun.ttc",         # 新宋體
-    ]
-elif sys.platform == 'darwin':
-    # macOS/iOS 系統字體
-    font_paths = [
-        "/System/Library/Fonts/PingFang.ttc",
-        "/System/Library/Fonts/STHeiti Light.ttc",
-        "/System/Library/Fonts/STHeiti Medium.ttc",
-        "/Library/Fonts/Arial Unicode.ttf",
-    ]
-else:
-    # Linux 和其他系統（包括 Colab）
-    font_paths = [
-        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ]
+from cnc_core import (
+    InputError, MATERIAL_PARAMS, ALLOWANCE_DATA, REFERENCE_STEP_DATA, MACHINE_PROFILES, DEFAULT_MACHINE,
+    ToolInput, BallMillInput, BallMillInverseInput, BallMillGridInput,
+    HelicalInput, CuttingInput, AllowanceInput, evaluate,
+    reference_step, min_hole_diameter, safety_assessment,
+)
+from cnc_core.fonts import resolve_font, preload_font, subset_font_path
 
-# 註冊中文字體
-font_loaded = False
-for font_path in font_paths:
-    if os.path.exists(font_path):
+def register_chinese_font(font_path):
+    """註冊中文字體，返回 ChineseFont 實際使用的字體路徑
+    
+    ChineseFont 優先使用建置時產生的子集字體（介面固定文字），
+    ChineseFontFull 為完整系統字體，供使用者輸入等自由文字使用；
+    兩者都找不到時改用默認字體
+    """
+    if font_path:
         try:
-            LabelBase.register(name='ChineseFont', fn_regular=font_path)
-            print(f"已載入字體: {font_path}")
-            font_loaded = True
-            break
+            LabelBase.register(name='ChineseFontFull', fn_regular=font_path)
         except Exception as e:
             print(f"字體載入錯誤 {font_path}: {e}")
-
-if not font_loaded:
+            font_path = None
+    
+    for path in (subset_font_path(), font_path):
+        if not path:
+            continue
+        try:
+            LabelBase.register(name='ChineseFont', fn_regular=path)
+            print(f"已載入字體: {path}")
+            if not font_path:
+                LabelBase.register(name='ChineseFontFull', fn_regular=path)
+            return path
+        except Exception as e:
+            print(f"字體載入錯誤 {path}: {e}")
+    
     # 如果找不到中文字體，使用默認字體
     print("警告：找不到中文字體，將使用默認字體")
     try:
         LabelBase.register(name='ChineseFont', fn_regular='Roboto')
+        LabelBase.register(name='ChineseFontFull', fn_regular='Roboto')
     except:
         print("使用 Kivy 默認字體")
+    return None
 
 class ValidatedTextInput(TextInput):
     """帶驗證的文本輸入框"""
@@ -178,6 +180,112 @@ class CustomButton(Button):
                                     original_color[2] / 0.8, 
                                     original_color[3])
 
+class LazyScreenManager(ScreenManager):
+    """延遲建立屏幕的屏幕管理器：屏幕在首次進入時才建立"""
+    # 即時計算模式，計算器屏幕進入時讀取
+    live_calc = BooleanProperty(False)
+    
+    def __init__(self, screen_classes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.screen_classes = dict(screen_classes or {})
+        self._prewarm_queue = []
+    
+    def get_or_create(self, name):
+        """取得屏幕，尚未建立時才建立"""
+        if not self.has_screen(name):
+            self.add_widget(self.screen_classes[name](name=name))
+        return self.get_screen(name)
+    
+    def show(self, name):
+        """切換到指定屏幕（必要時先建立）"""
+        self.get_or_create(name)
+        self.current = name
+    
+    def prewarm(self, delay=0.5):
+        """在閒置幀中逐一預先建立尚未建立的屏幕，每幀最多一個"""
+        self._prewarm_queue = [n for n in self.screen_classes if not self.has_screen(n)]
+        if self._prewarm_queue:
+            Clock.schedule_once(self._prewarm_next, delay)
+    
+    def _prewarm_next(self, dt):
+        while self._prewarm_queue:
+            name = self._prewarm_queue.pop(0)
+            if not self.has_screen(name):
+                self.get_or_create(name)
+                break
+        if self._prewarm_queue:
+            Clock.schedule_once(self._prewarm_next, 0)
+
+def normalize_input(text):
+    """正規化輸入文字：數值統一轉為 float（'10' 與 '10.0' 視為相同）"""
+    text = text.strip()
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+class LiveCalcMixin:
+    """計算器屏幕共用：合併重複的計算請求，輸入未改變時跳過計算
+    
+    計算按鈕經由觸發器呼叫，同一幀內的多次點擊只計算一次；
+    開啟即時計算後，輸入改變時延遲 LIVE_DELAY 秒自動重新計算
+    """
+    LIVE_DELAY = 0.15  # 秒，連續輸入期間只在停頓後計算一次
+    
+    def init_live_calc(self, inputs, callback):
+        """inputs 為會觸發即時計算的輸入元件，callback 為實際計算方法"""
+        self._live_inputs = inputs
+        self._live_callback = callback
+        self._live_bound = False
+        self._last_key = None
+        self.calc_trigger = Clock.create_trigger(self._calculate_if_changed, 0)
+        self._live_trigger = Clock.create_trigger(self._calculate_if_changed, self.LIVE_DELAY)
+    
+    def input_key(self):
+        """正規化的輸入元組；預設為各即時計算輸入元件的文字，輸入以外的狀態由計算器覆寫加入"""
+        return tuple(normalize_input(w.text) for w in self._live_inputs)
+    
+    def set_live_calc(self, enabled):
+        """開啟/關閉即時計算"""
+        if enabled == self._live_bound:
+            return
+        for widget in self._live_inputs:
+            if enabled:
+                widget.bind(text=self._on_input_changed)
+            else:
+                widget.unbind(text=self._on_input_changed)
+        self._live_bound = enabled
+        if enabled:
+            self._live_trigger()
+    
+    def invalidate_live_calc(self):
+        """結果已被清除，下次必須重新計算"""
+        self._last_key = None
+    
+    def on_enter(self, *args):
+        self.set_live_calc(getattr(self.manager, 'live_calc', False))
+    
+    def _on_input_changed(self, instance, value):
+        self._live_trigger()
+    
+    def _calculate_if_changed(self, dt):
+        key = self.input_key()
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self._live_callback(dt)
+
+class SplashScreen(Screen):
+    """啟動畫面：字體載入完成前顯示，只使用 Kivy 默認字體"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.add_widget(Label(
+            text='CNC Toolkit v2.9\nERREPI TAIWAN\n\nLoading...',
+            font_size='20sp',
+            halign='center',
+            color=(0.1, 0.4, 0.8, 1)
+        ))
+
 class MainScreen(Screen):
     """主屏幕"""
     def __init__(self, **kwargs):
@@ -230,6 +338,16 @@ class MainScreen(Screen):
             btn.bind(on_press=callback)
             main_layout.add_widget(btn)
         
+        # 即時計算開關
+        self.live_btn = CustomButton(
+            text='即時計算: 關',
+            size_hint_y=0.08,
+            background_color=(0.5, 0.5, 0.5, 1),
+            font_size='14sp',
+        )
+        self.live_btn.bind(on_press=self.toggle_live_calc)
+        main_layout.add_widget(self.live_btn)
+        
         # 信息標籤
         info_text = """本工具包含5大計算功能：
 • 刀具伸長優化計算
@@ -246,7 +364,7 @@ class MainScreen(Screen):
         info_label = Label(
             text=info_text,
             font_size='12sp',
-            size_hint_y=0.35,
+            size_hint_y=0.27,
             halign='left',
             valign='top',
             font_name='ChineseFont'
@@ -256,22 +374,27 @@ class MainScreen(Screen):
         
         self.add_widget(main_layout)
     
+    def toggle_live_calc(self, instance):
+        """切換即時計算：輸入改變時自動重新計算"""
+        self.manager.live_calc = not self.manager.live_calc
+        self.live_btn.text = '即時計算: 開' if self.manager.live_calc else '即時計算: 關'
+    
     def open_tool_calc(self, instance):
-        self.manager.current = 'tool_calc'
+        self.manager.show('tool_calc')
     
     def open_ballmill_calc(self, instance):
-        self.manager.current = 'ballmill_calc'
+        self.manager.show('ballmill_calc')
     
     def open_helical_calc(self, instance):
-        self.manager.current = 'helical_calc'
+        self.manager.show('helical_calc')
     
     def open_cutting_calc(self, instance):
-        self.manager.current = 'cutting_calc'
+        self.manager.show('cutting_calc')
     
     def open_stock_calc(self, instance):
-        self.manager.current = 'stock_calc'
+        self.manager.show('stock_calc')
 
-class ToolCalculator(Screen):
+class ToolCalculator(LiveCalcMixin, Screen):
     """刀具伸長計算器"""
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -322,6 +445,17 @@ class ToolCalculator(Screen):
         )
         input_layout.add_widget(self.material_spinner)
         
+        # 工件材料決定切削力的比切削力 kc（與切削條件計算器相同的材料表）
+        input_layout.add_widget(Label(text='工件材料:', font_size='16sp', font_name='ChineseFont'))
+        self.workpiece_spinner = ChineseSpinner(
+            text='碳鋼',
+            values=list(MATERIAL_PARAMS),
+            font_size='16sp',
+            size_hint_y=None,
+            height=dp(40)
+        )
+        input_layout.add_widget(self.workpiece_spinner)
+        
         input_layout.add_widget(Label(text='主軸轉速 (RPM):', font_size='16sp', font_name='ChineseFont'))
         self.speed_input = ValidatedTextInput(text='3000', multiline=False, font_size='16sp')
         input_layout.add_widget(self.speed_input)
@@ -344,7 +478,7 @@ class ToolCalculator(Screen):
             font_size='18sp',
             bold=True,
         )
-        calc_btn.bind(on_press=lambda x: Clock.schedule_once(self.calculate, 0))
+        calc_btn.bind(on_press=lambda x: self.calc_trigger())
         main_layout.add_widget(calc_btn)
         
         # 結果顯示
@@ -360,6 +494,11 @@ class ToolCalculator(Screen):
         main_layout.add_widget(self.result_label)
         
         self.add_widget(main_layout)
+        
+        self.init_live_calc(
+            [self.diameter_input, self.material_spinner, self.workpiece_spinner, self.speed_input,
+             self.feed_input, self.depth_input],
+            self.calculate)
     
     def go_back(self, instance):
         self.manager.current = 'main'
@@ -375,54 +514,32 @@ class ToolCalculator(Screen):
                 self.result_label.text = "錯誤：請輸入有效的正數"
                 return
                 
-            diameter = float(self.diameter_input.text)
-            speed = float(self.speed_input.text)
-            feed = float(self.feed_input.text)
-            depth = float(self.depth_input.text)
-            
-            # 檢查深度合理性
-            if depth > diameter * 2:
-                self.result_label.text = f"警告：切削深度({depth}mm)可能過大\n建議不超過刀具直徑的2倍"
-                return
-            
-            material_factor = {"碳化鎢": 1.0, "高速鋼": 0.7, "陶瓷": 1.3}
-            factor = material_factor.get(self.material_spinner.text, 1.0)
-            
-            # 計算最佳伸長
-            optimal_length = diameter * 3 * factor * (1 - depth/10)
-            optimal_length = max(diameter * 1.5, min(diameter * 5, optimal_length))  # 限制範圍
-            
-            result_text = f"""計算結果：
-刀具直徑: {diameter} mm
-最佳伸長: {optimal_length:.1f} mm
-L/D比值: {optimal_length/diameter:.2f}
-建議轉速: {int(speed * 0.9)} RPM
-建議進給: {int(feed * 0.8)} mm/min
-
-加工建議：
-• 確保刀具夾持牢固
-• 首次使用建議試切削
-• 根據實際情況微調參數
-• L/D比值應在1.5-5之間"""
-            
-            self.result_label.text = result_text
+            texts = evaluate(ToolInput(
+                diameter=float(self.diameter_input.text),
+                material=self.material_spinner.text,
+                speed=float(self.speed_input.text),
+                feed=float(self.feed_input.text),
+                depth=float(self.depth_input.text),
+                workpiece=self.workpiece_spinner.text,
+            )).texts
+            self.result_label.text = texts['report']
             
+        except InputError as e:
+            self.result_label.text = e.message
         except ValueError:
             self.result_label.text = "請輸入有效的數字"
         except Exception as e:
             self.result_label.text = f'計算錯誤: {str(e)}'
 
-class BallMillCalculator(Screen):
+class BallMillCalculator(LiveCalcMixin, Screen):
     """球刀步距計算器"""
+    GRID_STEPS = 200  # 網格掃描的步距取樣數
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
         # 參考步距對照表
-        self.reference_step_data = {
-            16: 0.40, 12: 0.35, 10: 0.32, 8: 0.28,
-            6: 0.24, 5: 0.20, 4: 0.20, 3: 0.17,
-            2: 0.14, 1.5: 0.12, 1: 0.10
-        }
+        self.reference_step_data = REFERENCE_STEP_DATA
         
         # 主佈局
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=20)
@@ -454,10 +571,23 @@ class BallMillCalculator(Screen):
         main_layout.add_widget(header_layout)
         
         # 輸入區域
-        input_container = BoxLayout(orientation='vertical', spacing=15, size_hint_y=0.3)
+        input_container = BoxLayout(orientation='vertical', spacing=15, size_hint_y=0.38)
+        
+        # 計算模式行
+        mode_row = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=0.25)
+        mode_row.add_widget(Label(text='計算模式:', font_size='16sp', font_name='ChineseFont'))
+        self.mode_spinner = ChineseSpinner(
+            text='單點計算',
+            values=['單點計算', '網格掃描', '反算步距'],
+            font_size='16sp',
+            size_hint=(0.7, 1)
+        )
+        self.mode_spinner.bind(text=self.on_mode_changed)
+        mode_row.add_widget(self.mode_spinner)
+        input_container.add_widget(mode_row)
         
         # 球刀直徑輸入行
-        diameter_row = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=0.5)
+        diameter_row = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=0.35)
         diameter_row.add_widget(Label(text='球刀直徑 (mm):', font_size='16sp', font_name='ChineseFont'))
         self.diameter_input = ValidatedTextInput(
             text='6', 
@@ -470,11 +600,12 @@ class BallMillCalculator(Screen):
         input_container.add_widget(diameter_row)
         
         # 步距輸入行
-        step_row = BoxLayout(orientation='vertical', spacing=5, size_hint_y=0.5)
+        step_row = BoxLayout(orientation='vertical', spacing=5, size_hint_y=0.4)
         
         # 步距標籤和輸入框
         step_input_row = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=0.6)
-        step_input_row.add_widget(Label(text='步距 (mm):', font_size='16sp', font_name='ChineseFont'))
+        self.step_label = Label(text='步距 (mm):', font_size='16sp', font_name='ChineseFont')
+        step_input_row.add_widget(self.step_label)
         self.step_input = ValidatedTextInput(
             text='0.3', 
             multiline=False, 
@@ -509,7 +640,7 @@ class BallMillCalculator(Screen):
             font_size='18sp',
             bold=True,
         )
-        calc_btn.bind(on_press=lambda x: Clock.schedule_once(self.calculate, 0))
+        calc_btn.bind(on_press=lambda x: self.calc_trigger())
         main_layout.add_widget(calc_btn)
         
         # 結果顯示
@@ -527,7 +658,7 @@ class BallMillCalculator(Screen):
         self.detail_label = Label(
             text='詳細結果將顯示在這裡',
             font_size='14sp',
-            size_hint_y=0.4,
+            size_hint_y=0.32,
             halign='left',
             valign='top',
             font_name='ChineseFont'
@@ -539,22 +670,20 @@ class BallMillCalculator(Screen):
         self.update_reference_step(None, self.diameter_input.text)
         
         self.add_widget(main_layout)
+        
+        self.init_live_calc([self.diameter_input, self.step_input], self.calculate)
     
     def go_back(self, instance):
         self.manager.current = 'main'
     
+    def input_key(self):
+        return (self.mode_spinner.text,
+                normalize_input(self.diameter_input.text),
+                normalize_input(self.step_input.text))
+    
     def get_reference_step(self, diameter):
         """根據直徑獲取參考步距"""
-        try:
-            diameter_val = float(diameter)
-            if diameter_val in self.reference_step_data:
-                return self.reference_step_data[diameter_val]
-            
-            standard_diameters = sorted(self.reference_step_data.keys())
-            closest_diameter = min(standard_diameters, key=lambda x: abs(x - diameter_val))
-            return self.reference_step_data[closest_diameter]
-        except:
-            return None
+        return reference_step(diameter)
     
     def update_reference_step(self, instance, value):
         """更新標準參考步距顯示"""
@@ -571,7 +700,26 @@ class BallMillCalculator(Screen):
         except:
             self.reference_step_label.text = '標準參考步距: -- mm'
     
+    def on_mode_changed(self, instance, value):
+        """切換計算模式時更新步距欄位"""
+        if value == '反算步距':
+            self.step_label.text = '目標殘餘高度 (μm):'
+            self.step_input.text = '10'
+        else:
+            self.step_label.text = '步距 (mm):'
+            self.step_input.text = '0.3'
+        self.result_label.text = '殘餘高度: --'
+        self.detail_label.text = '詳細結果將顯示在這裡'
+        self.invalidate_live_calc()
+    
     def calculate(self, dt):
+        if self.mode_spinner.text == '網格掃描':
+            self.calculate_grid()
+            return
+        if self.mode_spinner.text == '反算步距':
+            self.calculate_inverse()
+            return
+            
         try:
             # 獲取輸入值
             D_text = self.diameter_input.text.strip()
@@ -581,78 +729,70 @@ class BallMillCalculator(Screen):
                 self.result_label.text = "錯誤：請輸入數值"
                 return
                 
-            D = float(D_text)
-            P = float(P_text)
+            texts = evaluate(BallMillInput(float(D_text), float(P_text))).texts
             
-            # 輸入驗證
-            if D <= 0:
-                self.result_label.text = "錯誤：直徑必須大於0"
-                self.detail_label.text = "請輸入大於0的刀具直徑"
-                return
-                
-            if P <= 0:
-                self.result_label.text = "錯誤：步距必須大於0"
-                self.detail_label.text = "請輸入大於0的步距值"
-                return
+            # 顯示結果
+            self.result_label.text = texts['summary']
+            self.detail_label.text = texts['report']
                 
-            if P >= D:
-                self.result_label.text = "錯誤：步距必須小於直徑"
-                self.detail_label.text = f"步距({P}mm)必須小於刀具直徑({D}mm)"
+        except InputError as e:
+            self.result_label.text = e.message
+            self.detail_label.text = e.detail
+        except ValueError:
+            self.result_label.text = "輸入錯誤"
+            self.detail_label.text = "請輸入有效的數字（如：6.0, 0.3）"
+        except Exception as e:
+            self.result_label.text = "計算錯誤"
+            self.detail_label.text = f"錯誤: {str(e)}"
+    
+    def calculate_grid(self):
+        """網格掃描：參考表全部直徑 × 0.01mm 至設定步距"""
+        try:
+            P_text = self.step_input.text.strip()
+            if not P_text:
+                self.result_label.text = "錯誤：請輸入數值"
                 return
             
-            R = D / 2
+            # NumPy 在計算時才延遲導入，避免拖慢啟動
+            texts = evaluate(BallMillGridInput(float(P_text), self.GRID_STEPS)).texts
+            self.result_label.text = texts['summary']
+            self.detail_label.text = texts['report']
             
-            # 修正浮點精度問題
-            if P/2 >= R:
-                h = R  # 步距過大，殘餘高度等於半徑
-                self.result_label.text = "警告：步距過大"
-            else:
-                # 使用 max(0, ...) 避免負數
-                radicand = max(0, R**2 - (P/2)**2)
-                h = R - math.sqrt(radicand)
-            
-            # 計算參考值
-            P_ref = self.get_reference_step(D)
-            if P_ref is not None and 0 < P_ref < D:
-                radicand_ref = max(0, R**2 - (P_ref/2)**2)
-                h_ref = R - math.sqrt(radicand_ref)
-            else:
-                h_ref = 0.0
-                P_ref = 0.0
-            
-            # 顯示結果
-            self.result_label.text = f"殘餘高度: {h*1000:.2f} μm"
+        except InputError as e:
+            self.result_label.text = e.message
+            self.detail_label.text = e.detail
+        except ValueError:
+            self.result_label.text = "輸入錯誤"
+            self.detail_label.text = "請輸入有效的數字（如：6.0, 0.3）"
+        except Exception as e:
+            self.result_label.text = "計算錯誤"
+            self.detail_label.text = f"錯誤: {str(e)}"
+
+    def calculate_inverse(self):
+        """由目標殘餘高度反算最大步距"""
+        try:
+            D_text = self.diameter_input.text.strip()
+            h_text = self.step_input.text.strip()
             
-            # 評估質量
-            quality = "優良" if h*1000 < 10 else "良好" if h*1000 < 20 else "一般" if h*1000 < 30 else "較差"
-            quality_color = (0, 0.7, 0, 1) if h*1000 < 10 else (0.2, 0.5, 0.2, 1) if h*1000 < 20 else (1, 0.6, 0, 1) if h*1000 < 30 else (1, 0, 0, 1)
+            if not D_text or not h_text:
+                self.result_label.text = "錯誤：請輸入數值"
+                return
             
-            detail_text = f"""球刀直徑: {D} mm
-球刀半徑: {R} mm
-設定步距: {P} mm
-殘餘高度: {h:.6f} mm ({h*1000:.2f} μm)
-表面質量: {quality}
-
-標準參考步距: {P_ref} mm
-參考殘餘高度: {h_ref:.6f} mm ({h_ref*1000:.2f} μm)
-差值: {abs(h - h_ref):.6f} mm ({abs(h - h_ref)*1000:.2f} μm)
-
-建議：
-• 殘餘高度 < 10μm：精加工
-• 殘餘高度 10-20μm：半精加工
-• 殘餘高度 20-30μm：粗加工
-• 殘餘高度 > 30μm：表面粗糙，建議減小步距"""
+            texts = evaluate(BallMillInverseInput(float(D_text), float(h_text) / 1000)).texts
+            self.result_label.text = texts['summary']
+            self.detail_label.text = texts['report']
             
-            self.detail_label.text = detail_text
-                
+        except InputError as e:
+            self.result_label.text = e.message
+            self.detail_label.text = e.detail
         except ValueError:
             self.result_label.text = "輸入錯誤"
-            self.detail_label.text = "請輸入有效的數字（如：6.0, 0.3）"
+            self.detail_label.text = "請輸入有效的數字（如：6.0, 10）"
         except Exception as e:
             self.result_label.text = "計算錯誤"
             self.detail_label.text = f"錯誤: {str(e)}"
 
-class HelicalCalculator(Screen):
+class HelicalCalculator(LiveCalcMixin, Screen):
     """螺旋銑削計算器"""
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -807,7 +947,7 @@ class HelicalCalculator(Screen):
             font_size='16sp',
             bold=True,
         )
-        calc_btn.bind(on_press=lambda x: Clock.schedule_once(self.calculate, 0))
+        calc_btn.bind(on_press=lambda x: self.calc_trigger())
         content_layout.add_widget(calc_btn)
         
         # 結果顯示區域
@@ -875,7 +1015,7 @@ class HelicalCalculator(Screen):
             text='請輸入參數後點擊計算按鈕',
             font_size='12sp',
             size_hint_y=None,
-            height=dp(120),
+            height=dp(220),
             halign='left',
             valign='top',
             font_name='ChineseFont'
@@ -921,7 +1061,7 @@ class HelicalCalculator(Screen):
             font_size='14sp',
             bold=True,
         )
-        calc_btn_bottom.bind(on_press=lambda x: Clock.schedule_once(self.calculate, 0))
+        calc_btn_bottom.bind(on_press=lambda x: self.calc_trigger())
         main_layout.add_widget(calc_btn_bottom)
         
         self.add_widget(main_layout)
@@ -929,10 +1069,21 @@ class HelicalCalculator(Screen):
         # 初始化介面
         self.on_milling_type_changed(None, '內徑螺旋銑')
         self.update_min_hole_diameter(None, self.tool_dia_input.text)
+        
+        self.init_live_calc(
+            [self.tool_dia_input, self.depth_input, self.dynamic_input1, self.dynamic_input2],
+            self.calculate)
     
     def go_back(self, instance):
         self.manager.current = 'main'
     
+    def input_key(self):
+        return (self.current_milling_type,
+                normalize_input(self.tool_dia_input.text),
+                normalize_input(self.depth_input.text),
+                normalize_input(self.dynamic_input1.text),
+                normalize_input(self.dynamic_input2.text))
+    
     def update_min_hole_diameter(self, instance, value):
         """更新最小加工孔徑顯示"""
         try:
@@ -1017,11 +1168,11 @@ class HelicalCalculator(Screen):
         self.suggestion_label.text = ''
         self.calc_process_label.text = '請輸入參數後點擊計算按鈕'
         self.warning_label.text = ''
+        self.invalidate_live_calc()
     
     def calculate_min_hole_diameter(self, tool_dia):
         """計算最小加工孔徑"""
-        # 經驗公式：最小孔徑 = 刀具直徑 × 1.2
-        return tool_dia * 1.2
+        return min_hole_diameter(tool_dia)
     
     def calculate(self, dt):
         """計算斜坡角度（異步執行）"""
@@ -1037,171 +1188,52 @@ class HelicalCalculator(Screen):
                 self.warning_label.text = '錯誤：請輸入刀具直徑和切削深度'
                 return
                 
-            tool_dia = float(tool_dia_text)
-            depth = float(depth_text)
             milling_type = self.current_milling_type
-            
-            # 檢查輸入有效性
-            if tool_dia <= 0:
-                self.warning_label.text = '錯誤：刀具直徑必須大於0'
-                return
-                
-            if depth <= 0:
-                self.warning_label.text = '錯誤：切削深度必須大於0'
-                return
+            dim1_text = self.dynamic_input1.text.strip()
+            dim2 = None
             
             if milling_type == '內徑螺旋銑':
-                hole_dia_text = self.dynamic_input1.text.strip()
-                if not hole_dia_text:
+                if not dim1_text:
                     self.warning_label.text = '錯誤：請輸入孔徑'
                     return
-                    
-                hole_dia = float(hole_dia_text)
-                
-                # 計算最小加工孔徑
-                min_hole_dia = self.calculate_min_hole_diameter(tool_dia)
-                
-                # 檢查孔徑合理性
-                if hole_dia <= tool_dia:
-                    self.warning_label.text = f'錯誤：孔徑必須大於刀具直徑 ({tool_dia}mm)'
-                    return
-                
-                # 檢查是否小於最小建議孔徑
-                if hole_dia < min_hole_dia:
-                    self.warning_label.text = f'警告：孔徑小於最小建議值 {min_hole_dia:.1f}mm'
-                else:
-                    self.warning_label.text = ''
-                
-                # 計算ΔR (半徑總變化量)
-                ΔR = (hole_dia - tool_dia) / 2
-                
-                # 計算斜坡角度 φ = arctan(d/ΔR)
-                if ΔR > 0:
-                    φ_rad = math.atan(depth / ΔR)
-                    φ_deg = math.degrees(φ_rad)
-                else:
-                    self.warning_label.text = '計算錯誤：ΔR必須大於0'
-                    return
-                
-                # 計算過程
-                calc_process = f"""內徑螺旋銑計算過程：
-1. 刀具直徑 Dc = {tool_dia} mm
-2. 孔徑 Dm = {hole_dia} mm
-3. 半徑變化量 ΔR = (Dm - Dc)/2 = ({hole_dia} - {tool_dia})/2 = {ΔR:.2f} mm
-4. 總切削深度 d = {depth} mm
-5. 斜坡角度 φ = arctan(d/ΔR) = arctan({depth}/{ΔR:.2f}) = {φ_deg:.2f}°
-6. 最小加工孔徑建議值 = Dc × 1.2 = {tool_dia} × 1.2 = {min_hole_dia:.1f} mm
-
-加工建議：
-- 刀具從孔中心開始螺旋運動
-- 適合孔徑大於刀具直徑1.2倍的情況
-- 常用角度範圍：15°-45°
-- 當前孔徑與刀具直徑比值：{hole_dia/tool_dia:.2f}"""
-                
-                # 詳細結果顯示
-                self.detail_result_label.text = f'ΔR: {ΔR:.2f}mm | 孔徑比: {hole_dia/tool_dia:.2f}'
-                
             elif milling_type == '外徑螺旋銑':
-                boss_dia_text = self.dynamic_input1.text.strip()
                 width_text = self.dynamic_input2.text.strip()
-                
-                if not boss_dia_text or not width_text:
+                if not dim1_text or not width_text:
                     self.warning_label.text = '錯誤：請輸入凸台直徑和切削寬度'
                     return
-                    
-                boss_dia = float(boss_dia_text)
-                width = float(width_text)
-                
-                # 檢查輸入合理性
-                if width <= 0:
-                    self.warning_label.text = '錯誤：切削寬度必須大於0'
-                    return
-                
-                # 計算斜坡角度 φ = arctan(d/W)
-                ΔR = width
-                φ_rad = math.atan(depth / ΔR)
-                φ_deg = math.degrees(φ_rad)
-                
-                # 切削寬度W的建議值範圍
-                w_min = tool_dia * 0.5
-                w_max = tool_dia * 0.8
-                
-                if width < w_min:
-                    self.warning_label.text = f'警告：切削寬度小於建議最小值 {w_min:.1f}mm'
-                elif width > w_max:
-                    self.warning_label.text = f'警告：切削寬度大於建議最大值 {w_max:.1f}mm'
-                else:
-                    self.warning_label.text = ''
-                
-                # 計算過程
-                calc_process = f"""外徑螺旋銑計算過程：
-1. 刀具直徑 Dc = {tool_dia} mm
-2. 凸台直徑 Dm = {boss_dia} mm
-3. 切削寬度 W = {width} mm
-4. 總切削深度 d = {depth} mm
-5. 斜坡角度 φ = arctan(d/W) = arctan({depth}/{width}) = {φ_deg:.2f}°
-
-重要說明：
-• 斜坡角度φ只與深度d和切削寬度W有關，與刀具直徑無關
-• 刀具直徑Dc會影響W的建議值範圍
-• W建議範圍：刀具直徑的50%-80% ({w_min:.1f}mm - {w_max:.1f}mm)
-
-加工建議：
-- 刀具從凸台外側開始螺旋向內
-- 切削寬度W建議為刀具直徑的50-80%
-- 適合凸台外部輪廓加工"""
-                
-                # 詳細結果顯示
-                self.detail_result_label.text = f'W: {width}mm | φ只與d/W有關'
-                
+                dim2 = float(width_text)
             else:  # 爬坡銑
-                length_text = self.dynamic_input1.text.strip()
-                if not length_text:
+                if not dim1_text:
                     self.warning_label.text = '錯誤：請輸入斜坡長度'
                     return
-                    
-                length = float(length_text)
-                
-                # 檢查長度合理性
-                if length <= 0:
-                    self.warning_label.text = '錯誤：斜坡長度必須大於0'
-                    return
-                
-                # 計算斜坡角度 φ = arctan(d/L)
-                φ_rad = math.atan(depth / length)
-                φ_deg = math.degrees(φ_rad)
-                
-                # 計算實際斜坡長度
-                actual_length = math.sqrt(length**2 + depth**2)
-                
-                # 計算過程
-                calc_process = f"""爬坡銑計算過程：
-1. 斜坡長度 L = {length} mm
-2. 總切削深度 d = {depth} mm
-3. 斜坡角度 φ = arctan(d/L) = arctan({depth}/{length}) = {φ_deg:.2f}°
-4. 實際斜坡長度 = √(L² + d²) = √({length}² + {depth}²) = {actual_length:.2f} mm
-
-加工建議：
-- 刀具沿斜線切入材料
-- 常用於型腔初始切入或窄槽加工
-- 常用角度範圍：5°-15°"""
-                
-                # 詳細結果顯示
-                self.detail_result_label.text = f'斜坡長度: {length}mm | 實際長度: {actual_length:.2f}mm'
+            
+            inp = HelicalInput(
+                milling_type=milling_type,
+                tool_dia=float(tool_dia_text),
+                depth=float(depth_text),
+                dim1=float(dim1_text),
+                dim2=dim2,
+            )
+            evaluation = evaluate(inp)
+            texts = evaluation.texts
             
             # 更新顯示結果
-            self.angle_result_label.text = f'斜坡角度 φ = {φ_deg:.2f}°'
+            self.warning_label.text = texts['warning']
+            self.detail_result_label.text = texts['detail']
+            self.angle_result_label.text = texts['angle']
             
             # 安全評估
-            safety_text, safety_color, suggestion = self.get_safety_assessment(milling_type, φ_deg)
-            
-            self.safety_result_label.text = f'安全評估: {safety_text}'
-            self.safety_result_label.color = safety_color
-            self.suggestion_label.text = suggestion
+            self.safety_result_label.text = texts['safety']
+            self.safety_result_label.color = evaluation.result.safety_color
+            self.suggestion_label.text = texts['suggestion']
+            if evaluation.result.safety in ('危險', '極危險'):
+                self.suggestion_label.text += '\n' + self.layer_plan_text(inp)
             
             # 詳細計算過程
-            self.calc_process_label.text = calc_process
+            self.calc_process_label.text = texts['process']
             
+        except InputError as e:
+            self.warning_label.text = e.message
         except ValueError:
             self.calc_process_label.text = '錯誤：請輸入有效的數字'
             self.warning_label.text = '所有輸入必須為數字'
@@ -1209,59 +1241,22 @@ class HelicalCalculator(Screen):
             self.calc_process_label.text = f'計算錯誤：{str(e)}'
             self.warning_label.text = '請檢查輸入參數'
     
+    def layer_plan_text(self, inp):
+        """角度過大時的自動分層建議（首次使用時才載入 NumPy）"""
+        from cnc_core.layers import plan_for
+        return plan_for(inp).summary()
+    
     def get_safety_assessment(self, milling_type, angle_deg):
         """根據銑削類型和角度獲取安全評估"""
-        if milling_type == '內徑螺旋銑':
-            if angle_deg < 5:
-                return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
-            elif angle_deg < 15:
-                return "偏小", (0, 0.5, 1, 1), "建議：角度稍小，可提高效率"
-            elif angle_deg < 30:
-                return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
-            elif angle_deg < 45:
-                return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具負荷"
-            else:
-                return "危險", (1, 0, 0, 1), "建議：角度過大，建議分層加工"
-                
-        elif milling_type == '外徑螺旋銑':
-            if angle_deg < 5:
-                return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
-            elif angle_deg < 15:
-                return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
-            elif angle_deg < 30:
-                return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具側向力"
-            elif angle_deg < 45:
-                return "危險", (1, 0.5, 0, 1), "建議：角度過大，需分層加工"
-            else:
-                return "極危險", (1, 0, 0, 1), "建議：角度過大，不建議使用"
-                
-        else:  # 爬坡銑
-            if angle_deg < 3:
-                return "角度過小", (0.5, 0.5, 1, 1), "建議：角度太小，加工效率低"
-            elif angle_deg < 8:
-                return "安全", (0, 0.8, 0, 1), "建議：角度適中，加工穩定"
-            elif angle_deg < 15:
-                return "注意", (1, 0.5, 0, 1), "建議：角度稍大，注意刀具負荷"
-            elif angle_deg < 20:
-                return "危險", (1, 0.5, 0, 1), "建議：角度過大，建議減小深度"
-            else:
-                return "極危險", (1, 0, 0, 1), "建議：角度過大，不建議使用"
+        return safety_assessment(milling_type, angle_deg)
 
-class CuttingConditionCalculator(Screen):
+class CuttingConditionCalculator(LiveCalcMixin, Screen):
     """切削條件計算器"""
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
         # 材料參數表
-        self.material_params = {
-            "鋁合金": {"vc_range": (500, 1000), "fz_rough": (0.10, 0.30), "fz_finish": (0.05, 0.15)},
-            "不鏽鋼": {"vc_range": (100, 200), "fz_rough": (0.05, 0.20), "fz_finish": (0.03, 0.10)},
-            "模具鋼": {"vc_range": (80, 150), "fz_rough": (0.05, 0.15), "fz_finish": (0.03, 0.10)},
-            "碳鋼": {"vc_range": (150, 300), "fz_rough": (0.10, 0.30), "fz_finish": (0.05, 0.15)},
-            "銅合金": {"vc_range": (150, 250), "fz_rough": (0.10, 0.25), "fz_finish": (0.05, 0.15)},
-            "鈦合金": {"vc_range": (50, 100), "fz_rough": (0.05, 0.15), "fz_finish": (0.03, 0.10)},
-            "塑膠": {"vc_range": (200, 500), "fz_rough": (0.10, 0.30), "fz_finish": (0.05, 0.20)}
-        }
+        self.material_params = MATERIAL_PARAMS
         
         # 主佈局
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=20)
@@ -1298,13 +1293,13 @@ class CuttingConditionCalculator(Screen):
         content_layout.bind(minimum_height=content_layout.setter('height'))
         
         # 輸入區域
-        input_layout = GridLayout(cols=2, spacing=10, size_hint_y=None, height=dp(320))
+        input_layout = GridLayout(cols=2, spacing=10, size_hint_y=None, height=dp(530))
         
         # 材質下拉選單
         input_layout.add_widget(Label(text='材質:', font_size='16sp', size_hint_y=None, height=dp(50), font_name='ChineseFont'))
         self.material_spinner = ChineseSpinner(
             text='鋁合金',
-            values=['鋁合金', '不鏽鋼', '模具鋼', '碳鋼', '銅合金', '鈦合金', '塑膠'],
+            values=list(MATERIAL_PARAMS),
             font_size='16sp',
             size_hint_y=None,
             height=dp(50)
@@ -1354,6 +1349,26 @@ class CuttingConditionCalculator(Screen):
         )
         input_layout.add_widget(self.feed_spinner)
         
+        # 切深/切寬（選填，填入切深時檢查主軸功率與扭力）
+        input_layout.add_widget(Label(text='切深 ap (mm，選填):', font_size='16sp', size_hint_y=None, height=dp(50), font_name='ChineseFont'))
+        self.depth_input = ValidatedTextInput(text='', multiline=False, font_size='16sp', size_hint_y=None, height=dp(50))
+        input_layout.add_widget(self.depth_input)
+        
+        input_layout.add_widget(Label(text='切寬 ae (mm，空白為全槽):', font_size='16sp', size_hint_y=None, height=dp(50), font_name='ChineseFont'))
+        self.width_input = ValidatedTextInput(text='', multiline=False, font_size='16sp', size_hint_y=None, height=dp(50))
+        input_layout.add_widget(self.width_input)
+        
+        # 機台下拉選單
+        input_layout.add_widget(Label(text='機台:', font_size='16sp', size_hint_y=None, height=dp(50), font_name='ChineseFont'))
+        self.machine_spinner = ChineseSpinner(
+            text=DEFAULT_MACHINE.name,
+            values=list(MACHINE_PROFILES),
+            font_size='16sp',
+            size_hint_y=None,
+            height=dp(50)
+        )
+        input_layout.add_widget(self.machine_spinner)
+        
         content_layout.add_widget(input_layout)
         
         # 結果顯示區域
@@ -1395,11 +1410,20 @@ class CuttingConditionCalculator(Screen):
         )
         content_layout.add_widget(self.feed_result)
         
+        self.life_result = Label(
+            text='預估刀具壽命: --',
+            font_size='14sp',
+            size_hint_y=None,
+            height=dp(40),
+            font_name='ChineseFont'
+        )
+        content_layout.add_widget(self.life_result)
+        
         self.detail_result = Label(
             text='詳細計算過程將顯示在這裡',
             font_size='12sp',
             size_hint_y=None,
-            height=dp(300),
+            height=dp(420),
             halign='left',
             valign='top',
             font_name='ChineseFont'
@@ -1419,10 +1443,16 @@ class CuttingConditionCalculator(Screen):
             font_size='18sp',
             bold=True,
         )
-        calc_btn.bind(on_press=lambda x: Clock.schedule_once(self.calculate, 0))
+        calc_btn.bind(on_press=lambda x: self.calc_trigger())
         main_layout.add_widget(calc_btn)
         
         self.add_widget(main_layout)
+        
+        self.init_live_calc(
+            [self.material_spinner, self.tool_dia_input, self.tooth_input,
+             self.machining_spinner, self.vc_spinner, self.feed_spinner,
+             self.depth_input, self.width_input, self.machine_spinner],
+            self.calculate)
     
     def go_back(self, instance):
         self.manager.current = 'main'
@@ -1430,175 +1460,51 @@ class CuttingConditionCalculator(Screen):
     def calculate(self, dt):
         try:
             # 獲取輸入值
-            material = self.material_spinner.text
             tool_dia_text = self.tool_dia_input.text.strip()
             tooth_text = self.tooth_input.text.strip()
             
             if not tool_dia_text or not tooth_text:
                 self.m_result.text = "錯誤: 請輸入刀具直徑和齒數"
                 return
+            depth_text = self.depth_input.text.strip()
+            width_text = self.width_input.text.strip()
                 
-            tool_diameter = float(tool_dia_text)
-            tooth_count = int(tooth_text)
-            machining_type = self.machining_spinner.text
-            vc_condition = self.vc_spinner.text
-            feed_condition = self.feed_spinner.text
-            
-            # 輸入驗證
-            if tool_diameter <= 0:
-                self.m_result.text = "錯誤: 刀具直徑必須大於0"
-                return
-                
-            if tooth_count <= 0:
-                self.m_result.text = "錯誤: 刀具齒數必須大於0"
-                return
-            
-            if material not in self.material_params:
-                self.m_result.text = "錯誤: 未知材料"
-                return
-            
-            params = self.material_params[material]
-            vc_min, vc_max = params["vc_range"]
-            
-            # 根據VC條件選擇VC值
-            if vc_condition == "高":
-                vc = vc_max
-            elif vc_condition == "中":
-                vc = (vc_min + vc_max) / 2
-            else:  # 低
-                vc = vc_min
-            
-            # 根據加工類型選擇fz範圍
-            if machining_type == "粗加工":
-                fz_min, fz_max = params["fz_rough"]
-            else:  # 精加工
-                fz_min, fz_max = params["fz_finish"]
-            
-            # 根據切削速度條件選擇fz值
-            if feed_condition == "高":
-                fz = fz_max
-            elif feed_condition == "中":
-                fz = (fz_min + fz_max) / 2
-            else:  # 低
-                fz = fz_min
-            
-            # 計算主軸轉速 M = (VC * 1000) / (π * D)
-            m = (vc * 1000) / (math.pi * tool_diameter)
-            
-            # 限制轉速範圍（安全考慮）
-            m = max(100, min(20000, m))  # 限制在100-20000 RPM之間
-            
-            # 計算進給速度 F = M * N * fz
-            f = m * tooth_count * fz
-            
-            # 限制進給速度（安全考慮）
-            f = max(10, min(5000, f))  # 限制在10-5000 mm/min之間
+            texts = evaluate(CuttingInput(
+                material=self.material_spinner.text,
+                tool_diameter=float(tool_dia_text),
+                tooth_count=int(tooth_text),
+                machining_type=self.machining_spinner.text,
+                vc_condition=self.vc_spinner.text,
+                feed_condition=self.feed_spinner.text,
+                depth=float(depth_text) if depth_text else None,
+                width=float(width_text) if width_text else None,
+                machine=self.machine_spinner.text,
+            )).texts
             
             # 更新結果
-            self.vc_result.text = f"切削速度 VC: {vc:.0f} m/min (範圍: {vc_min}-{vc_max} m/min)"
-            self.fz_result.text = f"每齒進給 fz: {fz:.3f} mm/tooth (範圍: {fz_min}-{fz_max} mm/tooth)"
-            self.m_result.text = f"主軸轉速 M: {m:.0f} RPM"
-            self.feed_result.text = f"進給速度 F: {f:.0f} mm/min"
+            self.vc_result.text = texts['vc']
+            self.fz_result.text = texts['fz']
+            self.m_result.text = texts['rpm']
+            self.feed_result.text = texts['feed']
+            self.life_result.text = texts['life']
             
             # 顯示詳細計算過程
-            detail_text = f"""計算過程:
-1. 材料: {material}
-2. 加工類型: {machining_type}
-3. VC條件: {vc_condition} (VC = {vc:.0f} m/min)
-4. 切削速度條件: {feed_condition} (fz = {fz:.3f} mm/tooth)
-5. 刀具直徑: {tool_diameter} mm
-6. 刀具齒數: {tooth_count}
-
-計算公式:
-主軸轉速 M = (VC × 1000) ÷ (π × D)
-        = ({vc} × 1000) ÷ (3.1416 × {tool_diameter})
-        = {vc*1000:.0f} ÷ {math.pi*tool_diameter:.1f}
-        = {m:.0f} RPM
-
-進給速度 F = M × N × fz
-        = {m:.0f} × {tooth_count} × {fz}
-        = {f:.0f} mm/min
-
-安全限制:
-• 主軸轉速限制: 100-20000 RPM
-• 進給速度限制: 10-5000 mm/min
-
-建議:
-• 根據實際機台性能調整參數
-• 首次加工建議進行試切削
-• 密切注意刀具磨損情況"""
-            
-            self.detail_result.text = detail_text
+            self.detail_result.text = texts['report']
             
+        except InputError as e:
+            self.m_result.text = e.message
         except ValueError:
             self.m_result.text = "錯誤: 請輸入有效的數字"
         except Exception as e:
             self.m_result.text = f"計算錯誤: {str(e)}"
 
-class StockAllowanceCalculator(Screen):
+class StockAllowanceCalculator(LiveCalcMixin, Screen):
     """切削預留量計算器"""
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
         # 預留量數據
-        self.allowance_data = {
-            "鋁合金": {
-                "平面": {"rough": 0.5, "semi_finish": 0.3, "tool": "3刃鋁用面銑刀 (直徑>50mm)", "notes": "確保裝夾牢固，避免震刀；易粘刀，注意排屑"},
-                "底面": {"rough": 0.4, "semi_finish": 0.25, "tool": "3刃鋁用平底刀", "notes": "注意刀具懸伸，防止過切；易粘刀，注意排屑"},
-                "曲面": {"rough": 0.6, "semi_finish": 0.4, "tool": "2刃球刀 (R1-R6)", "notes": "使用小步距，注意殘留高度；易粘刀，注意排屑"},
-                "側壁": {"rough": 0.4, "semi_finish": 0.25, "tool": "3刃鋁用平底刀", "notes": "注意刀具偏擺，檢查垂直度；易粘刀，注意排屑"},
-                "型腔": {"rough": 0.5, "semi_finish": 0.3, "tool": "3刃鋁用平底刀", "notes": "分層加工，注意角部清角；易粘刀，注意排屑"},
-                "孔加工": {"rough": 0.25, "semi_finish": 0.15, "tool": "中心鑽+螺旋銑刀", "notes": "中心鑽先定位，注意排屑；易粘刀，注意排屑"}
-            },
-            "不鏽鋼": {
-                "平面": {"rough": 0.75, "semi_finish": 0.5, "tool": "4刃面銑刀 (塗層)", "notes": "確保裝夾牢固，避免震刀；加工硬化，小切深"},
-                "底面": {"rough": 0.6, "semi_finish": 0.4, "tool": "4刃平底刀 (塗層)", "notes": "注意刀具懸伸，防止過切；加工硬化，小切深"},
-                "曲面": {"rough": 1.0, "semi_finish": 0.8, "tool": "2刃球刀 (塗層)", "notes": "使用小步距，注意殘留高度；加工硬化，小切深"},
-                "側壁": {"rough": 0.6, "semi_finish": 0.4, "tool": "4刃平底刀 (塗層)", "notes": "注意刀具偏擺，檢查垂直度；加工硬化，小切深"},
-                "型腔": {"rough": 0.75, "semi_finish": 0.5, "tool": "4刃平底刀 (塗層)", "notes": "分層加工，注意角部清角；加工硬化，小切深"},
-                "孔加工": {"rough": 0.4, "semi_finish": 0.25, "tool": "中心鑽+鑽頭+絞刀", "notes": "中心鑽先定位，注意排屑；加工硬化，小切深"}
-            },
-            "模具鋼": {
-                "平面": {"rough": 0.6, "semi_finish": 0.4, "tool": "4刃塗層面銑刀", "notes": "確保裝夾牢固，避免震刀"},
-                "底面": {"rough": 0.5, "semi_finish": 0.3, "tool": "4刃塗層平底刀", "notes": "注意刀具懸伸，防止過切"},
-                "曲面": {"rough": 0.75, "semi_finish": 0.6, "tool": "2刃塗層球刀", "notes": "使用小步距，注意殘留高度"},
-                "側壁": {"rough": 0.5, "semi_finish": 0.3, "tool": "4刃塗層平底刀", "notes": "注意刀具偏擺，檢查垂直度"},
-                "型腔": {"rough": 0.6, "semi_finish": 0.4, "tool": "4刃塗層平底刀", "notes": "分層加工，注意角部清角"},
-                "孔加工": {"rough": 0.3, "semi_finish": 0.2, "tool": "中心鑽+鑽頭+放電", "notes": "中心鑽先定位，注意排屑"}
-            },
-            "碳鋼": {
-                "平面": {"rough": 0.5, "semi_finish": 0.35, "tool": "4刃塗層面銑刀", "notes": "確保裝夾牢固，避免震刀"},
-                "底面": {"rough": 0.4, "semi_finish": 0.25, "tool": "4刃塗層平底刀", "notes": "注意刀具懸伸，防止過切"},
-                "曲面": {"rough": 0.65, "semi_finish": 0.5, "tool": "2刃塗層球刀", "notes": "使用小步距，注意殘留高度"},
-                "側壁": {"rough": 0.4, "semi_finish": 0.25, "tool": "4刃塗層平底刀", "notes": "注意刀具偏擺，檢查垂直度"},
-                "型腔": {"rough": 0.5, "semi_finish": 0.35, "tool": "4刃塗層平底刀", "notes": "分層加工，注意角部清角"},
-                "孔加工": {"rough": 0.25, "semi_finish": 0.18, "tool": "中心鑽+鑽頭", "notes": "中心鑽先定位，注意排屑"}
-            },
-            "銅合金": {
-                "平面": {"rough": 0.4, "semi_finish": 0.25, "tool": "3刃銅用面銑刀", "notes": "確保裝夾牢固，避免震刀"},
-                "底面": {"rough": 0.3, "semi_finish": 0.2, "tool": "3刃銅用平底刀", "notes": "注意刀具懸伸，防止過切"},
-                "曲面": {"rough": 0.5, "semi_finish": 0.35, "tool": "2刃銅用球刀", "notes": "使用小步距，注意殘留高度"},
-                "側壁": {"rough": 0.3, "semi_finish": 0.2, "tool": "3刃銅用平底刀", "notes": "注意刀具偏擺，檢查垂直度"},
-                "型腔": {"rough": 0.4, "semi_finish": 0.25, "tool": "3刃銅用平底刀", "notes": "分層加工，注意角部清角"},
-                "孔加工": {"rough": 0.2, "semi_finish": 0.12, "tool": "中心鑽+鑽頭", "notes": "中心鑽先定位，注意排屑"}
-            },
-            "鈦合金": {
-                "平面": {"rough": 1.0, "semi_finish": 0.8, "tool": "3刃鈦用面銑刀", "notes": "確保裝夾牢固，避免震刀；散熱差，低轉速"},
-                "底面": {"rough": 0.75, "semi_finish": 0.6, "tool": "3刃鈦用平底刀", "notes": "注意刀具懸伸，防止過切；散熱差，低轉速"},
-                "曲面": {"rough": 1.25, "semi_finish": 1.0, "tool": "2刃鈦用球刀", "notes": "使用小步距，注意殘留高度；散熱差，低轉速"},
-                "側壁": {"rough": 0.75, "semi_finish": 0.6, "tool": "3刃鈦用平底刀", "notes": "注意刀具偏擺，檢查垂直度；散熱差，低轉速"},
-                "型腔": {"rough": 1.0, "semi_finish": 0.8, "tool": "3刃鈦用平底刀", "notes": "分層加工，注意角部清角；散熱差，低轉速"},
-                "孔加工": {"rough": 0.5, "semi_finish": 0.3, "tool": "中心鑽+鈦用鑽頭", "notes": "中心鑽先定位，注意排屑；散熱差，低轉速"}
-            },
-            "塑膠": {
-                "平面": {"rough": 0.25, "semi_finish": 0.15, "tool": "2刃塑膠用面銑刀", "notes": "確保裝夾牢固，避免震刀；易變形，空冷加工"},
-                "底面": {"rough": 0.2, "semi_finish": 0.1, "tool": "2刃塑膠用平底刀", "notes": "注意刀具懸伸，防止過切；易變形，空冷加工"},
-                "曲面": {"rough": 0.4, "semi_finish": 0.25, "tool": "2刃塑膠用球刀", "notes": "使用小步距，注意殘留高度；易變形，空冷加工"},
-                "側壁": {"rough": 0.2, "semi_finish": 0.1, "tool": "2刃塑膠用平底刀", "notes": "注意刀具偏擺，檢查垂直度；易變形，空冷加工"},
-                "型腔": {"rough": 0.25, "semi_finish": 0.15, "tool": "2刃塑膠用平底刀", "notes": "分層加工，注意角部清角；易變形，空冷加工"},
-                "孔加工": {"rough": 0.15, "semi_finish": 0.08, "tool": "中心鑽+塑膠鑽頭", "notes": "中心鑽先定位，注意排屑；易變形，空冷加工"}
-            }
-        }
+        self.allowance_data = ALLOWANCE_DATA
         
         # 主佈局
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=20)
@@ -1635,7 +1541,7 @@ class StockAllowanceCalculator(Screen):
         input_layout.add_widget(Label(text='材質:', font_size='16sp', font_name='ChineseFont'))
         self.material_spinner = ChineseSpinner(
             text='鋁合金',
-            values=['鋁合金', '不鏽鋼', '模具鋼', '碳鋼', '銅合金', '鈦合金', '塑膠'],
+            values=list(ALLOWANCE_DATA),
             font_size='16sp'
         )
         input_layout.add_widget(self.material_spinner)
@@ -1643,7 +1549,7 @@ class StockAllowanceCalculator(Screen):
         input_layout.add_widget(Label(text='加工類型:', font_size='16sp', font_name='ChineseFont'))
         self.machining_spinner = ChineseSpinner(
             text='平面',
-            values=['平面', '底面', '曲面', '側壁', '型腔', '孔加工'],
+            values=list(ALLOWANCE_DATA[self.material_spinner.text]),
             font_size='16sp'
         )
         input_layout.add_widget(self.machining_spinner)
@@ -1658,7 +1564,7 @@ class StockAllowanceCalculator(Screen):
             font_size='18sp',
             bold=True,
         )
-        query_btn.bind(on_press=lambda x: Clock.schedule_once(self.query, 0))
+        query_btn.bind(on_press=lambda x: self.calc_trigger())
         main_layout.add_widget(query_btn)
         
         # 結果顯示
@@ -1698,45 +1604,24 @@ class StockAllowanceCalculator(Screen):
         main_layout.add_widget(self.detail_label)
         
         self.add_widget(main_layout)
+        
+        self.init_live_calc([self.material_spinner, self.machining_spinner], self.query)
     
     def go_back(self, instance):
         self.manager.current = 'main'
     
+    def input_key(self):
+        return (self.material_spinner.text, self.machining_spinner.text)
+    
     def query(self, dt):
-        material = self.material_spinner.text
-        machining_type = self.machining_spinner.text
-        
-        if material in self.allowance_data and machining_type in self.allowance_data[material]:
-            data = self.allowance_data[material][machining_type]
-            
-            self.rough_label.text = f"單邊預留(粗加工): {data['rough']} mm"
-            self.semi_finish_label.text = f"半精加工: {data['semi_finish']} mm"
-            self.tool_label.text = f"參考刀具: {data['tool']}"
-            
-            detail_text = f"""材質: {material}
-加工類型: {machining_type}
-
-加工參數建議:
-• 單邊粗加工預留: {data['rough']} mm
-• 半精加工預留: {data['semi_finish']} mm
-• 總預留量建議: {data['rough'] + data['semi_finish'] + 0.1:.2f} mm
-
-刀具推薦: {data['tool']}
-
-注意事項: {data['notes']}
-
-加工建議:
-1. 粗加工: 去除大部分材料，保留{data['rough']}mm單邊餘量
-2. 半精加工: 精確加工，保留{data['semi_finish']}mm單邊餘量
-3. 精加工: 最終加工，達到圖紙尺寸要求
-
-數據來源: CNC銑削加工預留量表
-            
-版本備註:
-• v2.9: 增加輸入驗證和性能優化
-• 更新日期: 2024年1月"""
-            
-            self.detail_label.text = detail_text
+        evaluation = evaluate(AllowanceInput(self.material_spinner.text, self.machining_spinner.text))
+        
+        if evaluation.result is not None:
+            texts = evaluation.texts
+            self.rough_label.text = texts['rough']
+            self.semi_finish_label.text = texts['semi_finish']
+            self.tool_label.text = texts['tool']
+            self.detail_label.text = texts['report']
         else:
             self.rough_label.text = "單邊預留(粗加工): 無數據"
             self.semi_finish_label.text = "半精加工: 無數據"
@@ -1745,25 +1630,82 @@ class StockAllowanceCalculator(Screen):
 
 class CNCApp(App):
     """主應用程序"""
-    def __init__(self, **kwargs):
+    # 計算器屏幕：名稱 → 類別，首次進入時才建立
+    SCREEN_CLASSES = {
+        'tool_calc': ToolCalculator,
+        'ballmill_calc': BallMillCalculator,
+        'helical_calc': HelicalCalculator,
+        'cutting_calc': CuttingConditionCalculator,
+        'stock_calc': StockAllowanceCalculator,
+    }
+    
+    def __init__(self, prewarm_screens=False, background_fonts=True, **kwargs):
         super().__init__(**kwargs)
+        # 是否在首幀後利用閒置幀預先建立計算器屏幕
+        self.prewarm_screens = prewarm_screens
+        # 是否在背景執行緒註冊字體（期間顯示啟動畫面）
+        self.background_fonts = background_fonts
+        # 設置 CNC_PROFILE_STARTUP=1 時回報啟動時間並在首個可互動畫面後結束
+        self.profile_startup = bool(environ.get('CNC_PROFILE_STARTUP'))
         
     def build(self):
         self.title = 'CNC加工工具包 v2.9 - 歐盛珠寶股份有限公司 ERREPI TAIWAN'
         
-        # 創建屏幕管理器
-        sm = ScreenManager()
+        # 創建屏幕管理器，啟動時只建立主屏幕
+        sm = LazyScreenManager(screen_classes=self.SCREEN_CLASSES)
         
-        # 添加各個屏幕
-        sm.add_widget(MainScreen(name='main'))
-        sm.add_widget(ToolCalculator(name='tool_calc'))
-        sm.add_widget(BallMillCalculator(name='ballmill_calc'))
-        sm.add_widget(HelicalCalculator(name='helical_calc'))
-        sm.add_widget(CuttingConditionCalculator(name='cutting_calc'))
-        sm.add_widget(StockAllowanceCalculator(name='stock_calc'))
+        if self.profile_startup:
+            Clock.schedule_once(self._report_first_frame, 0)
+        
+        if self.background_fonts:
+            sm.add_widget(SplashScreen(name='splash'))
+            # 等啟動畫面畫出後才開始載入，避免與首幀搶佔 CPU
+            Clock.schedule_once(partial(self._start_font_thread, sm), 0)
+        else:
+            register_chinese_font(resolve_font())
+            self._show_main(sm)
         
         return sm
     
+    def _start_font_thread(self, sm, dt):
+        threading.Thread(target=self._load_fonts, args=(sm,), daemon=True).start()
+    
+    def _load_fonts(self, sm):
+        """背景執行緒：解析、預讀並註冊字體，完成後回到主執行緒顯示主屏幕"""
+        font_path = resolve_font()
+        # 介面只用到 ChineseFont，有子集字體時完整字體留待需要時才讀取
+        preload_path = subset_font_path() or font_path
+        if preload_path:
+            preload_font(preload_path)
+        register_chinese_font(font_path)
+        self._on_fonts_loaded(sm)
+    
+    @mainthread
+    def _on_fonts_loaded(self, sm):
+        self._show_main(sm)
+    
+    def _show_main(self, sm):
+        sm.add_widget(MainScreen(name='main'))
+        sm.current = 'main'
+        
+        if self.prewarm_screens:
+            sm.prewarm()
+        
+        # 下一幀即為首個可互動畫面
+        if self.profile_startup:
+            Clock.schedule_once(self._report_startup, 0)
+    
+    def _report_first_frame(self, dt):
+        """回報從啟動到首幀（啟動畫面或主屏幕）的時間"""
+        elapsed = (time.perf_counter() - _START_TIME) * 1000
+        print(f"首幀: {elapsed:.0f} ms")
+    
+    def _report_startup(self, dt):
+        """回報從啟動到首個可互動畫面的時間"""
+        elapsed = (time.perf_counter() - _START_TIME) * 1000
+        print(f"首個可互動畫面: {elapsed:.0f} ms")
+        self.stop()
+    
     def on_pause(self):
         """應用暫停時調用（Android）"""
         # 保存應用狀態
@@ -1778,5 +1720,5 @@ if __name__ == '__main__':
     # 設置窗口背景色
     Window.clearcolor = (0.95, 0.95, 0.95, 1)
     
-    # 運行應用
-    CNCApp().run()
+    # 運行應用（設置 CNC_SYNC_FONTS=1 可改回同步載入字體）
+    CNCApp(background_fonts=not environ.get('CNC_SYNC_FONTS')).run()
@@ -0,0 +1,145 @@
+"""
+建置步驟：產生應用程式專用的中文子集字體 fonts/cnc_subset.ttf
+收集 main.py 與 cnc_core 內所有字串常量，以及參考數據 (reference.json) 內所有字串的字元，
+從完整 CJK 字體中擷取對應字形；完成後檢查參考數據的每個字元都在子集字體中
+
+需要 fontTools（僅建置時使用）：pip install fonttools
+用法: python tools/build_font_subset.py [--source 字體路徑] [--prefer TC] [--check]
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from cnc_core.fonts import default_font_paths, subset_font_path  # noqa: E402
+from cnc_core.refdata import SOURCE_PATH  # noqa: E402
+
+# 建置機上常見的完整 CJK 字體（CI 以 apt 安裝 fonts-noto-cjk）
+BUILD_FONT_PATHS = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+]
+
+# 無論原始碼是否出現都要保留的字元：可列印 ASCII（數字、錯誤訊息等）
+BASE_CHARS = {chr(c) for c in range(0x20, 0x7f)}
+
+
+def source_files():
+    """需要掃描字串的原始碼檔案"""
+    return [os.path.join(ROOT, 'main.py')] + sorted(glob.glob(os.path.join(ROOT, 'cnc_core', '*.py')))
+
+
+def reference_strings(path=SOURCE_PATH):
+    """參考數據內的所有字串（材料、刀具、特徵名稱與備註等只存在於 JSON）"""
+    with open(path, encoding='utf-8') as f:
+        stack = [json.load(f)]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def collect_chars(paths, strings=()):
+    """收集所有字串常量（包含 f-string 的常量部分）與 strings 中的字元"""
+    chars = set(BASE_CHARS)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(node.value)
+    for text in strings:
+        chars.update(text)
+    return {c for c in chars if c.isprintable()}
+
+
+def missing_chars(font_path, chars):
+    """字體中沒有字形的字元（由小到大）"""
+    from fontTools.ttLib import TTFont
+    with TTFont(font_path, lazy=True) as font:
+        cmap = font.getBestCmap()
+    return sorted(c for c in chars if ord(c) not in cmap)
+
+
+def pick_font_number(path, prefer):
+    """TTC 字體集中選擇名稱包含 prefer 的字體（例如 TC 為繁體中文）"""
+    from fontTools.ttLib import TTCollection
+    if not path.lower().endswith('.ttc') or not prefer:
+        return 0
+    collection = TTCollection(path, lazy=True)
+    for index, font in enumerate(collection.fonts):
+        if prefer in (font['name'].getDebugName(1) or ''):
+            return index
+    return 0
+
+
+def build_subset(source, output, chars, font_number=0):
+    from fontTools import subset
+
+    options = subset.Options()
+    options.font_number = font_number
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    options.hinting = False  # 手機螢幕以縮放為主，去掉 hinting 縮小體積
+
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(c) for c in chars])
+    subsetter.subset(font)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    subset.save_font(font, output, options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='產生應用程式專用的中文子集字體')
+    parser.add_argument('--source', help='完整 CJK 字體路徑（預設自動尋找）')
+    parser.add_argument('--prefer', default='TC', help='TTC 字體集中優先選用的字體名稱關鍵字')
+    parser.add_argument('--output', default=subset_font_path(check=False), help='輸出路徑')
+    parser.add_argument('--check', action='store_true', help='只檢查現有子集字體是否涵蓋參考數據的字元')
+    args = parser.parse_args()
+
+    reference_chars = collect_chars([], reference_strings()) - BASE_CHARS
+    if args.check:
+        if not os.path.exists(args.output):
+            parser.error(f'找不到子集字體 {args.output}')
+        missing = missing_chars(args.output, reference_chars)
+        if missing:
+            sys.exit(f"子集字體缺少參考數據的 {len(missing)} 個字元: {''.join(missing)}")
+        print(f"子集字體涵蓋參考數據的全部 {len(reference_chars)} 個字元")
+        return
+
+    source = args.source
+    if source is None:
+        candidates = BUILD_FONT_PATHS + default_font_paths()
+        source = next((p for p in candidates if os.path.exists(p)), None)
+    if source is None or not os.path.exists(source):
+        parser.error('找不到完整 CJK 字體，請以 --source 指定')
+
+    chars = collect_chars(source_files(), reference_strings())
+    font_number = pick_font_number(source, args.prefer)
+    build_subset(source, args.output, chars, font_number)
+    missing = missing_chars(args.output, reference_chars)
+    if missing:
+        sys.exit(f"來源字體缺少參考數據的 {len(missing)} 個字元: {''.join(missing)}")
+
+    size_in = os.path.getsize(source) / 1024
+    size_out = os.path.getsize(args.output) / 1024
+    print(f"來源字體: {source} (#{font_number}, {size_in:.0f} KB)")
+    print(f"子集字體: {args.output} ({size_out:.0f} KB, {len(chars)} 字元)")
+
+
+if __name__ == '__main__':
+    main()
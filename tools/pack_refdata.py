@@ -0,0 +1,46 @@
+"""
+建置步驟：將 cnc_core/data/reference.json 打包為 cnc_core/data/refdata.bin
+修改參考數據後請重新執行並一併提交兩個檔案
+
+用法: python tools/pack_refdata.py [--check]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from cnc_core.refdata import DATA_PATH, SOURCE_PATH, pack  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='打包參考數據')
+    parser.add_argument('--source', default=SOURCE_PATH, help='JSON 來源')
+    parser.add_argument('--output', default=DATA_PATH, help='輸出路徑')
+    parser.add_argument('--check', action='store_true', help='只檢查輸出是否為最新，不寫入')
+    args = parser.parse_args()
+
+    with open(args.source, encoding='utf-8') as f:
+        data = pack(json.load(f))
+
+    if args.check:
+        try:
+            with open(args.output, 'rb') as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != data:
+            sys.exit(f"{args.output} 不是最新，請執行 python tools/pack_refdata.py")
+        print(f"{args.output} 已是最新")
+        return
+
+    with open(args.output, 'wb') as f:
+        f.write(data)
+    print(f"參考數據: {args.output} ({len(data)} bytes)")
+
+
+if __name__ == '__main__':
+    main()